@@ -0,0 +1,34 @@
+"""Compare two benchmark result files and exit with an error when a metric regressed.
+
+python -m benchmarks.compare benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+
+import argparse
+import sys
+
+from benchmarks.report import compare, load_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change tolerated, 0.1 for 10%%")
+    args = parser.parse_args(argv)
+
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    changes = compare(baseline, current, args.threshold)
+
+    print(f"{baseline['commit']} -> {current['commit']}")
+    for change in changes:
+        flag = "REGRESSION" if change["regression"] else ""
+        print(
+            f"{change['endpoint']:<30} {change['metric']:<8} "
+            f"{change['before']:>10} -> {change['after']:>10} {change['change']:+8.1%} {flag}"
+        )
+
+    return 1 if any(change["regression"] for change in changes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import json
+import math
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metrics where a higher value is a regression, and the opposite
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_METRICS = ("rps",)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of the values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Latency percentiles in milliseconds and throughput of one endpoint."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def current_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def save_results(results: dict, directory: Path = RESULTS_DIR) -> Path:
+    """Write the results as JSON, named after the time and commit they were taken at."""
+    directory.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = directory / f"{timestamp}-{results['commit']}.json"
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """Relative change of every metric for the endpoints present in both runs, flagging regressions."""
+    changes = []
+    for endpoint, after in current["endpoints"].items():
+        before = baseline["endpoints"].get(endpoint)
+        if before is None:
+            continue
+
+        for metric in LATENCY_METRICS + THROUGHPUT_METRICS:
+            if not before[metric]:
+                continue
+            change = (after[metric] - before[metric]) / before[metric]
+            worse = change if metric in LATENCY_METRICS else -change
+            changes.append({
+                "endpoint": endpoint,
+                "metric": metric,
+                "before": before[metric],
+                "after": after[metric],
+                "change": round(change, 4),
+                "regression": worse > threshold,
+            })
+
+    return changes
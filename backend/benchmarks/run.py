@@ -0,0 +1,182 @@
+"""Drive the API under concurrent load and record latency and throughput per endpoint.
+
+Without --database-url a throwaway Postgres container is started. An explicit database
+is wiped and reseeded, so never point it at data you want to keep.
+
+    python -m benchmarks.run --trips 5000 --concurrency 32 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Callable
+
+import httpx
+
+from benchmarks.report import current_commit, save_results, summarize
+from benchmarks.seed import DataVolume
+from trip_packer.models import ItemCategory, ItemStatus
+
+
+@dataclass
+class Scenario:
+    """One endpoint under test; the path is formatted with random ids from the seeded data."""
+
+    name: str
+    method: str
+    path: str
+    body: Callable[[random.Random], dict] | None = None
+
+
+@dataclass
+class Load:
+    """How many requests to send, from how many concurrent workers, and the seed picking their ids."""
+
+    requests: int
+    concurrency: int
+    seed: int
+
+
+SCENARIOS = [
+    Scenario("trip detail", "GET", "/api/trips/{trip_id}"),
+    Scenario("trip summary", "GET", "/api/trips/{trip_id}/summary"),
+    Scenario("packing list", "GET", "/api/trips/{trip_id}/packing-list/"),
+    Scenario("trip items", "GET", "/api/trips/{trip_id}/trip-items/"),
+    Scenario("trips page", "GET", "/api/trips/page?limit=100"),
+    Scenario("item", "GET", "/api/items/{item_id}"),
+    Scenario("bags", "GET", "/api/bags/"),
+    Scenario(
+        "packing status by category",
+        "PATCH",
+        "/api/trips/{trip_id}/packing-list/status?include_rows=false",
+        lambda rng: {
+            "status": rng.choice([ItemStatus.PACKED, ItemStatus.UNPACKED]).value,
+            "category": rng.choice(list(ItemCategory)).value,
+        },
+    ),
+]
+
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, volume: DataVolume, load: Load) -> dict:
+    """Send the requests of a scenario from concurrent workers and summarize their latency."""
+    rng = random.Random(load.seed)
+    pending = iter(range(load.requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        # Workers share the iterator, so the requests are split between them as they free up
+        for _ in pending:
+            path = scenario.path.format(trip_id=rng.randint(1, volume.trips), item_id=rng.randint(1, volume.items))
+            body = scenario.body(rng) if scenario.body else None
+
+            start = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+
+            if response.status_code >= httpx.codes.BAD_REQUEST:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(load.concurrency)))
+
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_benchmarks(args, volume: DataVolume) -> dict:
+    # The app builds its engine on import, so DATABASE_URL has to be set first
+    from benchmarks.seed import seed  # noqa: PLC0415
+    from trip_packer.app import app  # noqa: PLC0415
+    from trip_packer.database import engine, settings  # noqa: PLC0415
+
+    if not args.skip_seed:
+        print(f"Seeding {volume.as_dict()}", file=sys.stderr)
+        await seed(engine, volume)
+
+    selected = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    endpoints = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for index, scenario in enumerate(selected):
+            await drive(client, scenario, volume, Load(args.warmup, args.concurrency, -args.seed - index - 1))
+            endpoints[scenario.name] = {
+                "method": scenario.method,
+                "path": scenario.path,
+                **await drive(client, scenario, volume, Load(args.requests, args.concurrency, args.seed + index)),
+            }
+            print(f"{scenario.name}: {endpoints[scenario.name]}", file=sys.stderr)
+
+    await engine.dispose()
+
+    return {
+        "pool": {"size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW},
+        "endpoints": endpoints,
+    }
+
+
+@contextmanager
+def database(url: str | None):
+    """Point the app at the given database, or at a throwaway Postgres container."""
+    if url:
+        os.environ["DATABASE_URL"] = url
+        yield
+        return
+
+    from testcontainers.postgres import PostgresContainer  # noqa: PLC0415
+
+    with PostgresContainer("postgres:16", driver="psycopg") as postgres:
+        os.environ["DATABASE_URL"] = postgres.get_connection_url()
+        yield
+
+
+def add_data_arguments(parser: argparse.ArgumentParser):
+    """Options choosing the database and the volume seeded into it, shared by every benchmark."""
+    parser.add_argument("--database-url", help="Postgres database to wipe and seed instead of a container")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse data seeded by an earlier run")
+    for field in fields(DataVolume):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=int, default=field.default)
+
+
+def volume_from_args(args) -> DataVolume:
+    return DataVolume(**{field.name: getattr(args, field.name) for field in fields(DataVolume)})
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_data_arguments(parser)
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random ids requested")
+    parser.add_argument("--only", action="append", help="Only run the named scenario, can be repeated")
+    parser.add_argument("--label", default="", help="Free text stored with the results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    volume = volume_from_args(args)
+
+    with database(args.database_url):
+        measured = asyncio.run(run_benchmarks(args, volume))
+
+    results = {
+        "commit": current_commit(),
+        "label": args.label,
+        "volume": volume.as_dict(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        **measured,
+    }
+    print(save_results(results))
+
+
+if __name__ == "__main__":
+    main()
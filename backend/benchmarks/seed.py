@@ -0,0 +1,71 @@
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from trip_packer.models import ItemCategory, ItemStatus, LuggageType, table_registry
+
+
+@dataclass
+class DataVolume:
+    """How much data to seed; packings mirror the trip items, one bag each."""
+
+    trips: int = 1000
+    items: int = 5000
+    bags: int = 200
+    bags_per_trip: int = 4
+    items_per_trip: int = 200
+
+    def __post_init__(self):
+        if self.bags_per_trip > self.bags or self.items_per_trip > self.items:
+            raise ValueError("A trip cannot use more bags or items than the catalog holds")
+
+    @property
+    def packings(self) -> int:
+        return self.trips * self.items_per_trip
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "packings": self.packings}
+
+
+def seed_statements(volume: DataVolume) -> list[str]:
+    """Set-based inserts, so seeding a large volume stays within seconds."""
+    trips, items, bags = volume.trips, volume.items, volume.bags
+    bags_per_trip, items_per_trip = volume.bags_per_trip, volume.items_per_trip
+
+    return [
+        f"INSERT INTO trips (name, start_date, end_date) "
+        f"SELECT 'Trip ' || n, now() + n * interval '1 day', now() + (n + 7) * interval '1 day' "
+        f"FROM generate_series(1, {trips}) AS n",
+        f"INSERT INTO items (name, category) "
+        f"SELECT 'Item ' || n, (enum_range(NULL::itemcategory))[n % {len(ItemCategory)} + 1] "
+        f"FROM generate_series(1, {items}) AS n",
+        f"INSERT INTO bags (name, type) "
+        f"SELECT 'Bag ' || n, (enum_range(NULL::luggagetype))[n % {len(LuggageType)} + 1] "
+        f"FROM generate_series(1, {bags}) AS n",
+        f"INSERT INTO trip_bags (trip_id, bag_id) "
+        f"SELECT t, (t * {bags_per_trip} + s) % {bags} + 1 "
+        f"FROM generate_series(1, {trips}) AS t, generate_series(1, {bags_per_trip}) AS s",
+        f"INSERT INTO trip_items (trip_id, item_id, quantity, status) "
+        f"SELECT t, (t * {items_per_trip} + s) % {items} + 1, s % 3 + 1, "
+        f"(enum_range(NULL::itemstatus))[s % {len(ItemStatus)} + 1] "
+        f"FROM generate_series(1, {trips}) AS t, generate_series(1, {items_per_trip}) AS s",
+        # Spread each trip's items over the bags attached to that trip
+        f"INSERT INTO packings (trip_id, item_id, bag_id, quantity, status) "
+        f"SELECT trip_id, item_id, (trip_id * {bags_per_trip} + item_id % {bags_per_trip} + 1) % {bags} + 1, "
+        f"quantity, status FROM trip_items",
+        "ANALYZE",
+    ]
+
+
+async def seed(engine: AsyncEngine, volume: DataVolume):
+    """Recreate every table and fill it with the given volume."""
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    # ANALYZE cannot run inside the transaction block opened by begin()
+    async with engine.connect() as conn:
+        autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in seed_statements(volume):
+            await autocommit.execute(text(statement))
@@ -0,0 +1,103 @@
+"""Micro-benchmark of list serialization: response_model validation of ORM-like objects against the row serializer.
+
+Needs no database, the rows are built in memory.
+
+    python -m benchmarks.serialization --rows 5000 --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from benchmarks.report import current_commit, save_results, summarize
+from trip_packer.models import ItemCategory, ItemStatus, LuggageType
+from trip_packer.schemas import ItemResponse, PackingDetailResponse
+from trip_packer.serialization import row_serializer
+
+
+def _item(index: int, now: datetime) -> dict:
+    return {
+        "id": index,
+        "name": f"Item {index}",
+        "category": list(ItemCategory)[index % len(ItemCategory)],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _packing(index: int, now: datetime) -> dict:
+    return {
+        "trip_id": 1,
+        "item_id": index,
+        "bag_id": index % 4 + 1,
+        "quantity": index % 3 + 1,
+        "status": list(ItemStatus)[index % len(ItemStatus)],
+        "created_at": now,
+        "updated_at": now,
+        "item": _item(index, now),
+        "bag": {"id": index % 4 + 1, "name": "Bag", "type": LuggageType.BACKPACK, "created_at": now, "updated_at": now},
+    }
+
+
+def _as_objects(row: dict) -> SimpleNamespace:
+    """Attribute access like an ORM instance, which is what response_model validates today."""
+    attributes = {key: _as_objects(value) if isinstance(value, dict) else value for key, value in row.items()}
+    return SimpleNamespace(**attributes)
+
+
+def measure(serialize, payload, repeat: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        serialize(payload)
+        latencies.append(time.perf_counter() - call_start)
+
+    return summarize(latencies, errors=0, elapsed=time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per listing")
+    parser.add_argument("--repeat", type=int, default=50, help="Listings serialized per path")
+    parser.add_argument("--label", default="list serialization", help="Free text stored with the results")
+    args = parser.parse_args(argv)
+
+    now = datetime.now()
+    endpoints = {}
+    for name, schema, build in (("items", ItemResponse, _item), ("packing list", PackingDetailResponse, _packing)):
+        rows = [build(index, now) for index in range(1, args.rows + 1)]
+        objects = [_as_objects(row) for row in rows]
+
+        # What FastAPI does with a response_model: validate from attributes, then serialize
+        validated = TypeAdapter(list[schema])
+
+        def validate_and_dump(payload, adapter=validated):
+            return adapter.dump_json(adapter.validate_python(payload, from_attributes=True))
+
+        paths = {"validated": (validate_and_dump, objects), "rows": (row_serializer(schema).dump_json, rows)}
+
+        for path, (serialize, payload) in paths.items():
+            measure(serialize, payload, 1)
+            summary = measure(serialize, payload, args.repeat)
+            summary["us_per_row"] = round(summary["mean_ms"] * 1000 / args.rows, 3)
+            endpoints[f"{name} ({path})"] = summary
+            print(f"{name} ({path}): {summary}", file=sys.stderr)
+
+    results = {
+        "commit": current_commit(),
+        "label": args.label,
+        "rows": args.rows,
+        "requests": args.repeat,
+        "concurrency": 1,
+        "endpoints": endpoints,
+    }
+    print(save_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Measure what building hot queries once and preparing them on the server saves.
+
+Statement construction is timed without a database: a select built per call, as the routers used to, against the
+module-level constant they run now. The packing list query then runs against Postgres with server-side prepared
+statements off and on, and EXPLAIN ANALYZE reports the planning time every unprepared execution pays.
+
+    python -m benchmarks.statements --trips 2000 --items-per-trip 300 --reads 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from benchmarks.report import current_commit, save_results, summarize
+from benchmarks.run import add_data_arguments, database, volume_from_args
+from trip_packer.models import Packing
+
+
+def _packing_list_per_call(trip_id: int):
+    return (
+        select(Packing).where(Packing.trip_id == trip_id).options(selectinload(Packing.item), selectinload(Packing.bag))
+    )
+
+
+def measure_construction(iterations: int) -> dict:
+    """Microseconds per call to get a statement and the cache key SQLAlchemy looks its compiled form up with."""
+    # Importing the routers builds the app engine, which needs DATABASE_URL
+    from trip_packer.routers.packing import PACKING_LIST_QUERY  # noqa: PLC0415
+
+    timings = {}
+    for name, build in (
+        ("built per call", _packing_list_per_call),
+        ("module constant", lambda trip_id: PACKING_LIST_QUERY),
+    ):
+        start = time.perf_counter()
+        for trip_id in range(iterations):
+            build(trip_id)._generate_cache_key()
+        timings[name] = (time.perf_counter() - start) / iterations * 1e6
+
+    return timings
+
+
+async def planning_time(engine, trip_id: int) -> float:
+    """Milliseconds Postgres spends planning the packing list query when it is not prepared."""
+    from trip_packer.routers.packing import PACKING_LIST_QUERY  # noqa: PLC0415
+
+    sql = PACKING_LIST_QUERY.compile(dialect=postgresql.psycopg.dialect())
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", {"trip_id": trip_id})
+        plan = result.scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return plan[0]["Planning Time"]
+
+
+async def measure_reads(engine, trip_ids: list[int]) -> dict:
+    from trip_packer.routers.packing import PACKING_LIST_QUERY  # noqa: PLC0415
+
+    latencies = []
+    start = time.perf_counter()
+    for trip_id in trip_ids:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            read_start = time.perf_counter()
+            (await session.execute(PACKING_LIST_QUERY, {"trip_id": trip_id})).scalars().all()
+            latencies.append(time.perf_counter() - read_start)
+
+    return summarize(latencies, errors=0, elapsed=time.perf_counter() - start)
+
+
+async def run_benchmarks(args, volume) -> dict:
+    # The app builds its engine on import, so DATABASE_URL has to be set first
+    from benchmarks.seed import seed  # noqa: PLC0415
+    from trip_packer.database import engine, settings  # noqa: PLC0415
+
+    if not args.skip_seed:
+        print(f"Seeding {volume.as_dict()}", file=sys.stderr)
+        await seed(engine, volume)
+
+    construction = measure_construction(args.iterations)
+    print(f"construction (us per call): {construction}", file=sys.stderr)
+
+    rng = random.Random(args.seed)
+    trip_ids = [rng.randint(1, volume.trips) for _ in range(args.reads)]
+
+    endpoints = {}
+    for name, threshold in (("packing list (unprepared)", None), ("packing list (prepared)", 0)):
+        # One connection, so every read after the first reuses the statement prepared on it
+        bench_engine = create_async_engine(
+            settings.DATABASE_URL, pool_size=1, connect_args={"prepare_threshold": threshold}
+        )
+        await measure_reads(bench_engine, trip_ids[: args.warmup])
+        endpoints[name] = {
+            "method": "GET",
+            "path": "/api/trips/{trip_id}/packing-list/",
+            **await measure_reads(bench_engine, trip_ids),
+        }
+        print(f"{name}: {endpoints[name]}", file=sys.stderr)
+        await bench_engine.dispose()
+
+    planning_ms = await planning_time(engine, trip_ids[0])
+    print(f"planning time per unprepared execution: {planning_ms:.3f} ms", file=sys.stderr)
+    await engine.dispose()
+
+    return {"endpoints": endpoints, "construction_us": construction, "planning_ms": planning_ms}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_data_arguments(parser)
+    parser.add_argument("--reads", type=int, default=2000, help="Measured reads per mode")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured reads per mode")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Statements built per construction timing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random trips read")
+    parser.add_argument("--label", default="statement caching", help="Free text stored with the results")
+    args = parser.parse_args(argv)
+    volume = volume_from_args(args)
+
+    with database(args.database_url):
+        measured = asyncio.run(run_benchmarks(args, volume))
+
+    results = {
+        "commit": current_commit(),
+        "label": args.label,
+        "volume": volume.as_dict(),
+        "requests": args.reads,
+        "concurrency": 1,
+        **measured,
+    }
+    print(save_results(results))
+
+
+if __name__ == "__main__":
+    main()
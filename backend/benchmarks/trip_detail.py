@@ -0,0 +1,103 @@
+"""Compare the trip detail read paths: ORM eager loading with Pydantic against JSON built by Postgres.
+
+python -m benchmarks.trip_detail --trips 2000 --items-per-trip 300 --reads 500
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from benchmarks.report import current_commit, save_results, summarize
+from benchmarks.run import add_data_arguments, database, volume_from_args
+from trip_packer.models import Trip, TripBag, TripItem
+from trip_packer.schemas import TripDetailResponse
+
+
+async def _orm_detail(session: AsyncSession, trip_id: int) -> str:
+    """The read path trips.get_trip used before the JSON loader: nested selectinload chains and Pydantic."""
+    result = await session.execute(
+        select(Trip)
+        .where(Trip.id == trip_id)
+        .options(
+            selectinload(Trip.trip_bags).selectinload(TripBag.bag),
+            selectinload(Trip.trip_items).selectinload(TripItem.item),
+        )
+    )
+    return TripDetailResponse.model_validate(result.scalar_one()).model_dump_json()
+
+
+async def _json_detail(session: AsyncSession, trip_id: int) -> str:
+    # Importing the routers builds the app engine, which needs DATABASE_URL
+    from trip_packer.routers.trips import trip_detail_json  # noqa: PLC0415
+
+    return await trip_detail_json(session, trip_id)
+
+
+async def measure(engine, loader, trip_ids: list[int]) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for trip_id in trip_ids:
+        # A fresh session per read, as every request gets, so the identity map never serves a trip
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            read_start = time.perf_counter()
+            await loader(session, trip_id)
+            latencies.append(time.perf_counter() - read_start)
+
+    return summarize(latencies, errors=0, elapsed=time.perf_counter() - start)
+
+
+async def run_benchmarks(args, volume) -> dict:
+    # The app builds its engine on import, so DATABASE_URL has to be set first
+    from benchmarks.seed import seed  # noqa: PLC0415
+    from trip_packer.database import engine  # noqa: PLC0415
+
+    if not args.skip_seed:
+        print(f"Seeding {volume.as_dict()}", file=sys.stderr)
+        await seed(engine, volume)
+
+    rng = random.Random(args.seed)
+    trip_ids = [rng.randint(1, volume.trips) for _ in range(args.reads)]
+
+    endpoints = {}
+    for name, loader in (("trip detail (orm)", _orm_detail), ("trip detail (json)", _json_detail)):
+        await measure(engine, loader, trip_ids[: args.warmup])
+        endpoints[name] = {"method": "GET", "path": "/api/trips/{trip_id}", **await measure(engine, loader, trip_ids)}
+        print(f"{name}: {endpoints[name]}", file=sys.stderr)
+
+    await engine.dispose()
+
+    return endpoints
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_data_arguments(parser)
+    parser.add_argument("--reads", type=int, default=500, help="Measured reads per path")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured reads per path")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random trips read")
+    parser.add_argument("--label", default="trip detail loaders", help="Free text stored with the results")
+    args = parser.parse_args(argv)
+    volume = volume_from_args(args)
+
+    with database(args.database_url):
+        endpoints = asyncio.run(run_benchmarks(args, volume))
+
+    results = {
+        "commit": current_commit(),
+        "label": args.label,
+        "volume": volume.as_dict(),
+        "requests": args.reads,
+        "concurrency": 1,
+        "endpoints": endpoints,
+    }
+    print(save_results(results))
+
+
+if __name__ == "__main__":
+    main()
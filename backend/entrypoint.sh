@@ -1,7 +1,4 @@
 #!/bin/sh
 
-# Executa as migrações do banco de dados
-poetry run alembic upgrade head
-
-# Inicia a aplicação
-poetry run uvicorn --host 0.0.0.0 --port 8000 trip_packer.app:app
\ No newline at end of file
+# Verifica a revisão do banco, aplica as migrações só se estiver atrasado e inicia a aplicação sem o poetry
+exec python -m trip_packer.startup --host 0.0.0.0 --port 8000
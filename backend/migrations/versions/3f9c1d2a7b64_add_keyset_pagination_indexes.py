@@ -0,0 +1,32 @@
+"""Add keyset pagination indexes to trips, items and bags
+
+Revision ID: 3f9c1d2a7b64
+Revises: 115be744145d
+Create Date: 2025-08-24 10:12:41.503318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d2a7b64'
+down_revision: Union[str, Sequence[str], None] = '115be744145d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_trips_updated_at_id', 'trips', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_items_updated_at_id', 'items', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_bags_updated_at_id', 'bags', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bags_updated_at_id', table_name='bags')
+    op.drop_index('ix_items_updated_at_id', table_name='items')
+    op.drop_index('ix_trips_updated_at_id', table_name='trips')
@@ -0,0 +1,34 @@
+"""Add reverse lookup indexes to association tables
+
+Revision ID: 8a41e6c0d2f9
+Revises: 3f9c1d2a7b64
+Create Date: 2025-08-24 15:47:09.218764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41e6c0d2f9'
+down_revision: Union[str, Sequence[str], None] = '3f9c1d2a7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_packings_bag_id_trip_id', 'packings', ['bag_id', 'trip_id'], unique=False)
+    op.create_index('ix_packings_item_id', 'packings', ['item_id'], unique=False)
+    op.create_index('ix_trip_items_item_id', 'trip_items', ['item_id'], unique=False)
+    op.create_index('ix_trip_bags_bag_id_trip_id', 'trip_bags', ['bag_id', 'trip_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trip_bags_bag_id_trip_id', table_name='trip_bags')
+    op.drop_index('ix_trip_items_item_id', table_name='trip_items')
+    op.drop_index('ix_packings_item_id', table_name='packings')
+    op.drop_index('ix_packings_bag_id_trip_id', table_name='packings')
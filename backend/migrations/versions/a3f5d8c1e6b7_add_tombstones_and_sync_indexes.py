@@ -0,0 +1,40 @@
+"""Add tombstones table and updated_at indexes for delta sync
+
+Revision ID: a3f5d8c1e6b7
+Revises: e4a8b6f2c915
+Create Date: 2025-09-08 20:41:09.552813
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5d8c1e6b7'
+down_revision: Union[str, Sequence[str], None] = 'e4a8b6f2c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('key', sa.JSON(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+    op.create_index('ix_trip_items_updated_at', 'trip_items', ['updated_at'], unique=False)
+    op.create_index('ix_packings_updated_at', 'packings', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_packings_updated_at', table_name='packings')
+    op.drop_index('ix_trip_items_updated_at', table_name='trip_items')
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
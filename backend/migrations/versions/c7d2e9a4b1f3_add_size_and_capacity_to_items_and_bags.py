@@ -0,0 +1,34 @@
+"""Add size and capacity to items and bags
+
+Revision ID: c7d2e9a4b1f3
+Revises: 8a41e6c0d2f9
+Create Date: 2025-09-02 10:12:44.501326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9a4b1f3'
+down_revision: Union[str, Sequence[str], None] = '8a41e6c0d2f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('volume_liters', sa.Float(), server_default='0', nullable=False))
+    op.add_column('items', sa.Column('weight_kg', sa.Float(), server_default='0', nullable=False))
+    op.add_column('bags', sa.Column('capacity_liters', sa.Float(), nullable=True))
+    op.add_column('bags', sa.Column('max_weight_kg', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('bags', 'max_weight_kg')
+    op.drop_column('bags', 'capacity_liters')
+    op.drop_column('items', 'weight_kg')
+    op.drop_column('items', 'volume_liters')
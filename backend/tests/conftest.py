@@ -1,5 +1,6 @@
 import asyncio
 import sys
+import time
 
 import pytest
 import pytest_asyncio
@@ -8,23 +9,58 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from testcontainers.postgres import PostgresContainer
 
 from trip_packer.app import app
-from trip_packer.database import get_session
+from trip_packer.autocomplete import ItemPrefixIndex, get_item_index
+from trip_packer.cache import CatalogCache, LRUCache, get_catalog_cache
+from trip_packer.coalescing import WriteCoalescer, get_write_coalescer
+from trip_packer.database import get_read_session, get_session
+from trip_packer.events import EventBroker, get_event_broker
+from trip_packer.idempotency import IdempotencyStore, get_idempotency_store
+from trip_packer.jobs import JobRunner, get_job_runner
 from trip_packer.models import table_registry
+from trip_packer.readiness import Readiness, get_readiness
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+WARM_UP_TIMEOUT_SECONDS = 5.0
+
 
 @pytest.fixture
 def client(session):
     def get_session_override():
         return session
 
-    with TestClient(app) as client:
-        app.dependency_overrides[get_session] = get_session_override
-        yield client
+    # Ids restart with every test database, so each test gets an empty cache
+    catalog_cache = CatalogCache(LRUCache())
+    item_index = ItemPrefixIndex()
+    job_runner = JobRunner(session.bind)
+    event_broker = EventBroker()
+    write_coalescer = WriteCoalescer(session.bind, event_broker)
+    idempotency_store = IdempotencyStore(session.bind)
+    readiness = Readiness([session.bind], connections=1)
+
+    # Set before the lifespan runs, so the background work it starts uses them too
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_catalog_cache] = lambda: catalog_cache
+    app.dependency_overrides[get_item_index] = lambda: item_index
+    app.dependency_overrides[get_job_runner] = lambda: job_runner
+    app.dependency_overrides[get_event_broker] = lambda: event_broker
+    app.dependency_overrides[get_write_coalescer] = lambda: write_coalescer
+    app.dependency_overrides[get_idempotency_store] = lambda: idempotency_store
+    app.dependency_overrides[get_readiness] = lambda: readiness
 
-    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            # A warm-up still loading the caches could store lists read before the first writes of the test
+            deadline = time.monotonic() + WARM_UP_TIMEOUT_SECONDS
+            while not readiness.ready:
+                if time.monotonic() > deadline:
+                    pytest.fail(f"Warm-up did not finish in {WARM_UP_TIMEOUT_SECONDS}s: {readiness.last_error!r}")
+                time.sleep(0.01)
+            yield client
+    finally:
+        app.dependency_overrides.clear()
 
 
 @pytest.fixture(scope="session")
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from trip_packer.app import app
+from trip_packer.database import get_read_session
+
 
 def test_create_bag(client):
     """Test creating a new bag."""
@@ -25,6 +28,14 @@ def test_create_duplicate_bag(client):
     assert response.status_code == HTTPStatus.CONFLICT
 
 
+def test_create_bag_negative_limits(client):
+    """Test bags can't have a negative capacity or maximum weight."""
+    for field in ("capacity_liters", "max_weight_kg"):
+        response = client.post("/api/bags/", json={"name": "Weekend Backpack", "type": "BACKPACK", field: -1})
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 def test_get_bags(client):
     """Test getting all bag items."""
     # Create test bag items
@@ -138,3 +149,29 @@ def test_delete_nonexistent_bag(client):
     response = client.delete("/api/bags/99999")
 
     assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_get_bags_page(client):
+    """Test fetching bags with keyset pagination."""
+    names = ["Backpack", "Carry On", "Suitcase"]
+    for name in names:
+        client.post("/api/bags/", json={"name": name, "type": "BACKPACK"})
+
+    first_page = client.get("/api/bags/page", params={"limit": 2}).json()
+    second_page = client.get("/api/bags/page", params={"limit": 2, "after": first_page["next_cursor"]}).json()
+
+    assert [bag["name"] for bag in first_page["items"] + second_page["items"]] == names
+    assert second_page["next_cursor"] is None
+
+
+def test_cached_bag_reads_use_the_primary(client):
+    """Cached bag reads never go to a replica, which could refill the cache with stale rows."""
+    bag_id = client.post("/api/bags/", json={"name": "Weekend Backpack", "type": "BACKPACK"}).json()["id"]
+
+    def no_replica():
+        raise AssertionError("cached reads must not use a replica session")
+
+    app.dependency_overrides[get_read_session] = no_replica
+
+    assert client.get("/api/bags/").status_code == HTTPStatus.OK
+    assert client.get(f"/api/bags/{bag_id}").status_code == HTTPStatus.OK
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.report import compare, percentile, summarize
+from benchmarks.seed import DataVolume
+
+
+def test_percentile_uses_nearest_rank():
+    median, p99, maximum = 50.0, 99.0, 100.0
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.50) == median
+    assert percentile(values, 0.99) == p99
+    assert percentile(values, 1.0) == maximum
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarize_reports_milliseconds_and_throughput():
+    latencies = [0.01, 0.02, 0.03, 0.04]
+    elapsed = 2.0
+    expected_rps, expected_p50_ms, expected_p99_ms = 2.0, 20.0, 40.0
+    summary = summarize(latencies, errors=1, elapsed=elapsed)
+
+    assert summary["requests"] == len(latencies)
+    assert summary["errors"] == 1
+    assert summary["rps"] == expected_rps
+    assert summary["p50_ms"] == expected_p50_ms
+    assert summary["p99_ms"] == expected_p99_ms
+
+
+def test_compare_flags_regressions_in_both_directions():
+    baseline = {"endpoints": {"trip detail": {"p50_ms": 10, "p95_ms": 20, "p99_ms": 30, "rps": 100}}}
+    current = {
+        "endpoints": {
+            "trip detail": {"p50_ms": 10.5, "p95_ms": 30, "p99_ms": 30, "rps": 80},
+            "new endpoint": {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "rps": 1},
+        }
+    }
+
+    changes = {change["metric"]: change for change in compare(baseline, current, threshold=0.1)}
+
+    assert not changes["p50_ms"]["regression"]
+    assert changes["p95_ms"]["regression"]
+    assert changes["rps"]["regression"]
+    assert changes["rps"]["change"] == pytest.approx(-0.2)
+    assert all(change["endpoint"] == "trip detail" for change in changes.values())
+
+
+def test_data_volume_rejects_trips_larger_than_the_catalog():
+    with pytest.raises(ValueError, match="cannot use more bags or items"):
+        DataVolume(items=10, items_per_trip=20)
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from trip_packer import cache as cache_module
+from trip_packer.cache import LRUCache, cache_evictions_total, cache_hits_total, cache_misses_total
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    evictions_before = cache_evictions_total.value()
+
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 1)
+
+    assert await cache.get("a") == 1
+    assert await cache.get("b") is None
+    assert await cache.get("c") == 1
+    assert cache_evictions_total.value() == evictions_before + 1
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_expires_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = LRUCache(ttl_seconds=10)
+
+    await cache.set("a", 1)
+    now += 5
+    assert await cache.get("a") == 1
+
+    now += 10
+    assert await cache.get("a") is None
+
+
+def test_get_item_is_served_from_cache(client):
+    item_id = client.post("/api/items/", json={"name": "Passport", "category": "DOCUMENTS"}).json()["id"]
+    hits_before = cache_hits_total.value(namespace="items")
+    misses_before = cache_misses_total.value(namespace="items")
+
+    first = client.get(f"/api/items/{item_id}")
+    second = client.get(f"/api/items/{item_id}")
+
+    assert first.json() == second.json()
+    assert cache_misses_total.value(namespace="items") == misses_before + 1
+    assert cache_hits_total.value(namespace="items") == hits_before + 1
+
+
+def test_item_writes_invalidate_cache(client):
+    item_id = client.post("/api/items/", json={"name": "Passport", "category": "DOCUMENTS"}).json()["id"]
+    client.get(f"/api/items/{item_id}")
+    client.get("/api/items/")
+
+    client.put(f"/api/items/{item_id}", json={"name": "Visa"})
+
+    assert client.get(f"/api/items/{item_id}").json()["name"] == "Visa"
+    assert [item["name"] for item in client.get("/api/items/").json()] == ["Visa"]
+
+    client.post("/api/items/", json={"name": "Charger", "category": "ELECTRONICS"})
+    assert [item["name"] for item in client.get("/api/items/").json()] == ["Visa", "Charger"]
+
+    client.delete(f"/api/items/{item_id}")
+    assert client.get(f"/api/items/{item_id}").status_code == HTTPStatus.NOT_FOUND
+
+
+def test_bag_writes_invalidate_cache(client):
+    bag_id = client.post("/api/bags/", json={"name": "Backpack", "type": "BACKPACK"}).json()["id"]
+    client.get(f"/api/bags/{bag_id}")
+
+    client.put(f"/api/bags/{bag_id}", json={"type": "CARRY_ON"})
+
+    assert client.get(f"/api/bags/{bag_id}").json()["type"] == "CARRY_ON"
@@ -0,0 +1,102 @@
+import gzip
+from http import HTTPStatus
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from trip_packer.compression import CompressionMiddleware, GzipCompressor, negotiate_encoding, skip_compression
+
+LARGE_TEXT = "packed " * 1000
+
+
+def _compressed_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, encodings=["gzip"])
+
+    @app.get("/large", response_class=PlainTextResponse)
+    def large():
+        return LARGE_TEXT
+
+    @app.get("/small", response_class=PlainTextResponse)
+    def small():
+        return "packed"
+
+    @app.get("/uncompressed", response_class=PlainTextResponse)
+    @skip_compression
+    def uncompressed():
+        return LARGE_TEXT
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"line {index}\n" for index in range(100)), media_type="text/plain")
+
+    return app
+
+
+def test_negotiate_encoding_follows_client_weights():
+    encodings = ["zstd", "br", "gzip"]
+
+    assert negotiate_encoding("gzip, br", encodings) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", encodings) == "gzip"
+    assert negotiate_encoding("br;q=0, *", encodings) == "zstd"
+    assert negotiate_encoding("identity", encodings) is None
+    assert negotiate_encoding("", encodings) is None
+    assert negotiate_encoding("gzip;q=oops", encodings) is None
+
+
+def test_gzip_compressor_streams_chunks():
+    compressor = GzipCompressor(level=6)
+
+    body = compressor.compress(b"first ", final=False) + compressor.compress(b"second", final=True)
+
+    assert gzip.decompress(body) == b"first second"
+
+
+def test_compresses_large_responses():
+    client = TestClient(_compressed_app())
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(LARGE_TEXT)
+    assert response.text == LARGE_TEXT
+
+
+def test_leaves_small_responses_and_unsupported_clients_alone():
+    client = TestClient(_compressed_app())
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_skip_compression_opts_a_route_out():
+    client = TestClient(_compressed_app())
+
+    response = client.get("/uncompressed", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == LARGE_TEXT
+
+
+def test_compresses_streaming_responses():
+    client = TestClient(_compressed_app())
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines()[-1] == "line 99"
+
+
+def test_api_responses_are_compressed(client):
+    item_count = 20
+    for index in range(item_count):
+        client.post("/api/items/", json={"name": f"Item {index}", "category": "OTHER"})
+
+    response = client.get("/api/items/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == item_count
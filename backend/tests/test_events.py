@@ -0,0 +1,132 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from trip_packer.app import app
+from trip_packer.events import EventBroker, event_stream, format_event, get_event_broker
+
+
+def _events(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_to_trip_subscribers():
+    broker = EventBroker()
+
+    async with broker.subscribe(1) as first, broker.subscribe(1) as second, broker.subscribe(2) as other:
+        await broker.publish(1, "packing.deleted", {"item_id": 3, "bag_id": 4})
+
+        expected = [{"type": "packing.deleted", "data": {"item_id": 3, "bag_id": 4}}]
+        assert _events(first) == expected
+        assert _events(second) == expected
+        assert _events(other) == []
+
+    assert broker.subscriber_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_broker_resets_slow_subscribers():
+    broker = EventBroker(max_queued=2)
+
+    async with broker.subscribe(1) as queue:
+        for item_id in range(3):
+            await broker.publish(1, "packing.deleted", {"item_id": item_id, "bag_id": 1})
+
+        assert _events(queue) == [{"type": "reset", "data": {}}]
+
+
+@pytest.mark.asyncio
+async def test_broker_reset_only_reaches_slow_subscriber():
+    broker = EventBroker(max_queued=2)
+    deleted = {"item_id": 1, "bag_id": 1}
+
+    async with broker.subscribe(1) as slow, broker.subscribe(1) as fast:
+        for _ in range(2):
+            await broker.publish(1, "packing.deleted", deleted)
+        _events(fast)
+
+        await broker.publish(1, "packing.deleted", deleted)
+
+        assert _events(slow) == [{"type": "reset", "data": {}}]
+        assert _events(fast) == [{"type": "packing.deleted", "data": deleted}]
+
+
+@pytest.mark.asyncio
+async def test_event_stream():
+    broker = EventBroker()
+    stream = event_stream(broker, 1, heartbeat_seconds=0.01)
+
+    assert await anext(stream) == ": connected\n\n"
+    assert await anext(stream) == ": heartbeat\n\n"
+
+    await broker.publish(1, "trip_item.deleted", {"item_id": 2})
+    assert await anext(stream) == format_event({"type": "trip_item.deleted", "data": {"item_id": 2}})
+
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert broker.subscriber_count() == 0
+
+
+def test_format_event():
+    event = {"type": "packing.deleted", "data": {"item_id": 1, "bag_id": 2}}
+
+    assert format_event(event) == f"event: packing.deleted\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_packing_writes_publish_events(client):
+    trip_data = {"name": "Family Trip", "start_date": "2024-07-01", "end_date": "2024-07-15"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    item_id = client.post("/api/items/", json={"name": "Towel", "category": "OTHER"}).json()["id"]
+    bag_id = client.post("/api/bags/", json={"name": "Beach Bag", "type": "BACKPACK"}).json()["id"]
+    broker = app.dependency_overrides[get_event_broker]()
+
+    async with broker.subscribe(trip_id) as queue:
+        client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+        client.put(f"/api/trips/{trip_id}/packing-list/{item_id}/{bag_id}", json={"status": "PACKED"})
+        client.delete(f"/api/trips/{trip_id}/packing-list/{item_id}/{bag_id}")
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id})
+
+        events = _events(queue)
+
+    assert [event["type"] for event in events] == [
+        "packing.created",
+        "packing.updated",
+        "packing.deleted",
+        "trip_item.created",
+    ]
+    assert events[1]["data"]["status"] == "PACKED"
+    assert events[2]["data"] == {"item_id": item_id, "bag_id": bag_id}
+
+
+def test_trip_events_nonexistent_trip(client):
+    response = client.get("/api/trips/999/events")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_status_updates_publish_one_reset(client):
+    trip_data = {"name": "Family Trip", "start_date": "2024-07-01", "end_date": "2024-07-15"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    bag_id = client.post("/api/bags/", json={"name": "Beach Bag", "type": "BACKPACK"}).json()["id"]
+    for name in ("Towel", "Sunscreen"):
+        item_id = client.post("/api/items/", json={"name": name, "category": "OTHER"}).json()["id"]
+        client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id})
+    broker = app.dependency_overrides[get_event_broker]()
+
+    async with broker.subscribe(trip_id) as queue:
+        client.patch(f"/api/trips/{trip_id}/packing-list/status", json={"status": "PACKED"})
+        client.patch(f"/api/trips/{trip_id}/trip-items/status", json={"status": "PACKED"})
+
+        events = _events(queue)
+
+    assert [event["type"] for event in events] == ["packing.reset", "trip_item.reset"]
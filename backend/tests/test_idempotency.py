@@ -0,0 +1,165 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import func, update
+
+from trip_packer.app import app
+from trip_packer.idempotency import IdempotencyMiddleware, IdempotencyStore, get_idempotency_store, hash_request
+from trip_packer.models import IdempotencyKey
+
+
+async def _expire_lease(store: IdempotencyStore, key: str):
+    async with store.engine.begin() as conn:
+        await conn.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(lease_expires_at=func.now() - timedelta(seconds=1))
+        )
+
+
+def test_retry_replays_first_response(client):
+    item_data = {"name": "Laptop", "category": "ELECTRONICS"}
+    headers = {"Idempotency-Key": "create-laptop"}
+
+    first = client.post("/api/items/", json=item_data, headers=headers)
+    retry = client.post("/api/items/", json=item_data, headers=headers)
+
+    assert first.status_code == HTTPStatus.CREATED
+    assert retry.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert len(client.get("/api/items/").json()) == 1
+
+
+def test_retry_replays_client_errors(client):
+    headers = {"Idempotency-Key": "missing-trip"}
+
+    first = client.put("/api/trips/999", json={"name": "Nowhere"}, headers=headers)
+    retry = client.put("/api/trips/999", json={"name": "Nowhere"}, headers=headers)
+
+    assert first.status_code == HTTPStatus.NOT_FOUND
+    assert retry.status_code == HTTPStatus.NOT_FOUND
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+def test_retry_replays_response_headers(session):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware)
+    store = IdempotencyStore(session.bind)
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+
+    @app.post("/things", status_code=HTTPStatus.CREATED)
+    def create_thing(response: Response):
+        response.headers["ETag"] = '"1"'
+        response.set_cookie("last_write", "1")
+        return {"id": 1}
+
+    headers = {"Idempotency-Key": "create-thing"}
+    with TestClient(app) as client:
+        first = client.post("/things", headers=headers)
+        retry = client.post("/things", headers=headers)
+
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.headers["etag"] == first.headers["etag"]
+    assert retry.headers["set-cookie"] == first.headers["set-cookie"]
+    assert retry.headers["content-type"] == "application/json"
+    assert retry.headers["content-length"] == first.headers["content-length"]
+
+
+def test_retry_takes_over_abandoned_key(client):
+    body = b'{"name": "Laptop", "category": "ELECTRONICS"}'
+    headers = {"Idempotency-Key": "create-laptop", "Content-Type": "application/json"}
+    scope = {"method": "POST", "path": "/api/items/", "query_string": b""}
+    store = app.dependency_overrides[get_idempotency_store]()
+
+    # The process that claimed the key died before answering, and its lease ran out
+    assert client.portal.call(store.claim, "create-laptop", hash_request(scope, body)) is None
+    client.portal.call(_expire_lease, store, "create-laptop")
+
+    response = client.post("/api/items/", content=body, headers=headers)
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert "idempotent-replayed" not in response.headers
+    assert [item["name"] for item in client.get("/api/items/").json()] == ["Laptop"]
+
+
+def test_key_reused_with_different_request(client):
+    headers = {"Idempotency-Key": "create-item"}
+    client.post("/api/items/", json={"name": "Laptop", "category": "ELECTRONICS"}, headers=headers)
+
+    response = client.post("/api/items/", json={"name": "Camisa", "category": "CLOTHING"}, headers=headers)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert len(client.get("/api/items/").json()) == 1
+
+
+def test_key_too_long(client):
+    response = client.post(
+        "/api/items/", json={"name": "Laptop", "category": "ELECTRONICS"}, headers={"Idempotency-Key": "k" * 256}
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_requests_without_key_are_not_stored(client):
+    item_data = {"name": "Laptop", "category": "ELECTRONICS"}
+    client.post("/api/items/", json=item_data)
+
+    response = client.post("/api/items/", json=item_data)
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_store_holds_key_until_complete(session):
+    store = IdempotencyStore(session.bind)
+    body = b'{"id": 1}'
+
+    assert await store.claim("key", "hash") is None
+    running = await store.claim("key", "hash")
+    assert running.status_code is None
+
+    await store.complete("key", HTTPStatus.CREATED, [["content-type", "application/json"]], body)
+    stored = await store.claim("key", "hash")
+
+    assert stored.status_code == HTTPStatus.CREATED
+    assert stored.headers == [["content-type", "application/json"]]
+    assert stored.body == body
+
+
+@pytest.mark.asyncio
+async def test_store_keeps_key_of_running_request_until_lease_expires(session):
+    store = IdempotencyStore(session.bind)
+
+    assert await store.claim("key", "hash") is None
+    assert (await store.claim("key", "hash")).status_code is None
+
+    await _expire_lease(store, "key")
+    assert (await store.claim("key", "other-hash")).request_hash == "hash"
+    assert await store.claim("key", "hash") is None
+    assert (await store.claim("key", "hash")).status_code is None
+
+
+@pytest.mark.asyncio
+async def test_store_release_lets_retry_claim(session):
+    store = IdempotencyStore(session.bind)
+
+    assert await store.claim("key", "hash") is None
+    await store.release("key")
+
+    assert await store.claim("key", "hash") is None
+
+
+@pytest.mark.asyncio
+async def test_store_reclaims_expired_key(session):
+    store = IdempotencyStore(session.bind, ttl_seconds=0)
+
+    assert await store.claim("key", "hash") is None
+    await store.complete("key", HTTPStatus.CREATED, [], b"{}")
+
+    assert await store.claim("key", "other-hash") is None
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from trip_packer.app import app
+from trip_packer.database import get_read_session
+
 
 def test_create_item(client):
     """Test creating a new item."""
@@ -25,6 +28,14 @@ def test_create_duplicate_item(client):
     assert response.status_code == HTTPStatus.CONFLICT
 
 
+def test_create_item_negative_size(client):
+    """Test items can't have a negative volume or weight."""
+    for field in ("volume_liters", "weight_kg"):
+        response = client.post("/api/items/", json={"name": "Test Item", "category": "CLOTHING", field: -1})
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 def test_get_items(client):
     """Test getting all items."""
     expected_items = 2
@@ -142,3 +153,116 @@ def test_delete_nonexistent_item(client):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert "not found" in response.json()["detail"]
+
+
+def test_get_items_fast(client):
+    """Test the fast listing returns the same items as the validated one."""
+    client.post("/api/items/", json={"name": "Laptop", "category": "ELECTRONICS"})
+    client.post("/api/items/", json={"name": "Shirt", "category": "CLOTHING"})
+
+    response = client.get("/api/items/?fast=true")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == client.get("/api/items/").json()
+
+
+def test_get_items_page(client):
+    """Test walking the item catalog with keyset pagination."""
+    names = ["Passport", "Charger", "Sunscreen", "Jacket", "Headphones"]
+    for name in names:
+        client.post("/api/items/", json={"name": name, "category": "OTHER"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "after": cursor}
+        response = client.get("/api/items/page", params=params)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        seen.extend(item["name"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == names
+
+
+def test_get_items_page_by_updated_at(client):
+    """Test keyset pagination ordered by last update."""
+    first_id = client.post("/api/items/", json={"name": "Passport", "category": "DOCUMENTS"}).json()["id"]
+    second_id = client.post("/api/items/", json={"name": "Charger", "category": "ELECTRONICS"}).json()["id"]
+
+    first_page = client.get("/api/items/page", params={"limit": 1, "order_by": "updated_at"}).json()
+    second_page = client.get(
+        "/api/items/page", params={"limit": 1, "order_by": "updated_at", "after": first_page["next_cursor"]}
+    ).json()
+
+    assert [item["id"] for item in first_page["items"] + second_page["items"]] == [first_id, second_id]
+    assert second_page["next_cursor"] is None
+
+
+def test_get_items_page_invalid_cursor(client):
+    """Test that malformed or mismatched cursors are rejected."""
+    client.post("/api/items/", json={"name": "Passport", "category": "DOCUMENTS"})
+    client.post("/api/items/", json={"name": "Charger", "category": "ELECTRONICS"})
+    cursor = client.get("/api/items/page", params={"limit": 1}).json()["next_cursor"]
+
+    response = client.get("/api/items/page", params={"after": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+    response = client.get("/api/items/page", params={"after": "é"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = client.get("/api/items/page", params={"after": cursor, "order_by": "updated_at"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_search_items(client):
+    """Test item search ranks prefix matches first and tolerates typos."""
+    phone_charger = {"name": "Phone Charger", "category": "ELECTRONICS"}
+    phone_charger_id = client.post("/api/items/", json=phone_charger).json()["id"]
+    charger_id = client.post("/api/items/", json={"name": "Charger", "category": "ELECTRONICS"}).json()["id"]
+    sunscreen_id = client.post("/api/items/", json={"name": "Sunscreen", "category": "TOILETRIES"}).json()["id"]
+
+    response = client.get("/api/items/search", params={"q": "charger"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["id"] for item in response.json()] == [charger_id, phone_charger_id]
+
+    response = client.get("/api/items/search", params={"q": "sunscren"})
+    assert [item["id"] for item in response.json()] == [sunscreen_id]
+
+    response = client.get("/api/items/search", params={"q": "charger", "category": "TOILETRIES"})
+    assert response.json() == []
+
+
+def test_autocomplete_items(client):
+    """Test autocomplete follows item writes."""
+    phone_charger = {"name": "Phone Charger", "category": "ELECTRONICS"}
+    phone_charger_id = client.post("/api/items/", json=phone_charger).json()["id"]
+    chapstick_id = client.post("/api/items/", json={"name": "Chapstick", "category": "TOILETRIES"}).json()["id"]
+
+    response = client.get("/api/items/autocomplete", params={"q": "cha"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["id"] for item in response.json()] == [chapstick_id, phone_charger_id]
+
+    client.put(f"/api/items/{chapstick_id}", json={"name": "Lip Balm"})
+    client.delete(f"/api/items/{phone_charger_id}")
+    lip_balm = client.get("/api/items/autocomplete", params={"q": "lip"}).json()
+
+    assert client.get("/api/items/autocomplete", params={"q": "cha"}).json() == []
+    assert lip_balm == [{"id": chapstick_id, "name": "Lip Balm", "category": "TOILETRIES"}]
+
+
+def test_cached_item_reads_use_the_primary(client):
+    """Cached item reads never go to a replica, which could refill the cache with stale rows."""
+    item_id = client.post("/api/items/", json={"name": "Laptop", "category": "ELECTRONICS"}).json()["id"]
+
+    def no_replica():
+        raise AssertionError("cached reads must not use a replica session")
+
+    app.dependency_overrides[get_read_session] = no_replica
+
+    assert client.get("/api/items/").status_code == HTTPStatus.OK
+    assert client.get(f"/api/items/{item_id}").status_code == HTTPStatus.OK
+    assert client.get("/api/items/autocomplete?q=lap").status_code == HTTPStatus.OK
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import func, update
+
+from trip_packer.app import app
+from trip_packer.events import get_event_broker
+from trip_packer.jobs import JobRunner
+from trip_packer.models import Job, JobStatus
+
+
+def _wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["finished_at"] is not None or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_clone_trip_job(client):
+    """Test cloning a trip in the background and fetching the result."""
+    trip_data = {"name": "Ski Week", "start_date": "2024-01-10", "end_date": "2024-01-17"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+
+    response = client.post("/api/jobs/", json={"kind": "CLONE_TRIP", "params": {"trip_id": trip_id, "name": "Copy"}})
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert response.json()["kind"] == "CLONE_TRIP"
+    job = _wait_for_job(client, response.json()["id"])
+    assert job["status"] == "SUCCEEDED"
+
+    result = client.get(f"/api/jobs/{job['id']}/result")
+    assert result.status_code == HTTPStatus.OK
+    assert result.json()["name"] == "Copy"
+    assert client.get(f"/api/trips/{result.json()['id']}").status_code == HTTPStatus.OK
+
+
+def test_job_failure(client):
+    """Test a job whose operation fails keeps the error."""
+    response = client.post("/api/jobs/", json={"kind": "ASSIGN_PACKING", "params": {"trip_id": 999}})
+
+    job = _wait_for_job(client, response.json()["id"])
+    assert job["status"] == "FAILED"
+    assert job["error"] == "Trip with id 999 not found"
+    assert client.get(f"/api/jobs/{job['id']}/result").status_code == HTTPStatus.CONFLICT
+
+
+def test_submit_job_invalid_params(client):
+    """Test params are validated when the job is submitted."""
+    response = client.post("/api/jobs/", json={"kind": "CLONE_TRIP", "params": {"name": "Copy"}})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_get_nonexistent_job(client):
+    """Test getting a job that doesn't exist."""
+    response = client.get("/api/jobs/999")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "not found" in response.json()["detail"]
+
+
+def test_cancel_finished_job(client):
+    """Test cancelling a job that already finished."""
+    response = client.post("/api/jobs/", json={"kind": "BULK_PACKING", "params": {"trip_id": 999, "packings": []}})
+    job = _wait_for_job(client, response.json()["id"])
+
+    response = client.delete(f"/api/jobs/{job['id']}")
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_job_runner_cancel(session):
+    """Test cancelling a running job and the concurrency limit."""
+    runner = JobRunner(session.bind, concurrency=1)
+    started = asyncio.Event()
+
+    async def slow(job_session, params):
+        started.set()
+        await asyncio.sleep(60)
+        return {}
+
+    async def quick(job_session, params):
+        return {"done": True}
+
+    slow_job = await runner.submit(session, "SLOW", {}, slow)
+    quick_job = await runner.submit(session, "QUICK", {}, quick)
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    # The single slot is taken, so the second job waits
+    await session.refresh(quick_job)
+    assert quick_job.status == JobStatus.PENDING
+
+    assert await runner.cancel(session, slow_job.id)
+    await runner.shutdown()
+
+    job = await session.get(Job, slow_job.id, populate_existing=True)
+    assert job.status == JobStatus.CANCELLED
+    assert not await runner.cancel(session, slow_job.id)
+
+
+@pytest.mark.asyncio
+async def test_job_runner_requeues_stale_jobs(session):
+    """Test unfinished jobs left by a stopped process run again, while live ones are left alone."""
+    runner = JobRunner(session.bind, heartbeat_seconds=10)
+    orphan = Job(kind="QUICK", params={}, status=JobStatus.RUNNING)
+    live = Job(kind="QUICK", params={}, status=JobStatus.RUNNING)
+    session.add_all([orphan, live])
+    await session.commit()
+    await session.execute(update(Job).where(Job.id == orphan.id).values(updated_at=func.now() - timedelta(minutes=5)))
+    await session.commit()
+
+    async def quick(job_session, params):
+        return {"done": True}
+
+    assert await runner.requeue_stale(lambda kind: quick) == [orphan.id]
+    await asyncio.gather(*runner._tasks.values())
+
+    job = await session.get(Job, orphan.id, populate_existing=True)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"done": True}
+    job = await session.get(Job, live.id, populate_existing=True)
+    assert job.status == JobStatus.RUNNING
+
+
+@pytest.mark.asyncio
+async def test_assign_packing_job_publishes_to_the_app_broker(client):
+    """Test a job publishes its changes to the broker the routes use."""
+    trip_data = {"name": "Ski Week", "start_date": "2024-01-10", "end_date": "2024-01-17"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    bag_id = client.post("/api/bags/", json={"name": "Duffel", "type": "CHECKED_LARGE"}).json()["id"]
+    client.post(f"/api/trips/{trip_id}/bags/{bag_id}")
+    broker = app.dependency_overrides[get_event_broker]()
+
+    async with broker.subscribe(trip_id) as queue:
+        response = client.post("/api/jobs/", json={"kind": "ASSIGN_PACKING", "params": {"trip_id": trip_id}})
+        job = _wait_for_job(client, response.json()["id"])
+
+        assert job["status"] == "SUCCEEDED"
+        assert queue.get_nowait()["type"] == "packing.reset"
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+from trip_packer.metrics import (
+    MetricsRegistry,
+    http_request_db_statements,
+    http_requests_total,
+    instrument_engine,
+)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job latency.", buckets=(0.1, 1.0))
+
+    counter.inc(kind='say "hi"')
+    histogram.observe(0.5)
+    histogram.observe(2)
+
+    output = registry.render()
+
+    assert "# TYPE jobs_total counter" in output
+    assert 'jobs_total{kind="say \\"hi\\""} 1' in output
+    assert 'job_seconds_bucket{le="0.1"} 0' in output
+    assert 'job_seconds_bucket{le="1.0"} 1' in output
+    assert 'job_seconds_bucket{le="+Inf"} 2' in output
+    assert "job_seconds_sum 2.5" in output
+    assert "job_seconds_count 2" in output
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/items/")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/items/",status="200"}' in response.text
+    assert "db_pool_checked_out" in response.text
+
+
+def test_metrics_count_sql_statements_per_route(client, engine):
+    instrument_engine(engine)
+    labels = {"method": "GET", "route": "/api/trips/{trip_id}"}
+    requests_before = http_requests_total.value(**labels, status=HTTPStatus.OK)
+    observations_before = http_request_db_statements.count(**labels)
+
+    trip_data = {"name": "Metrics Trip", "start_date": "2024-07-01", "end_date": "2024-07-15"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    client.get(f"/api/trips/{trip_id}")
+
+    assert http_requests_total.value(**labels, status=HTTPStatus.OK) == requests_before + 1
+    assert http_request_db_statements.count(**labels) == observations_before + 1
+    assert 'http_request_db_statements_bucket{method="GET",route="/api/trips/{trip_id}",le="1"}' in (
+        client.get("/metrics").text
+    )
+
+
+def test_metrics_unmatched_route(client):
+    client.get("/does-not-exist")
+
+    assert http_requests_total.value(method="GET", route="unmatched", status=HTTPStatus.NOT_FOUND) >= 1
@@ -0,0 +1,64 @@
+from trip_packer.models import LuggageType
+from trip_packer.optimizer import DEFAULT_BAG_LIMITS, BagSpace, PackableItem, assign_bags, bag_space
+
+
+def _packed(assignment):
+    return {bag.bag_id: sorted(item.item_id for item in bag.items) for bag in assignment.bags}
+
+
+def test_bag_space_falls_back_to_luggage_type_limits():
+    max_weight = 8.0
+    bag = bag_space(1, LuggageType.CARRY_ON, None, max_weight)
+
+    assert bag.capacity == DEFAULT_BAG_LIMITS[LuggageType.CARRY_ON][0]
+    assert bag.max_weight == max_weight
+
+
+def test_assign_bags_places_largest_items_first():
+    bags = [BagSpace(1, capacity=10, max_weight=100), BagSpace(2, capacity=20, max_weight=100)]
+    items = [
+        PackableItem(1, volume=4, weight=1),
+        PackableItem(2, volume=15, weight=1),
+        PackableItem(3, volume=8, weight=1),
+    ]
+
+    assignment = assign_bags(items, bags)
+
+    assert _packed(assignment) == {1: [3], 2: [1, 2]}
+    assert not assignment.unassigned
+
+
+def test_assign_bags_respects_weight_limits():
+    bags = [BagSpace(1, capacity=100, max_weight=10)]
+    items = [PackableItem(1, volume=1, weight=8), PackableItem(2, volume=1, weight=5)]
+
+    assignment = assign_bags(items, bags)
+
+    assert _packed(assignment) == {1: [1]}
+    assert [item.item_id for item in assignment.unassigned] == [2]
+
+
+def _leftover_case():
+    # First-fit decreasing fills the heavy-duty bag with items 1 and 3, leaving no bag able to carry item 2
+    bags = [BagSpace(1, capacity=10, max_weight=10), BagSpace(2, capacity=10, max_weight=2)]
+    items = [
+        PackableItem(1, volume=6, weight=1),
+        PackableItem(2, volume=5, weight=5),
+        PackableItem(3, volume=4, weight=1),
+    ]
+    return items, bags
+
+
+def test_assign_bags_moves_items_to_fit_leftovers():
+    assignment = assign_bags(*_leftover_case())
+
+    assert _packed(assignment) == {1: [2, 3], 2: [1]}
+    assert not assignment.unassigned
+    assert assignment.improved == 1
+
+
+def test_assign_bags_stops_improving_when_out_of_time():
+    assignment = assign_bags(*_leftover_case(), time_budget=0)
+
+    assert _packed(assignment) == {1: [1, 3], 2: []}
+    assert [item.item_id for item in assignment.unassigned] == [2]
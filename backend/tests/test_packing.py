@@ -1,6 +1,9 @@
+import csv
+import json
 from http import HTTPStatus
 
 import pytest
+from fastapi import WebSocketDisconnect, status
 
 
 async def _create_trip(client, name: str, start_date: str, end_date: str):
@@ -182,6 +185,105 @@ async def test_get_trip_packing(client):
         assert "type" in packing["bag"]
 
 
+@pytest.mark.asyncio
+async def test_get_trip_packing_fast(client):
+    """Test the fast listing returns the same packing entries as the validated one."""
+    trip_id = await _create_trip(client, "Summer Vacation", "2024-07-01", "2024-07-15")
+    bag_id = await _get_or_create_default_bag(client)
+    for name in ("Laptop", "Toothbrush"):
+        item_id = await _create_item(client, name, "ELECTRONICS")
+        client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+
+    response = client.get(f"/api/trips/{trip_id}/packing-list/?fast=true")
+
+    assert response.status_code == HTTPStatus.OK
+    assert "ETag" in response.headers
+    validated = client.get(f"/api/trips/{trip_id}/packing-list/").json()
+    assert sorted(response.json(), key=lambda entry: entry["item_id"]) == sorted(
+        validated, key=lambda entry: entry["item_id"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_trip_packing_conditional(client):
+    """Test revalidating a packing list with its ETag."""
+    trip_id = await _create_trip(client, "Polling Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    bag_id = await _get_or_create_default_bag(client)
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+
+    response = client.get(f"/api/trips/{trip_id}/packing-list/")
+    etag = response.headers["ETag"]
+
+    not_modified = client.get(f"/api/trips/{trip_id}/packing-list/", headers={"If-None-Match": etag})
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.headers["ETag"] == etag
+
+    # Packing the item changes the version of the list
+    client.patch(f"/api/trips/{trip_id}/packing-list/status", json={"status": "PACKED"})
+
+    modified = client.get(f"/api/trips/{trip_id}/packing-list/", headers={"If-None-Match": etag})
+
+    assert modified.status_code == HTTPStatus.OK
+    assert modified.headers["ETag"] != etag
+    assert modified.json()[0]["status"] == "PACKED"
+
+
+@pytest.mark.asyncio
+async def test_assign_packing(client):
+    """Test computing the bag of every trip item automatically."""
+    expected_assigned = 2
+    backpack_capacity = 5
+    trip_id = await _create_trip(client, "Assigned Trip", "2024-07-01", "2024-07-15")
+    backpack_data = {"name": "Small", "type": "BACKPACK", "capacity_liters": backpack_capacity}
+    backpack_id = client.post("/api/bags/", json=backpack_data).json()["id"]
+    suitcase_id = client.post("/api/bags/", json={"name": "Big", "type": "CHECKED_LARGE"}).json()["id"]
+    for bag_id in (backpack_id, suitcase_id):
+        client.post(f"/api/trips/{trip_id}/bags/{bag_id}")
+
+    tent_id = client.post("/api/items/", json={"name": "Tent", "category": "OTHER", "volume_liters": 60}).json()["id"]
+    book_id = client.post("/api/items/", json={"name": "Book", "category": "OTHER", "volume_liters": 1}).json()["id"]
+    piano_id = client.post("/api/items/", json={"name": "Piano", "category": "OTHER", "weight_kg": 300}).json()["id"]
+    for item_id in (tent_id, book_id, piano_id):
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id, "status": "PACKED"})
+
+    response = client.post(f"/api/trips/{trip_id}/packing-list/assign", json={"time_budget_ms": 50})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["assigned"] == expected_assigned
+    assert data["unassigned_item_ids"] == [piano_id]
+    loads = {bag["bag_id"]: bag for bag in data["bags"]}
+    assert tent_id in loads[suitcase_id]["item_ids"]
+    assert loads[backpack_id]["capacity_liters"] == backpack_capacity
+
+    packing = client.get(f"/api/trips/{trip_id}/packing-list/").json()
+    assert {(entry["item_id"], entry["status"]) for entry in packing} == {(tent_id, "PACKED"), (book_id, "PACKED")}
+
+
+@pytest.mark.asyncio
+async def test_assign_packing_without_bags(client):
+    """Test automatic assignment for a trip without bags."""
+    trip_id = await _create_trip(client, "Bagless Trip", "2024-07-01", "2024-07-15")
+
+    response = client.post(f"/api/trips/{trip_id}/packing-list/assign")
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "has no bags" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_assign_packing_time_budget_out_of_range(client):
+    """Test the time budget of automatic assignment is bounded."""
+    trip_id = await _create_trip(client, "Budget Trip", "2024-07-01", "2024-07-15")
+
+    for time_budget_ms in (-1, 60_000):
+        response = client.post(f"/api/trips/{trip_id}/packing-list/assign", json={"time_budget_ms": time_budget_ms})
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_get_trip_packing_nonexistent_trip(client):
     """Test getting packing entries for a nonexistent trip."""
@@ -191,6 +293,59 @@ async def test_get_trip_packing_nonexistent_trip(client):
     assert "Trip with id 999 not found" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_export_trip_packing_ndjson(client):
+    """Test streaming the packing list of a trip as NDJSON."""
+    shirt_quantity = 3
+    trip_id = await _create_trip(client, "Export Trip", "2024-07-01", "2024-07-15")
+    laptop_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    shirt_id = await _create_item(client, "Shirt", "CLOTHING")
+    bag_id = await _get_or_create_default_bag(client)
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": laptop_id, "bag_id": bag_id})
+    shirt_data = {"item_id": shirt_id, "bag_id": bag_id, "quantity": shirt_quantity}
+    client.post(f"/api/trips/{trip_id}/packing-list/", json=shirt_data)
+
+    response = client.get(f"/api/trips/{trip_id}/packing-list/export")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["item_name"] for row in rows] == ["Laptop", "Shirt"]
+    assert rows[1]["quantity"] == shirt_quantity
+    assert rows[1]["item_category"] == "CLOTHING"
+    assert rows[1]["status"] == "UNPACKED"
+    assert rows[1]["bag_name"] == "Default Bag"
+
+
+@pytest.mark.asyncio
+async def test_export_trip_packing_csv(client):
+    """Test streaming the packing list of a trip as CSV."""
+    trip_id = await _create_trip(client, "Export Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    bag_id = await _get_or_create_default_bag(client)
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id, "status": "PACKED"})
+
+    response = client.get(f"/api/trips/{trip_id}/packing-list/export?format=csv")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert f"trip-{trip_id}-packing-list.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert len(rows) == 1
+    assert rows[0]["item_id"] == str(item_id)
+    assert rows[0]["status"] == "PACKED"
+    assert rows[0]["bag_type"] == "BACKPACK"
+
+
+@pytest.mark.asyncio
+async def test_export_trip_packing_nonexistent_trip(client):
+    """Test exporting the packing list of a nonexistent trip."""
+    response = client.get("/api/trips/999/packing-list/export")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "Trip with id 999 not found" in response.json()["detail"]
+
+
 @pytest.mark.asyncio
 async def test_update_packing(client):
     """Test updating a packing entry."""
@@ -402,3 +557,227 @@ async def test_delete_packing_nonexistent_entry_with_bag_id(client):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json()["detail"] == f"Packing entry for item {item_id} in trip {trip_id} and bag {bag_id} not found"
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_packing(client):
+    """Test creating and updating packing entries in a single request."""
+    expected_quantity = 3
+    trip_id = await _create_trip(client, "Bulk Trip", "2024-07-01", "2024-07-15")
+    item1_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    item2_id = await _create_item(client, "Toothbrush", "TOILETRIES")
+    bag_id = await _get_or_create_default_bag(client)
+
+    client.post(
+        f"/api/trips/{trip_id}/packing-list/",
+        json={"item_id": item1_id, "bag_id": bag_id, "quantity": 1, "status": "UNPACKED"},
+    )
+
+    packings_data = [
+        {"item_id": item1_id, "bag_id": bag_id, "quantity": expected_quantity, "status": "PACKED"},
+        {"item_id": item2_id, "bag_id": bag_id, "quantity": 2, "status": "UNPACKED"},
+    ]
+    response = client.post(f"/api/trips/{trip_id}/packing-list/bulk", json=packings_data)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["created"] == 1
+    assert data["updated"] == 1
+    assert data["failed"] == 0
+    assert [result["outcome"] for result in data["results"]] == ["UPDATED", "CREATED"]
+    assert data["results"][0]["packing"]["quantity"] == expected_quantity
+    assert data["results"][0]["packing"]["status"] == "PACKED"
+
+    get_response = client.get(f"/api/trips/{trip_id}/packing-list/")
+    assert len(get_response.json()) == len(packings_data)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_packing_reports_row_errors(client):
+    """Test that invalid rows are reported without failing the whole batch."""
+    expected_quantity = 4
+    trip_id = await _create_trip(client, "Bulk Errors Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    bag_id = await _get_or_create_default_bag(client)
+
+    packings_data = [
+        {"item_id": 999, "bag_id": bag_id},
+        {"item_id": item_id, "bag_id": 999},
+        {"item_id": item_id, "bag_id": bag_id, "quantity": 1},
+        {"item_id": item_id, "bag_id": bag_id, "quantity": expected_quantity},
+    ]
+    response = client.post(f"/api/trips/{trip_id}/packing-list/bulk", json=packings_data)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["created"] == 1
+    assert data["failed"] == len(packings_data) - 1
+    assert [result["outcome"] for result in data["results"]] == ["NOT_FOUND", "NOT_FOUND", "DUPLICATE", "CREATED"]
+    assert data["results"][0]["detail"] == "Item with id 999 not found"
+    assert data["results"][1]["detail"] == "Bag with id 999 not found"
+    assert data["results"][3]["packing"]["quantity"] == expected_quantity
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_packing_without_upsert(client):
+    """Test that existing entries are reported as conflicts when upsert is disabled."""
+    trip_id = await _create_trip(client, "Bulk Conflict Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    bag_id = await _get_or_create_default_bag(client)
+
+    packing_data = {"item_id": item_id, "bag_id": bag_id, "quantity": 1, "status": "UNPACKED"}
+    client.post(f"/api/trips/{trip_id}/packing-list/", json=packing_data)
+
+    response = client.post(f"/api/trips/{trip_id}/packing-list/bulk?upsert=false", json=[packing_data])
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["failed"] == 1
+    assert data["results"][0]["outcome"] == "CONFLICT"
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_packing_nonexistent_trip(client):
+    """Test bulk packing for a nonexistent trip."""
+    response = client.post("/api/trips/999/packing-list/bulk", json=[])
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "Trip with id 999 not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_update_packing_status_by_bag(client):
+    """Test marking every entry of a single bag as packed."""
+    expected_updated = 2
+    trip_id = await _create_trip(client, "Status Trip", "2024-07-01", "2024-07-15")
+    item1_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    item2_id = await _create_item(client, "Toothbrush", "TOILETRIES")
+    bag1_id = await _create_bag(client, "Bag A", "BACKPACK")
+    bag2_id = await _create_bag(client, "Bag B", "CARRY_ON")
+
+    for item_id in (item1_id, item2_id):
+        client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag1_id})
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item1_id, "bag_id": bag2_id})
+
+    response = client.patch(f"/api/trips/{trip_id}/packing-list/status", json={"status": "PACKED", "bag_id": bag1_id})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["updated"] == len(data["packings"]) == expected_updated
+    assert all(packing["bag_id"] == bag1_id for packing in data["packings"])
+    assert all(packing["status"] == "PACKED" for packing in data["packings"])
+
+    get_response = client.get(f"/api/trips/{trip_id}/packing-list/")
+    statuses = {(packing["item_id"], packing["bag_id"]): packing["status"] for packing in get_response.json()}
+    assert statuses[item1_id, bag2_id] == "UNPACKED"
+    assert statuses[item2_id, bag1_id] == "PACKED"
+
+
+@pytest.mark.asyncio
+async def test_update_packing_status_by_category_and_current_status(client):
+    """Test filtering a bulk status transition by category and current status."""
+    trip_id = await _create_trip(client, "Status Filter Trip", "2024-07-01", "2024-07-15")
+    laptop_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    charger_id = await _create_item(client, "Charger", "ELECTRONICS")
+    shirt_id = await _create_item(client, "Shirt", "CLOTHING")
+    bag_id = await _get_or_create_default_bag(client)
+
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": laptop_id, "bag_id": bag_id})
+    client.post(
+        f"/api/trips/{trip_id}/packing-list/", json={"item_id": charger_id, "bag_id": bag_id, "status": "TO_BUY"}
+    )
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": shirt_id, "bag_id": bag_id})
+
+    status_update = {"status": "PACKED", "category": "ELECTRONICS", "current_status": "UNPACKED"}
+    response = client.patch(f"/api/trips/{trip_id}/packing-list/status", json=status_update)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["updated"] == 1
+    assert data["packings"][0]["item_id"] == laptop_id
+
+
+@pytest.mark.asyncio
+async def test_update_packing_status_count_only(client):
+    """Test resetting a whole trip without returning the changed rows."""
+    trip_id = await _create_trip(client, "Reset Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    bag_id = await _get_or_create_default_bag(client)
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id, "status": "PACKED"})
+
+    response = client.patch(f"/api/trips/{trip_id}/packing-list/status?include_rows=false", json={"status": "UNPACKED"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"updated": 1, "packings": []}
+
+
+@pytest.mark.asyncio
+async def test_update_packing_status_nonexistent_trip(client):
+    """Test a bulk status transition for a nonexistent trip."""
+    response = client.patch("/api/trips/999/packing-list/status", json={"status": "PACKED"})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "Trip with id 999 not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_toggle_packing(client):
+    """Test repeated toggles of the same entry are written once with the last status."""
+    trip_id = await _create_trip(client, "Toggle Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Sunglasses", "ACCESSORIES")
+    bag_id = await _create_bag(client, "Toggle Bag", "BACKPACK")
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+
+    toggles = [
+        {"item_id": item_id, "bag_id": bag_id, "status": "PACKED"},
+        {"item_id": item_id, "bag_id": bag_id, "status": "UNPACKED"},
+        {"item_id": item_id, "bag_id": bag_id, "status": "PACKED"},
+        {"item_id": 999, "bag_id": bag_id, "status": "PACKED"},
+    ]
+    response = client.patch(f"/api/trips/{trip_id}/packing-list/toggles", json=toggles)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["updated"] == 1
+    assert [result["packing"]["status"] for result in data["results"][:3]] == ["PACKED"] * 3
+    assert data["results"][3] == {"item_id": 999, "bag_id": bag_id, "packing": None}
+    packing = client.get(f"/api/trips/{trip_id}/packing-list/").json()
+    assert packing[0]["status"] == "PACKED"
+
+
+@pytest.mark.asyncio
+async def test_toggle_packing_websocket(client):
+    """Test toggles sent over a websocket are acknowledged with the written state."""
+    trip_id = await _create_trip(client, "Socket Trip", "2024-07-01", "2024-07-15")
+    item_id = await _create_item(client, "Hat", "CLOTHING")
+    bag_id = await _create_bag(client, "Socket Bag", "BACKPACK")
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": item_id, "bag_id": bag_id})
+
+    with client.websocket_connect(f"/api/trips/{trip_id}/packing-list/toggles/ws") as websocket:
+        websocket.send_json([{"item_id": item_id, "bag_id": bag_id, "status": "PACKED"}])
+        acknowledgement = websocket.receive_json()
+        websocket.send_json([{"item_id": item_id, "status": "PACKED"}])
+        error = websocket.receive_json()
+
+    assert acknowledgement["updated"] == 1
+    assert acknowledgement["results"][0]["packing"]["status"] == "PACKED"
+    assert error["detail"][0]["loc"] == [0, "bag_id"]
+
+
+def test_toggle_packing_ws_nonexistent_trip(client):
+    """Test the toggle socket of a nonexistent trip is refused."""
+    with (
+        pytest.raises(WebSocketDisconnect) as exc_info,
+        client.websocket_connect("/api/trips/999/packing-list/toggles/ws"),
+    ):
+        pass
+
+    assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_toggle_packing_nonexistent_trip(client):
+    """Test toggling entries of a nonexistent trip."""
+    toggles = [{"item_id": 1, "bag_id": 1, "status": "PACKED"}]
+    response = client.patch("/api/trips/999/packing-list/toggles", json=toggles)
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from trip_packer.models import Packing, TripBag, TripItem
+
+TRIPS = 200
+ITEMS = 2000
+BAGS = 50
+ITEMS_PER_TRIP = 100
+
+SEED_STATEMENTS = [
+    f"INSERT INTO trips (name, start_date, end_date) "
+    f"SELECT 'Trip ' || n, now(), now() FROM generate_series(1, {TRIPS}) AS n",
+    f"INSERT INTO items (name, category) SELECT 'Item ' || n, 'OTHER' FROM generate_series(1, {ITEMS}) AS n",
+    f"INSERT INTO bags (name, type) SELECT 'Bag ' || n, 'BACKPACK' FROM generate_series(1, {BAGS}) AS n",
+    f"INSERT INTO trip_bags (trip_id, bag_id) "
+    f"SELECT t, b FROM generate_series(1, {TRIPS}) AS t, generate_series(1, 5) AS s, "
+    f"LATERAL (SELECT (t * 5 + s) % {BAGS} + 1 AS b) AS bag",
+    f"INSERT INTO trip_items (trip_id, item_id, quantity, status) "
+    f"SELECT t, (t * {ITEMS_PER_TRIP} + s) % {ITEMS} + 1, 1, 'UNPACKED' "
+    f"FROM generate_series(1, {TRIPS}) AS t, generate_series(1, {ITEMS_PER_TRIP}) AS s",
+    f"INSERT INTO packings (trip_id, item_id, bag_id, quantity, status) "
+    f"SELECT trip_id, item_id, item_id % {BAGS} + 1, 1, 'UNPACKED' FROM trip_items",
+    "ANALYZE",
+]
+
+# Lookups issued by the routers, including the ones SQLAlchemy runs when deleting an item or a bag
+HOT_QUERIES = {
+    "packings by trip": select(Packing).where(Packing.trip_id == 1),
+    "packings by item": select(Packing).where(Packing.item_id == 1),
+    "packings by bag": select(Packing).where(Packing.bag_id == 1),
+    "trips using a bag": select(Packing.trip_id).where(Packing.bag_id == 1).distinct(),
+    "trip items by trip": select(TripItem).where(TripItem.trip_id == 1),
+    "trip items by item": select(TripItem).where(TripItem.item_id == 1),
+    "trip bags by bag": select(TripBag).where(TripBag.bag_id == 1),
+}
+
+
+def _node_types(plan):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from _node_types(child)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query_name", HOT_QUERIES)
+async def test_hot_queries_use_indexes(session, query_name):
+    for statement in SEED_STATEMENTS:
+        await session.execute(text(statement))
+    await session.commit()
+
+    query = HOT_QUERIES[query_name].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+    plan = result.scalar_one()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+
+    assert "Seq Scan" not in set(_node_types(plan[0]["Plan"]))
@@ -0,0 +1,44 @@
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from trip_packer.startup import ALEMBIC_INI, migrate, pending_migrations
+
+
+def _sync_engine(engine):
+    return create_engine(engine.url.render_as_string(hide_password=False), poolclass=NullPool)
+
+
+def test_pending_migrations_compares_revision_with_heads(engine):
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    head = script.get_current_head()
+
+    with _sync_engine(engine).connect() as connection:
+        assert pending_migrations(connection, script)
+
+        connection.execute(text("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+        assert not pending_migrations(connection, script)
+
+        connection.rollback()
+
+
+def test_migrate_skips_upgrade_at_head(engine, monkeypatch):
+    config = Config(str(ALEMBIC_INI))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    sync_engine = _sync_engine(engine)
+
+    with sync_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+
+    upgrades = []
+    monkeypatch.setattr("trip_packer.startup.command.upgrade", lambda *args: upgrades.append(args))
+
+    try:
+        assert migrate(sync_engine.url.render_as_string(hide_password=False), config) is False
+        assert upgrades == []
+    finally:
+        with sync_engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+
+from trip_packer.database import settings
+from trip_packer.models import Tombstone
+from trip_packer.sync import purge_tombstones
+
+
+def test_sync_without_watermark(client):
+    """Test the first sync returns every row."""
+    trip_data = {"name": "Road Trip", "start_date": "2024-05-01", "end_date": "2024-05-05"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    item_id = client.post("/api/items/", json={"name": "Map", "category": "DOCUMENTS"}).json()["id"]
+    client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id})
+
+    response = client.get("/api/sync/")
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [trip["id"] for trip in data["trips"]] == [trip_id]
+    assert [item["id"] for item in data["items"]] == [item_id]
+    assert [(entry["trip_id"], entry["item_id"]) for entry in data["trip_items"]] == [(trip_id, item_id)]
+    assert data["deleted"] == []
+    assert data["watermark"]
+
+
+def test_sync_since_watermark(client, monkeypatch):
+    """Test a sync from a watermark returns only the changes made after it."""
+    monkeypatch.setattr(settings, "SYNC_OVERLAP_SECONDS", 0)
+    old_item_id = client.post("/api/items/", json={"name": "Old Map", "category": "DOCUMENTS"}).json()["id"]
+    kept_item_id = client.post("/api/items/", json={"name": "Compass", "category": "ACCESSORIES"}).json()["id"]
+    watermark = client.get("/api/sync/").json()["watermark"]
+
+    new_item_id = client.post("/api/items/", json={"name": "New Map", "category": "DOCUMENTS"}).json()["id"]
+    client.delete(f"/api/items/{old_item_id}")
+
+    data = client.get("/api/sync/", params={"since": watermark}).json()
+
+    item_ids = [item["id"] for item in data["items"]]
+    assert new_item_id in item_ids
+    assert kept_item_id not in item_ids
+    assert [(entry["table_name"], entry["key"]) for entry in data["deleted"]] == [("items", {"id": old_item_id})]
+    assert data["watermark"] >= watermark
+
+
+def test_sync_pages_with_cursor(client):
+    """Test a sync is split into pages followed through next_cursor, all with the first page's watermark."""
+    item_ids = [
+        client.post("/api/items/", json={"name": f"Item {index}", "category": "DOCUMENTS"}).json()["id"]
+        for index in range(5)
+    ]
+    page_size = 2
+
+    pages = [client.get("/api/sync/", params={"limit": page_size}).json()]
+    while pages[-1]["next_cursor"]:
+        pages.append(client.get("/api/sync/", params={"cursor": pages[-1]["next_cursor"], "limit": page_size}).json())
+
+    assert [item["id"] for page in pages for item in page["items"]] == item_ids
+    assert all(len(page["items"]) <= page_size for page in pages)
+    assert {page["watermark"] for page in pages} == {pages[0]["watermark"]}
+
+
+def test_sync_invalid_cursor(client):
+    response = client.get("/api/sync/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_sync_limit_is_bounded(client):
+    response = client.get("/api/sync/", params={"limit": settings.SYNC_MAX_PAGE_SIZE + 1})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_sync_behind_tombstone_retention(client):
+    """Test a client further behind than the tombstone retention is told to start over."""
+    since = datetime.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+
+    response = client.get("/api/sync/", params={"since": since.isoformat()})
+
+    assert response.status_code == HTTPStatus.GONE
+
+
+@pytest.mark.asyncio
+async def test_purge_tombstones(session):
+    session.add(Tombstone(table_name="items", key={"id": 1}))
+    await session.commit()
+
+    assert await purge_tombstones(session.bind, timedelta(days=1)) == 0
+    assert await purge_tombstones(session.bind, timedelta(0)) == 1
@@ -108,6 +108,24 @@ async def test_get_trip_items(client):
         assert "category" in item["item"]
 
 
+@pytest.mark.asyncio
+async def test_get_trip_items_fast(client):
+    """Test the fast listing returns the same trip items as the validated one."""
+    trip_id = await _create_trip(client, "Summer Vacation", "2024-07-01", "2024-07-15")
+    for name in ("Laptop", "Charger"):
+        item_id = await _create_item(client, name, "ELECTRONICS")
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id, "quantity": 2})
+
+    response = client.get(f"/api/trips/{trip_id}/trip-items/?fast=true")
+
+    assert response.status_code == HTTPStatus.OK
+    validated = client.get(f"/api/trips/{trip_id}/trip-items/").json()
+    assert sorted(response.json(), key=lambda entry: entry["item_id"]) == sorted(
+        validated, key=lambda entry: entry["item_id"]
+    )
+    assert response.json()[0]["item"]["category"] == "ELECTRONICS"
+
+
 @pytest.mark.asyncio
 async def test_get_trip_items_nonexistent_trip(client):
     """Test getting trip item entries for a nonexistent trip."""
@@ -190,3 +208,62 @@ async def test_delete_trip_item_nonexistent_trip(client):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert "Trip with id 999 not found" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_update_trip_item_status(client):
+    """Test resetting every trip item of a trip in one request."""
+    expected_updated = 2
+    trip_id = await _create_trip(client, "Reset Trip", "2024-07-01", "2024-07-15")
+    item1_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    item2_id = await _create_item(client, "Shirt", "CLOTHING")
+
+    for item_id in (item1_id, item2_id):
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id, "status": ItemStatus.PACKED})
+
+    response = client.patch(f"/api/trips/{trip_id}/trip-items/status", json={"status": ItemStatus.UNPACKED})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["updated"] == len(data["trip_items"]) == expected_updated
+    assert all(trip_item["status"] == ItemStatus.UNPACKED for trip_item in data["trip_items"])
+
+    get_response = client.get(f"/api/trips/{trip_id}/trip-items/")
+    assert all(trip_item["status"] == ItemStatus.UNPACKED for trip_item in get_response.json())
+
+
+@pytest.mark.asyncio
+async def test_update_trip_item_status_filters(client):
+    """Test filtering a bulk trip item status transition by category, bag and current status."""
+    trip_id = await _create_trip(client, "Filter Trip", "2024-07-01", "2024-07-15")
+    laptop_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    charger_id = await _create_item(client, "Charger", "ELECTRONICS")
+    shirt_id = await _create_item(client, "Shirt", "CLOTHING")
+    bag_id = client.post("/api/bags/", json={"name": "Backpack", "type": "BACKPACK"}).json()["id"]
+
+    for item_id in (laptop_id, charger_id, shirt_id):
+        client.post(f"/api/trips/{trip_id}/trip-items/", json={"item_id": item_id})
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": laptop_id, "bag_id": bag_id})
+    client.post(f"/api/trips/{trip_id}/packing-list/", json={"item_id": shirt_id, "bag_id": bag_id})
+
+    status_update = {"status": ItemStatus.PACKED, "category": "ELECTRONICS", "bag_id": bag_id}
+    response = client.patch(f"/api/trips/{trip_id}/trip-items/status", json=status_update)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["updated"] == 1
+    assert data["trip_items"][0]["item_id"] == laptop_id
+
+    status_update = {"status": ItemStatus.TO_BUY, "current_status": ItemStatus.UNPACKED}
+    response = client.patch(f"/api/trips/{trip_id}/trip-items/status?include_rows=false", json=status_update)
+
+    assert response.json() == {"updated": 2, "trip_items": []}
+
+
+@pytest.mark.asyncio
+async def test_update_trip_item_status_nonexistent_trip(client):
+    """Test a bulk trip item status transition for a nonexistent trip."""
+    response = client.patch("/api/trips/999/trip-items/status", json={"status": ItemStatus.PACKED})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "Trip with id 999 not found" in response.json()["detail"]
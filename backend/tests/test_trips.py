@@ -86,6 +86,32 @@ def test_get_trips(client):
     assert all("end_date" in trip for trip in data)
 
 
+def test_get_trips_fast(client):
+    """Test the fast listing returns the same trips as the validated one."""
+    client.post("/api/trips/", json={"name": "Trip 1", "start_date": "2024-07-01", "end_date": "2024-07-15"})
+    client.post("/api/trips/", json={"name": "Trip 2", "start_date": "2024-08-01", "end_date": "2024-08-15"})
+
+    response = client.get("/api/trips/?fast=true")
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data == client.get("/api/trips/").json()
+    assert data[0]["start_date"] == "2024-07-01"
+
+
+def test_get_trips_page(client):
+    """Test fetching trips with keyset pagination."""
+    names = ["Business Trip", "Weekend Getaway", "Family Vacation"]
+    for name in names:
+        client.post("/api/trips/", json={"name": name, "start_date": "2024-06-01", "end_date": "2024-06-05"})
+
+    first_page = client.get("/api/trips/page", params={"limit": 2}).json()
+    second_page = client.get("/api/trips/page", params={"limit": 2, "after": first_page["next_cursor"]}).json()
+
+    assert [trip["name"] for trip in first_page["items"] + second_page["items"]] == names
+    assert second_page["next_cursor"] is None
+
+
 @pytest.mark.asyncio
 async def test_get_single_trip(client):
     """Test getting a single trip by ID."""
@@ -123,6 +149,35 @@ async def test_get_single_trip(client):
     assert "item" in trip_item_entry
 
 
+@pytest.mark.asyncio
+async def test_get_single_trip_conditional(client):
+    """Test revalidating a trip detail with its ETag."""
+    trip_data = {"name": "Polling Trip", "start_date": "2024-09-15", "end_date": "2024-09-22"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+
+    response = client.get(f"/api/trips/{trip_id}")
+    etag = response.headers["ETag"]
+
+    assert etag.startswith('W/"')
+    assert "Last-Modified" in response.headers
+
+    not_modified = client.get(f"/api/trips/{trip_id}", headers={"If-None-Match": etag})
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.headers["ETag"] == etag
+    assert not not_modified.content
+
+    # Adding an item to the trip changes its version
+    item_id = await _create_item(client, "Camera", "ELECTRONICS")
+    await _create_trip_item(client, trip_id, {"item_id": item_id, "quantity": 1})
+
+    modified = client.get(f"/api/trips/{trip_id}", headers={"If-None-Match": etag})
+
+    assert modified.status_code == HTTPStatus.OK
+    assert modified.headers["ETag"] != etag
+    assert len(modified.json()["trip_items"]) == 1
+
+
 def test_get_nonexistent_trip(client):
     """Test getting a trip that doesn't exist."""
     response = client.get("/api/trips/999")
@@ -131,6 +186,57 @@ def test_get_nonexistent_trip(client):
     assert "not found" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_get_trip_summary(client):
+    """Test the packing progress summary of a trip."""
+    trip_data = {"name": "Summary Trip", "start_date": "2024-09-15", "end_date": "2024-09-22"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    laptop_id = await _create_item(client, "Laptop", "ELECTRONICS")
+    shirt_id = await _create_item(client, "Shirt", "CLOTHING")
+    bag_id = await _create_bag(client, "Backpack", "BACKPACK")
+
+    await _create_packing(client, trip_id, {"item_id": laptop_id, "bag_id": bag_id, "status": "PACKED"})
+    await _create_packing(client, trip_id, {"item_id": shirt_id, "bag_id": bag_id, "quantity": 3})
+    await _create_trip_item(client, trip_id, {"item_id": shirt_id, "quantity": 2, "status": "TO_BUY"})
+
+    response = client.get(f"/api/trips/{trip_id}/summary")
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    packings = data["packings"]
+    assert packings["total"] == {"count": 2, "quantity": 4}
+    assert {entry["status"]: entry["quantity"] for entry in packings["by_status"]} == {"PACKED": 1, "UNPACKED": 3}
+    assert {entry["category"]: entry["count"] for entry in packings["by_category"]} == {
+        "ELECTRONICS": 1,
+        "CLOTHING": 1,
+    }
+    assert packings["by_bag"] == [{"bag_id": bag_id, "count": 2, "quantity": 4}]
+
+    trip_items = data["trip_items"]
+    assert trip_items["total"] == {"count": 1, "quantity": 2}
+    assert trip_items["by_status"] == [{"status": "TO_BUY", "count": 1, "quantity": 2}]
+    assert "by_bag" not in trip_items
+
+
+def test_get_trip_summary_empty(client):
+    """Test the summary of a trip without any entries."""
+    trip_data = {"name": "Empty Trip", "start_date": "2024-09-15", "end_date": "2024-09-22"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+
+    response = client.get(f"/api/trips/{trip_id}/summary")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["packings"]["total"] == {"count": 0, "quantity": 0}
+
+
+def test_get_trip_summary_nonexistent_trip(client):
+    """Test the summary of a trip that doesn't exist."""
+    response = client.get("/api/trips/999/summary")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "not found" in response.json()["detail"]
+
+
 def test_update_trip(client):
     """Test updating an existing trip."""
     # Create a trip
@@ -208,6 +314,72 @@ def test_delete_nonexistent_trip(client):
     assert "not found" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_clone_trip(client):
+    """Test copying a trip with its bags, items and packing list."""
+    quantity = 2
+    trip_data = {"name": "Ski Week", "start_date": "2024-01-10", "end_date": "2024-01-17"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    item_id = await _create_item(client, "Goggles", "ACCESSORIES")
+    bag_id = await _create_bag(client, "Ski Bag", "CHECKED_LARGE")
+    client.post(f"/api/trips/{trip_id}/bags/{bag_id}")
+    await _create_trip_item(client, trip_id, {"item_id": item_id, "quantity": quantity, "status": "PACKED"})
+    await _create_packing(client, trip_id, {"item_id": item_id, "bag_id": bag_id, "status": "PACKED"})
+
+    clone_data = {"name": "Ski Week 2025", "start_date": "2025-01-10", "end_date": "2025-01-17"}
+    response = client.post(f"/api/trips/{trip_id}/clone", json=clone_data)
+
+    assert response.status_code == HTTPStatus.CREATED
+    data = response.json()
+    assert data["name"] == "Ski Week 2025"
+    assert data["start_date"] == "2025-01-10"
+    assert (data["copied_bags"], data["copied_trip_items"], data["copied_packings"]) == (1, 1, 1)
+
+    clone = client.get(f"/api/trips/{data['id']}").json()
+    assert [bag["id"] for bag in clone["bags"]] == [bag_id]
+    assert clone["trip_items"][0]["quantity"] == quantity
+    assert clone["trip_items"][0]["status"] == "PACKED"
+
+
+@pytest.mark.asyncio
+async def test_clone_trip_reset_status(client):
+    """Test copying a trip with every status reset to unpacked."""
+    trip_data = {"name": "Ski Week", "start_date": "2024-01-10", "end_date": "2024-01-17"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+    item_id = await _create_item(client, "Goggles", "ACCESSORIES")
+    bag_id = await _create_bag(client, "Ski Bag", "CHECKED_LARGE")
+    await _create_trip_item(client, trip_id, {"item_id": item_id, "status": "PACKED"})
+    await _create_packing(client, trip_id, {"item_id": item_id, "bag_id": bag_id, "status": "PACKED"})
+
+    response = client.post(f"/api/trips/{trip_id}/clone", json={"name": "Ski Template", "reset_status": True})
+
+    assert response.status_code == HTTPStatus.CREATED
+    clone_id = response.json()["id"]
+    assert response.json()["start_date"] == "2024-01-10"
+    packing = client.get(f"/api/trips/{clone_id}/packing-list/").json()
+    assert [entry["status"] for entry in packing] == ["UNPACKED"]
+    trip_items = client.get(f"/api/trips/{clone_id}/trip-items/").json()
+    assert [entry["status"] for entry in trip_items] == ["UNPACKED"]
+
+
+def test_clone_trip_duplicate_name(client):
+    """Test copying a trip under a name already in use."""
+    trip_data = {"name": "Ski Week", "start_date": "2024-01-10", "end_date": "2024-01-17"}
+    trip_id = client.post("/api/trips/", json=trip_data).json()["id"]
+
+    response = client.post(f"/api/trips/{trip_id}/clone", json={"name": "Ski Week"})
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_clone_nonexistent_trip(client):
+    """Test copying a trip that doesn't exist."""
+    response = client.post("/api/trips/999/clone", json={"name": "Copy"})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "not found" in response.json()["detail"]
+
+
 def test_get_trip_bags_empty(client):
     """Test getting bags for a trip with no bags."""
     # Create a trip
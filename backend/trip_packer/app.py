@@ -1,17 +1,79 @@
 import asyncio
 import sys
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+from typing import Annotated
 
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, Depends, FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from trip_packer.routers import bags, items, packing, trip_items, trips
+from trip_packer.autocomplete import get_item_index
+from trip_packer.cache import get_catalog_cache
+from trip_packer.compression import CompressionMiddleware
+from trip_packer.database import engine, pool_metrics, pool_status, settings
+from trip_packer.events import get_event_broker
+from trip_packer.idempotency import IdempotencyMiddleware
+from trip_packer.jobs import get_job_runner
+from trip_packer.metrics import MetricsMiddleware, registry
+from trip_packer.readiness import Readiness, get_readiness
+from trip_packer.routers import bags, items, jobs, packing, sync, trip_items, trips
+from trip_packer.schemas import JobKind, PoolStatus, ReadinessStatus
+from trip_packer.sync import purge_tombstones_periodically
 
-app = FastAPI()
+
+def _dependency(app: FastAPI, dependency):
+    # Background work started here uses the same instances the routes get, overrides included
+    return app.dependency_overrides.get(dependency, dependency)()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_runner = _dependency(app, get_job_runner)
+    events = _dependency(app, get_event_broker)
+    job_runner.start(lambda kind: jobs.job_handler(JobKind(kind), events))
+    # Warmed in the background, so liveness checks pass while readiness still holds traffic back
+    readiness = _dependency(app, get_readiness)
+    warm_up = asyncio.create_task(
+        readiness.warm_up(_dependency(app, get_item_index), _dependency(app, get_catalog_cache))
+    )
+    purge = asyncio.create_task(
+        purge_tombstones_periodically(
+            engine,
+            timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS),
+            settings.SYNC_TOMBSTONE_PURGE_INTERVAL_SECONDS,
+        )
+    )
+    yield
+    warm_up.cancel()
+    purge.cancel()
+    for task in (warm_up, purge):
+        with suppress(asyncio.CancelledError):
+            await task
+    # Running jobs are cancelled and marked so, instead of staying RUNNING once the process is gone
+    await job_runner.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+# Innermost, so stored responses are uncompressed and each replay is encoded for the client retrying
+app.add_middleware(IdempotencyMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_LEVEL,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+    )
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,6 +90,8 @@ api_router.include_router(bags.router)
 api_router.include_router(trips.router)
 api_router.include_router(packing.router)
 api_router.include_router(trip_items.router)
+api_router.include_router(jobs.router)
+api_router.include_router(sync.router)
 
 app.include_router(api_router)
 
@@ -40,3 +104,22 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/ready", response_model=ReadinessStatus)
+def readiness_check(response: Response, readiness: Annotated[Readiness, Depends(get_readiness)]):
+    """Ready once the connection pools and caches are warm; 503 until then."""
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "ready", "warm_up_seconds": readiness.warm_up_seconds}
+
+
+@app.get("/health/pool", response_model=PoolStatus)
+def pool_health():
+    return pool_status(engine, pool_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
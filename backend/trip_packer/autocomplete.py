@@ -0,0 +1,96 @@
+import asyncio
+import bisect
+import re
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trip_packer.models import Item, ItemCategory
+from trip_packer.settings import Settings
+
+# Matches scanned before ranking, so a short prefix on a big catalog stays cheap
+MAX_CANDIDATES = 200
+
+
+def _normalize(name: str) -> str:
+    return " ".join(word for word in re.split(r"[\W_]+", name.casefold()) if word)
+
+
+def _words(name: str) -> list[str]:
+    """Every suffix of the name starting at a word, so "phone charger" is found from "cha" too."""
+    normalized = _normalize(name)
+    starts = [0] + [match.end() for match in re.finditer(" ", normalized)]
+    return [normalized[start:] for start in starts]
+
+
+class ItemPrefixIndex:
+    """Sorted in-process index of item names answering prefix lookups with a binary search.
+
+    Item writes in this process update it in place; writes made by other processes show up after the next reload.
+    """
+
+    def __init__(self, refresh_seconds: float = 300.0):
+        self.refresh_seconds = refresh_seconds
+        self._keys: list[tuple[str, int]] = []
+        self._items: dict[int, tuple[str, ItemCategory]] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            result = await session.execute(select(Item.id, Item.name, Item.category))
+            self._items = {item_id: (name, category) for item_id, name, category in result}
+            self._keys = sorted((key, item_id) for item_id, (name, _) in self._items.items() for key in _words(name))
+            self._loaded_at = time.monotonic()
+
+    def add(self, item_id: int, name: str, category: ItemCategory):
+        self.remove(item_id)
+        self._items[item_id] = (name, category)
+        for key in _words(name):
+            bisect.insort(self._keys, (key, item_id))
+
+    def remove(self, item_id: int):
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        for key in _words(entry[0]):
+            index = bisect.bisect_left(self._keys, (key, item_id))
+            if index < len(self._keys) and self._keys[index] == (key, item_id):
+                del self._keys[index]
+
+    def search(self, prefix: str, category: ItemCategory | None = None, limit: int = 10) -> list[dict]:
+        """Items with a word starting with the prefix, whole-name matches and shorter names first."""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+
+        candidates = {}
+        index = bisect.bisect_left(self._keys, (prefix,))
+        while index < len(self._keys) and len(candidates) < MAX_CANDIDATES:
+            key, item_id = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            name, item_category = self._items[item_id]
+            if category is None or item_category == category:
+                word_match = key != _normalize(name)
+                candidates[item_id] = min(candidates.get(item_id, True), word_match)
+            index += 1
+
+        ranked = sorted(candidates, key=lambda item_id: (candidates[item_id], len(self._items[item_id][0]), item_id))
+        return [
+            {"id": item_id, "name": self._items[item_id][0], "category": self._items[item_id][1]}
+            for item_id in ranked[:limit]
+        ]
+
+
+item_index = ItemPrefixIndex(refresh_seconds=Settings().AUTOCOMPLETE_REFRESH_SECONDS)
+
+
+def get_item_index():
+    return item_index
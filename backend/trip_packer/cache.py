@@ -0,0 +1,153 @@
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trip_packer.metrics import registry
+from trip_packer.settings import Settings
+
+cache_hits_total = registry.counter("cache_hits_total", "Catalog cache hits.", ("namespace",))
+cache_misses_total = registry.counter("cache_misses_total", "Catalog cache misses.", ("namespace",))
+cache_evictions_total = registry.counter("cache_evictions_total", "Entries evicted from the in-process cache.")
+
+
+class LRUCache:
+    """In-process cache that drops the least recently used entry when full and expires entries after a TTL."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            cache_evictions_total.inc()
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared between processes, served by Redis or any server speaking its protocol."""
+
+    def __init__(self, url: str, ttl_seconds: float = 60.0, prefix: str = "trip_packer:"):
+        try:
+            from redis import asyncio as redis  # noqa: PLC0415
+        except ImportError:
+            raise RuntimeError("The redis cache backend requires the redis extra (pip install trip-packer[redis])")
+
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Any | None:
+        value = await self._client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any):
+        await self._client.set(self.prefix + key, json.dumps(value), px=int(self.ttl_seconds * 1000))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=f"{self.prefix}*"):
+            await self._client.delete(key)
+
+
+class CatalogCache:
+    """Read-through cache of catalog rows, stored as JSON-ready dicts so every backend behaves the same."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get(self, session: AsyncSession, model, object_id: int, schema: type[BaseModel]) -> dict | None:
+        """Get a single row by id, loading it from the database on a miss."""
+        namespace = model.__tablename__
+        key = f"{namespace}:{object_id}"
+
+        value = await self.backend.get(key)
+        if value is not None:
+            cache_hits_total.inc(namespace=namespace)
+            return value
+
+        cache_misses_total.inc(namespace=namespace)
+        instance = await session.get(model, object_id)
+        if instance is None:
+            return None
+
+        value = schema.model_validate(instance).model_dump(mode="json")
+        await self.backend.set(key, value)
+        return value
+
+    async def get_list(self, session: AsyncSession, model, schema: type[BaseModel], skip: int, limit: int) -> list:
+        """Get a page of rows ordered by id, loading it from the database on a miss."""
+        namespace = model.__tablename__
+        key = f"{namespace}:list:{await self._list_version(namespace)}:{skip}:{limit}"
+
+        value = await self.backend.get(key)
+        if value is not None:
+            cache_hits_total.inc(namespace=namespace)
+            return value
+
+        cache_misses_total.inc(namespace=namespace)
+        result = await session.scalars(select(model).order_by(model.id).offset(skip).limit(limit))
+        value = [schema.model_validate(instance).model_dump(mode="json") for instance in result]
+        await self.backend.set(key, value)
+        return value
+
+    async def invalidate(self, model, object_id: int | None = None):
+        """Forget a row and every cached page of its table."""
+        namespace = model.__tablename__
+        if object_id is not None:
+            await self.backend.delete(f"{namespace}:{object_id}")
+
+        # Cached pages are keyed by a random version, so replacing it orphans all of them at once
+        await self.backend.set(f"{namespace}:list-version", uuid.uuid4().hex)
+
+    async def _list_version(self, namespace: str) -> str:
+        version = await self.backend.get(f"{namespace}:list-version")
+        if version is None:
+            version = uuid.uuid4().hex
+            await self.backend.set(f"{namespace}:list-version", version)
+        return version
+
+
+def build_cache_backend(settings: Settings):
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.CACHE_URL, ttl_seconds=settings.CACHE_TTL_SECONDS)
+    return LRUCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+
+catalog_cache = CatalogCache(build_cache_backend(Settings()))
+
+
+def get_catalog_cache():
+    return catalog_cache
@@ -0,0 +1,117 @@
+import asyncio
+from dataclasses import dataclass
+
+from sqlalchemy import Integer, String, cast, column, func, update, values
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from trip_packer.database import engine, settings
+from trip_packer.events import EventBroker, event_broker
+from trip_packer.metrics import registry
+from trip_packer.models import ItemStatus, Packing
+from trip_packer.schemas import PackingResponse
+
+toggles_received_total = registry.counter("packing_toggles_received_total", "Packing status toggles received.")
+toggles_coalesced_total = registry.counter(
+    "packing_toggles_coalesced_total", "Toggles merged into a pending toggle of the same packing entry."
+)
+toggle_flushes_total = registry.counter("packing_toggle_flushes_total", "Batched toggle updates written.")
+
+# Postgres caps a statement at 65535 bind parameters and each toggle takes four
+FLUSH_CHUNK_SIZE = 1000
+
+
+@dataclass
+class _PendingToggle:
+    status: ItemStatus
+    future: asyncio.Future
+
+
+class WriteCoalescer:
+    """Merges packing status toggles arriving within a short window and writes them with one UPDATE per window.
+
+    Repeated toggles of the same entry collapse to the last one, and everyone who sent one gets its final state.
+    """
+
+    def __init__(self, engine: AsyncEngine, events: EventBroker, window_seconds: float = 0.05):
+        self.engine = engine
+        self.events = events
+        self.window_seconds = window_seconds
+        self._pending: dict[tuple[int, int, int], _PendingToggle] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def submit(self, trip_id: int, toggles: list[tuple[int, int, ItemStatus]]) -> list[PackingResponse | None]:
+        """Queue (item_id, bag_id, status) toggles and wait for the flush, getting None for missing entries."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item_id, bag_id, new_status in toggles:
+            toggles_received_total.inc()
+            key = (trip_id, item_id, bag_id)
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _PendingToggle(new_status, loop.create_future())
+            else:
+                toggles_coalesced_total.inc()
+                pending.status = new_status
+            futures.append(pending.future)
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+        # Shielded, since a future is shared with whoever else toggled the same entry
+        return list(await asyncio.gather(*map(asyncio.shield, futures)))
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window_seconds)
+        pending, self._pending, self._flush_task = self._pending, {}, None
+
+        try:
+            packings = await self._write(pending)
+        except Exception as exc:
+            for toggle in pending.values():
+                if not toggle.future.done():
+                    toggle.future.set_exception(exc)
+            return
+
+        for key, toggle in pending.items():
+            if not toggle.future.done():
+                toggle.future.set_result(packings.get(key))
+
+        for packing in packings.values():
+            await self.events.publish(packing.trip_id, "packing.updated", packing)
+
+    async def _write(self, pending: dict[tuple[int, int, int], _PendingToggle]) -> dict:
+        rows = [(*key, toggle.status.value) for key, toggle in pending.items()]
+        packings = {}
+
+        async with self.engine.begin() as conn:
+            for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                toggles = values(
+                    column("trip_id", Integer),
+                    column("item_id", Integer),
+                    column("bag_id", Integer),
+                    column("status", String),
+                    name="toggles",
+                ).data(rows[start : start + FLUSH_CHUNK_SIZE])
+                table = Packing.__table__
+                result = await conn.execute(
+                    update(table)
+                    .where(
+                        table.c.trip_id == toggles.c.trip_id,
+                        table.c.item_id == toggles.c.item_id,
+                        table.c.bag_id == toggles.c.bag_id,
+                    )
+                    .values(status=cast(toggles.c.status, table.c.status.type), updated_at=func.now())
+                    .returning(*table.c)
+                )
+                for row in result:
+                    packings[(row.trip_id, row.item_id, row.bag_id)] = PackingResponse.model_validate(row._mapping)
+                toggle_flushes_total.inc()
+
+        return packings
+
+
+write_coalescer = WriteCoalescer(engine, event_broker, window_seconds=settings.PACKING_TOGGLE_WINDOW_MS / 1000)
+
+
+def get_write_coalescer():
+    return write_coalescer
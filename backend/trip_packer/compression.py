@@ -0,0 +1,168 @@
+import zlib
+from typing import Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Streams meant to be read event by event are left alone, as Starlette's GZipMiddleware does
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+DEFAULT_ENCODINGS = ("zstd", "br", "gzip")
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # wbits of 31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        import brotli  # noqa: PLC0415
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        import zstandard  # noqa: PLC0415
+
+        self._zstandard = zstandard
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = self._zstandard.COMPRESSOBJ_FLUSH_FINISH if final else self._zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+def available_compressors() -> dict[str, type]:
+    """Compressors by content coding, Brotli and zstd only when their optional packages are installed."""
+    compressors = {"gzip": GzipCompressor}
+
+    try:
+        import brotli  # noqa: F401, PLC0415
+
+        compressors["br"] = BrotliCompressor
+    except ImportError:
+        pass
+
+    try:
+        import zstandard  # noqa: F401, PLC0415
+
+        compressors["zstd"] = ZstdCompressor
+    except ImportError:
+        pass
+
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Sequence[str]) -> str | None:
+    """Pick the encoding the client weighs highest, following the server preference on ties."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, parameters = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        weight = 1.0
+        parameter = parameters.strip().lower()
+        if parameter.startswith("q="):
+            try:
+                weight = float(parameter[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+def skip_compression(endpoint):
+    """Mark a route endpoint whose responses must always be sent uncompressed."""
+    endpoint.skip_compression = True
+    return endpoint
+
+
+class CompressionMiddleware:
+    """Compresses responses with the best encoding both the client and the server support."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        encodings: Sequence[str] = DEFAULT_ENCODINGS,
+        levels: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+
+        compressors = available_compressors()
+        self.compressors = {encoding: compressors[encoding] for encoding in encodings if encoding in compressors}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.compressors))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+
+            # Hold the headers back until the first body chunk tells whether compressing is worth it
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if self._should_compress(scope, headers, body, more_body):
+                    compressor = self.compressors[encoding](self.levels[encoding])
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    body = compressor.compress(body, final=not more_body)
+                    if more_body:
+                        del headers["Content-Length"]
+                    else:
+                        headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+
+                await send(start_message)
+                start_message = None
+            elif compressor is not None:
+                message = {**message, "body": compressor.compress(body, final=not more_body)}
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, scope, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if getattr(scope.get("endpoint"), "skip_compression", False):
+            return False
+        if "content-encoding" in headers or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES):
+            return False
+        # Streamed responses are compressed whatever the size of their first chunk
+        return more_body or len(body) >= self.minimum_size
@@ -0,0 +1,64 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+
+@dataclass
+class ResourceVersion:
+    etag: str
+    last_modified: datetime | None
+
+
+def resource_version(*parts) -> ResourceVersion:
+    """Derive a weak ETag and Last-Modified date from the timestamps and counts describing a resource."""
+    digest = hashlib.sha1(repr(parts).encode(), usedforsecurity=False).hexdigest()[:20]
+    timestamps = [part for part in parts if isinstance(part, datetime)]
+
+    # Columns are stored without a time zone and filled by the database server, which runs in UTC
+    last_modified = max(timestamps).replace(tzinfo=timezone.utc) if timestamps else None
+
+    return ResourceVersion(etag=f'W/"{digest}"', last_modified=last_modified)
+
+
+def _strip_weak(etag: str) -> str:
+    return etag.removeprefix("W/")
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since only when no ETag was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {_strip_weak(etag.strip()) for etag in if_none_match.split(",")}
+        return "*" in candidates or _strip_weak(version.etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    # HTTP dates only have second precision
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def set_version_headers(response: Response, version: ResourceVersion):
+    response.headers["ETag"] = version.etag
+    response.headers["Cache-Control"] = "no-cache"
+    if version.last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(version.last_modified, usegmt=True)
+
+
+def not_modified(version: ResourceVersion) -> Response:
+    response = Response(status_code=HTTPStatus.NOT_MODIFIED)
+    set_version_headers(response, version)
+    return response
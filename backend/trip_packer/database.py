@@ -1,10 +1,186 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from trip_packer.metrics import instrument_engine, registry
 from trip_packer.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+def engine_options(settings: Settings) -> dict:
+    """Build the engine keyword arguments for the configured pool."""
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+        "connect_args": {"prepare_threshold": settings.DB_PREPARE_THRESHOLD or None},
+    }
+
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"]["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    return options
+
+
+class PoolMetrics:
+    """Tracks how long requests wait to get a connection from the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+# Seconds the checkout in progress spent opening new connections, which do not count as waiting
+_connect_seconds: ContextVar[list[float] | None] = ContextVar("connect_seconds", default=None)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording in pool_metrics how long each checkout waited for a free connection."""
+
+    def connect(self):
+        token = _connect_seconds.set([0.0])
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+            pool_metrics.observe_wait(time.perf_counter() - start - _connect_seconds.get()[0])
+            return connection
+        finally:
+            _connect_seconds.reset(token)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connecting = _connect_seconds.get()
+            if connecting is not None:
+                connecting[0] += time.perf_counter() - start
+
+
+def pool_status(engine: AsyncEngine, metrics: PoolMetrics) -> dict:
+    """Snapshot of the pool usage of an engine."""
+    pool = engine.sync_engine.pool
+
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow() counts down from -pool_size while the pool is still filling up
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": metrics.checkouts,
+        "wait_seconds_total": metrics.wait_seconds_total,
+        "wait_seconds_max": metrics.wait_seconds_max,
+    }
+
+
+class ReplicaSet:
+    """Round-robin over the read replicas, skipping for a while the ones that failed to connect."""
+
+    def __init__(self, engines: list[AsyncEngine], retry_seconds: float = 30.0):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._unhealthy_until: dict[AsyncEngine, float] = {}
+        self._next = itertools.cycle(engines)
+
+    def choose(self) -> AsyncEngine | None:
+        """Next healthy replica, or None when the primary has to serve the read."""
+        now = time.monotonic()
+        for _ in self.engines:
+            replica = next(self._next)
+            if self._unhealthy_until.get(replica, 0) <= now:
+                return replica
+        return None
+
+    def mark_unhealthy(self, replica: AsyncEngine):
+        self._unhealthy_until[replica] = time.monotonic() + self.retry_seconds
 
 
-async def get_session():  # pragma: no cover
+settings = Settings()
+pool_metrics = PoolMetrics()
+engine = create_async_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **engine_options(settings))
+instrument_engine(engine)
+
+replica_engines = [create_async_engine(url, **engine_options(settings)) for url in settings.DATABASE_REPLICA_URLS]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+replicas = ReplicaSet(replica_engines, retry_seconds=settings.DB_REPLICA_RETRY_SECONDS)
+
+# Set on responses to writes and checked by read sessions, which is how the client's own writes are recognised
+LAST_WRITE_COOKIE = "last_write"
+
+
+def _pool_stat(name: str):
+    return pool_status(engine, pool_metrics)[name]
+
+
+registry.gauge("db_pool_checked_out", "Connections checked out of the pool.", lambda: _pool_stat("checked_out"))
+registry.gauge("db_pool_idle", "Idle connections kept in the pool.", lambda: _pool_stat("idle"))
+registry.gauge("db_pool_overflow", "Connections opened beyond the pool size.", lambda: _pool_stat("overflow"))
+registry.gauge(
+    "db_pool_wait_seconds_total", "Time spent waiting for a connection.", lambda: _pool_stat("wait_seconds_total")
+)
+
+
+@asynccontextmanager
+async def _primary_session():  # pragma: no cover
+    # The connection is checked out on first use, so routes that never query do not hold one
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+async def get_session(request: Request, response: Response):
+    async with _primary_session() as session:
+        if settings.DB_READ_YOUR_WRITES_SECONDS and request.method not in {"GET", "HEAD"}:
+            window = settings.DB_READ_YOUR_WRITES_SECONDS
+
+            # Only a committed write pins the client to the primary, not a request that failed or wrote nothing
+            def mark_write(_session):
+                response.set_cookie(LAST_WRITE_COOKIE, str(time.time()), max_age=max(int(window), 1), httponly=True)
+
+            event.listen(session.sync_session, "after_commit", mark_write)
+
+        yield session
+
+
+def wrote_recently(request: Request, window_seconds: float) -> bool:
+    """Whether the client made a write within the read-your-writes window."""
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write < window_seconds
+
+
+async def get_read_session(request: Request):
+    """Session for read-only routes, served by a replica when one is configured and healthy."""
+    replica = None
+    if not wrote_recently(request, settings.DB_READ_YOUR_WRITES_SECONDS):
+        replica = replicas.choose()
+
+    if replica is not None:
+        async with AsyncSession(replica, expire_on_commit=False) as session:
+            try:
+                await session.connection()
+            except OperationalError:
+                replicas.mark_unhealthy(replica)
+            else:
+                yield session
+                return
+
+    async with _primary_session() as session:
+        yield session
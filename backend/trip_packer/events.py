@@ -0,0 +1,139 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import psycopg
+from pydantic import BaseModel
+from sqlalchemy import make_url
+
+from trip_packer.metrics import registry
+from trip_packer.settings import Settings
+
+events_published_total = registry.counter("events_published_total", "Trip change events published.", ("type",))
+events_dropped_total = registry.counter("events_dropped_total", "Events dropped because a subscriber fell behind.")
+registry.gauge("event_subscribers", "Open trip event streams.", lambda: get_event_broker().subscriber_count())
+
+# Sent in place of the events a slow subscriber missed, telling it to reload the packing list
+RESET_EVENT = {"type": "reset", "data": {}}
+
+
+def _event(event_type: str, data: BaseModel | dict | None) -> dict:
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    return {"type": event_type, "data": data or {}}
+
+
+class EventBroker:
+    """In-process pub/sub fanning the change events of a trip out to every stream open on it."""
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+
+    async def publish(self, trip_id: int, event_type: str, data: BaseModel | dict | None = None):
+        events_published_total.inc(type=event_type)
+        self.deliver(trip_id, _event(event_type, data))
+
+    def deliver(self, trip_id: int, event: dict):
+        for queue in self._subscribers.get(trip_id, ()):
+            # Decided per queue, so one slow subscriber does not turn the event into a reset for the others
+            message = event
+            if queue.full():
+                events_dropped_total.inc(queue.qsize())
+                while not queue.empty():
+                    queue.get_nowait()
+                message = RESET_EVENT
+            queue.put_nowait(message)
+
+    def subscriber_count(self) -> int:
+        return sum(map(len, self._subscribers.values()))
+
+    @asynccontextmanager
+    async def subscribe(self, trip_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue = asyncio.Queue(self.max_queued)
+        subscribers = self._subscribers.setdefault(trip_id, set())
+        subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(trip_id, None)
+
+
+class PostgresEventBroker(EventBroker):
+    """Relays events through Postgres LISTEN/NOTIFY so the streams on every replica see them."""
+
+    CHANNEL = "trip_events"
+
+    def __init__(self, database_url: str, max_queued: int = 100):
+        super().__init__(max_queued)
+        # psycopg takes a plain libpq URL, without the SQLAlchemy driver suffix
+        self.conninfo = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._publisher = None
+        self._publisher_lock = asyncio.Lock()
+        self._listener: asyncio.Task | None = None
+
+    async def publish(self, trip_id: int, event_type: str, data: BaseModel | dict | None = None):
+        payload = json.dumps({"trip_id": trip_id, **_event(event_type, data)})
+
+        async with self._publisher_lock:
+            if self._publisher is None or self._publisher.closed:
+                self._publisher = await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True)
+            await self._publisher.execute("SELECT pg_notify(%s, %s)", (self.CHANNEL, payload))
+        events_published_total.inc(type=event_type)
+
+    @asynccontextmanager
+    async def subscribe(self, trip_id: int) -> AsyncIterator[asyncio.Queue]:
+        # Events published by this process come back through the listener too
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        async with super().subscribe(trip_id) as queue:
+            yield queue
+
+    async def _listen(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.CHANNEL}")
+                    async for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self.deliver(message.pop("trip_id"), message)
+            except psycopg.OperationalError:
+                # Events sent while reconnecting are lost, so subscribers are told to reload
+                for trip_id in list(self._subscribers):
+                    self.deliver(trip_id, RESET_EVENT)
+                await asyncio.sleep(1)
+
+
+def format_event(event: dict) -> str:
+    """Render an event in the text/event-stream format."""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def event_stream(broker: EventBroker, trip_id: int, heartbeat_seconds: float = 15.0) -> AsyncIterator[str]:
+    """Server-sent events for a trip, with comment lines keeping idle connections open through proxies."""
+    async with broker.subscribe(trip_id) as queue:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_seconds)
+            except TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield format_event(event)
+
+
+def build_event_broker(settings: Settings):
+    if settings.EVENTS_BACKEND == "postgres":
+        return PostgresEventBroker(settings.DATABASE_URL, max_queued=settings.EVENTS_MAX_QUEUED)
+    return EventBroker(max_queued=settings.EVENTS_MAX_QUEUED)
+
+
+event_broker = build_event_broker(Settings())
+
+
+def get_event_broker():
+    return event_broker
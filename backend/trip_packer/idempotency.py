@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from http import HTTPStatus
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from trip_packer.database import engine, settings
+from trip_packer.metrics import registry
+from trip_packer.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENT_METHODS = {"POST", "PUT"}
+# Describe the connection the response went out on rather than the response, or are recomputed on replay
+UNSTORED_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "content-length",
+}
+
+# How often a retry waiting on another process looks for the stored response
+POLL_SECONDS = 0.05
+# Expired keys of every client are deleted at most this often per process
+PURGE_INTERVAL_SECONDS = 60.0
+
+idempotent_replays_total = registry.counter("idempotent_replays_total", "Requests answered with a stored response.")
+idempotent_waits_total = registry.counter(
+    "idempotent_waits_total", "Retries that waited for the first request with their key to finish."
+)
+
+
+@dataclass
+class IdempotentEntry:
+    """Stored state of a key: the request it was first used with and, once that finished, its response."""
+
+    request_hash: str
+    status_code: int | None = None
+    headers: list[list[str]] | None = None
+    body: bytes | None = None
+
+    def to_response(self) -> Response:
+        response = Response(self.body, status_code=self.status_code)
+        response.raw_headers.extend((name.encode("latin-1"), value.encode("latin-1")) for name, value in self.headers)
+        response.raw_headers.append((REPLAYED_HEADER.encode("latin-1"), b"true"))
+        return response
+
+
+class IdempotencyStore:
+    """Responses to requests sent with an Idempotency-Key, kept in the database for ttl_seconds.
+
+    Waiting retries in this process are woken as soon as the request holding their key finishes; retries in other
+    processes poll the table. A key still without a response lease_seconds after it was claimed was left by a process
+    that died mid-request, and the next retry with the same request takes it over.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ttl_seconds: float = 86_400.0,
+        wait_seconds: float = 10.0,
+        lease_seconds: float = 60.0,
+    ):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.lease_seconds = lease_seconds
+        self._running: dict[str, asyncio.Event] = {}
+        self._purged_at = 0.0
+
+    async def claim(self, key: str, request_hash: str) -> IdempotentEntry | None:
+        """Take the key for this request, getting None, or get the entry of the request already holding it."""
+        table = IdempotencyKey.__table__
+
+        lease_expires_at = func.now() + timedelta(seconds=self.lease_seconds)
+
+        async with self.engine.begin() as conn:
+            row = (
+                await conn.execute(select(table).where(table.c.key == key, table.c.expires_at > func.now()))
+            ).one_or_none()
+            if row is not None:
+                # Only a retry of the same request may run it in place of a holder whose lease ran out
+                abandoned = table.c.status_code.is_(None) & (table.c.lease_expires_at <= func.now())
+                if row.status_code is None and row.request_hash == request_hash:
+                    claimed = await conn.scalar(
+                        update(table)
+                        .where(table.c.key == key, abandoned)
+                        .values(lease_expires_at=lease_expires_at)
+                        .returning(table.c.key)
+                    )
+                    if claimed is not None:
+                        self._running[key] = asyncio.Event()
+                        return None
+                return IdempotentEntry(row.request_hash, row.status_code, row.headers, row.body)
+
+            if time.monotonic() - self._purged_at > PURGE_INTERVAL_SECONDS:
+                await conn.execute(delete(table).where(table.c.expires_at <= func.now()))
+                self._purged_at = time.monotonic()
+            else:
+                await conn.execute(delete(table).where(table.c.key == key, table.c.expires_at <= func.now()))
+
+            claimed = await conn.scalar(
+                insert(table)
+                .values(
+                    key=key,
+                    request_hash=request_hash,
+                    expires_at=func.now() + timedelta(seconds=self.ttl_seconds),
+                    lease_expires_at=lease_expires_at,
+                )
+                .on_conflict_do_nothing()
+                .returning(table.c.key)
+            )
+
+        if claimed is None:
+            # Taken by a concurrent request since the select; treated as running until the next look
+            return IdempotentEntry(request_hash)
+
+        self._running[key] = asyncio.Event()
+        return None
+
+    async def complete(self, key: str, status_code: int, headers: list[list[str]], body: bytes):
+        table = IdempotencyKey.__table__
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(table).where(table.c.key == key).values(status_code=status_code, headers=headers, body=body)
+                )
+        finally:
+            self._finish(key)
+
+    async def release(self, key: str):
+        """Give the key up without a response, so a retry runs the request again."""
+        table = IdempotencyKey.__table__
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(delete(table).where(table.c.key == key, table.c.status_code.is_(None)))
+        finally:
+            self._finish(key)
+
+    async def wait(self, key: str, timeout: float):
+        """Sleep until the request holding the key in this process finishes, or for the timeout."""
+        running = self._running.get(key)
+        if running is None:
+            await asyncio.sleep(timeout)
+            return
+
+        try:
+            await asyncio.wait_for(running.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    def _finish(self, key: str):
+        running = self._running.pop(key, None)
+        if running is not None:
+            running.set()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+def hash_request(scope, body: bytes) -> str:
+    target = f"{scope['method']} {scope['path']}?{scope['query_string'].decode()}\n"
+    return hashlib.sha256(target.encode() + body).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Answers POST and PUT requests retried with the same Idempotency-Key header with the first response.
+
+    Only responses below 500 are stored; after a server error or a dropped connection the key is released and the
+    next retry runs the request again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must have 1 to {MAX_KEY_LENGTH} characters"},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        request_hash = hash_request(scope, body)
+        # Resolved like a dependency, so tests can point it at their own database
+        overrides = scope["app"].dependency_overrides
+        store = overrides.get(get_idempotency_store, get_idempotency_store)()
+
+        deadline = time.monotonic() + store.wait_seconds
+        waited = False
+        while True:
+            entry = await store.claim(key, request_hash)
+            if entry is None:
+                await self._run(store, key, scope, _replay_body(body, receive), send)
+                return
+
+            if entry.request_hash != request_hash:
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key was already used with a different request"},
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+                break
+            if entry.status_code is not None:
+                idempotent_replays_total.inc()
+                response = entry.to_response()
+                break
+            if time.monotonic() >= deadline:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"},
+                    status_code=status.HTTP_409_CONFLICT,
+                )
+                break
+
+            if not waited:
+                idempotent_waits_total.inc()
+                waited = True
+            await store.wait(key, POLL_SECONDS)
+
+        await response(scope, receive, send)
+
+    async def _run(self, store: IdempotencyStore, key: str, scope, receive, send):
+        status_code = None
+        headers = []
+        chunks = []
+
+        async def send_and_capture(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        except BaseException:
+            await store.release(key)
+            raise
+
+        if status_code is None or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            await store.release(key)
+        else:
+            await store.complete(key, status_code, headers, b"".join(chunks))
+
+
+idempotency_store = IdempotencyStore(
+    engine,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+)
+
+
+def get_idempotency_store():
+    return idempotency_store
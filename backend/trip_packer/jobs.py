@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from trip_packer.database import engine, settings
+from trip_packer.models import Job, JobStatus
+
+# A handler gets a session of its own and the stored params, and returns a JSON-ready result
+JobHandler = Callable[[AsyncSession, dict], Awaitable[dict]]
+
+logger = logging.getLogger("uvicorn.error")
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobRunner:
+    """Runs jobs as asyncio tasks in this process, at most `concurrency` at a time, tracking them in the jobs table."""
+
+    def __init__(self, engine: AsyncEngine, concurrency: int = 4, heartbeat_seconds: float = 30.0):
+        self.engine = engine
+        self.concurrency = concurrency
+        self.heartbeat_seconds = heartbeat_seconds
+        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._heartbeat: asyncio.Task | None = None
+
+    def start(self, handler_for: Callable[[str], JobHandler]):
+        """Start the heartbeat, which also picks up the jobs that stopped processes left unfinished."""
+        self._heartbeat = asyncio.create_task(self._beat(handler_for))
+
+    async def requeue_stale(self, handler_for: Callable[[str], JobHandler]) -> list[int]:
+        """Run the unfinished jobs nobody has touched for three heartbeats here, returning their ids."""
+        # Jobs of processes still running are touched every heartbeat, so only orphans are this stale
+        stale = func.now() - timedelta(seconds=3 * self.heartbeat_seconds)
+        async with AsyncSession(self.engine) as session:
+            orphans = (
+                await session.execute(
+                    update(Job)
+                    .where(Job.status.in_((JobStatus.PENDING, JobStatus.RUNNING)), Job.updated_at < stale)
+                    .values(status=JobStatus.PENDING, started_at=None, updated_at=func.now())
+                    .returning(Job.id, Job.kind)
+                )
+            ).all()
+            await session.commit()
+
+        for job_id, kind in orphans:
+            self._track(job_id, handler_for(kind))
+        return [job_id for job_id, _ in orphans]
+
+    async def submit(self, session: AsyncSession, kind: str, params: dict, handler: JobHandler) -> Job:
+        job = Job(kind=kind, params=params)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+
+        self._track(job.id, handler)
+
+        return job
+
+    async def cancel(self, session: AsyncSession, job_id: int) -> bool:
+        """Cancel a pending or running job, returning False when it had already finished."""
+        result = await session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.not_in(FINISHED_STATUSES))
+            .values(status=JobStatus.CANCELLED, finished_at=func.now(), updated_at=func.now())
+        )
+        await session.commit()
+
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+
+        return result.rowcount > 0
+
+    async def shutdown(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _track(self, job_id: int, handler: JobHandler):
+        task = asyncio.create_task(self._run(job_id, handler))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _beat(self, handler_for: Callable[[str], JobHandler]):
+        while True:
+            try:
+                await self._touch()
+                await self.requeue_stale(handler_for)
+            except (OSError, SQLAlchemyError) as exc:
+                logger.warning("Job heartbeat failed, retrying in %ss: %s", self.heartbeat_seconds, exc)
+            await asyncio.sleep(self.heartbeat_seconds)
+
+    async def _touch(self):
+        if not self._tasks:
+            return
+        async with AsyncSession(self.engine) as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id.in_(list(self._tasks)), Job.status.not_in(FINISHED_STATUSES))
+                .values(updated_at=func.now())
+            )
+            await session.commit()
+
+    async def _run(self, job_id: int, handler: JobHandler):
+        # Created lazily so it belongs to the loop the jobs run on
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore, AsyncSession(self.engine, expire_on_commit=False) as session:
+            started = await self._mark(session, job_id, JobStatus.RUNNING, started_at=func.now())
+            if not started:
+                return
+
+            try:
+                result = await handler(session, (await session.get(Job, job_id)).params)
+            except asyncio.CancelledError:
+                await session.rollback()
+                await self._mark(session, job_id, JobStatus.CANCELLED, finished_at=func.now())
+                raise
+            except HTTPException as exc:
+                await session.rollback()
+                await self._mark(session, job_id, JobStatus.FAILED, error=str(exc.detail), finished_at=func.now())
+            except Exception as exc:
+                await session.rollback()
+                await self._mark(session, job_id, JobStatus.FAILED, error=repr(exc), finished_at=func.now())
+            else:
+                await self._mark(session, job_id, JobStatus.SUCCEEDED, result=result, finished_at=func.now())
+
+    @staticmethod
+    async def _mark(session: AsyncSession, job_id: int, new_status: JobStatus, **values) -> bool:
+        # A job cancelled through the API keeps that status
+        result = await session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.not_in(FINISHED_STATUSES))
+            .values(status=new_status, updated_at=func.now(), **values)
+        )
+        await session.commit()
+        return result.rowcount > 0
+
+
+job_runner = JobRunner(engine, concurrency=settings.JOB_CONCURRENCY, heartbeat_seconds=settings.JOB_HEARTBEAT_SECONDS)
+
+
+def get_job_runner():
+    return job_runner
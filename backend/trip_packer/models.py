@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, JSON, ForeignKey, Index, LargeBinary, event, func
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
@@ -20,6 +20,14 @@ class LuggageType(str, Enum):
     CHECKED_LARGE = "CHECKED_LARGE"
 
 
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
 class ItemCategory(str, Enum):
     CLOTHING = "CLOTHING"
     ELECTRONICS = "ELECTRONICS"
@@ -33,10 +41,17 @@ class ItemCategory(str, Enum):
 @table_registry.mapped_as_dataclass
 class Item:
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        # Trigram index serving both the fuzzy and the ILIKE matches of item search
+        Index("ix_items_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
     category: Mapped[ItemCategory] = mapped_column(nullable=False)
+    volume_liters: Mapped[float] = mapped_column(default=0.0, server_default="0")
+    weight_kg: Mapped[float] = mapped_column(default=0.0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now(), onupdate=func.now())
 
@@ -45,13 +60,20 @@ class Item:
     trip_items: Mapped[list["TripItem"]] = relationship(init=False, back_populates="item")
 
 
+event.listen(Item.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 @table_registry.mapped_as_dataclass
 class Bag:
     __tablename__ = "bags"
+    __table_args__ = (Index("ix_bags_updated_at_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
     type: Mapped[LuggageType] = mapped_column(nullable=False)
+    # Limits left empty fall back to the defaults of the luggage type
+    capacity_liters: Mapped[float | None] = mapped_column(default=None)
+    max_weight_kg: Mapped[float | None] = mapped_column(default=None)
     created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now(), onupdate=func.now())
 
@@ -63,6 +85,7 @@ class Bag:
 @table_registry.mapped_as_dataclass
 class Trip:
     __tablename__ = "trips"
+    __table_args__ = (Index("ix_trips_updated_at_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
@@ -84,6 +107,7 @@ class Trip:
 @table_registry.mapped_as_dataclass
 class TripBag:
     __tablename__ = "trip_bags"
+    __table_args__ = (Index("ix_trip_bags_bag_id_trip_id", "bag_id", "trip_id"),)
 
     trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id"), primary_key=True)
     bag_id: Mapped[int] = mapped_column(ForeignKey("bags.id"), primary_key=True)
@@ -98,6 +122,10 @@ class TripBag:
 @table_registry.mapped_as_dataclass
 class TripItem:
     __tablename__ = "trip_items"
+    __table_args__ = (
+        Index("ix_trip_items_item_id", "item_id"),
+        Index("ix_trip_items_updated_at", "updated_at"),
+    )
 
     trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id"), primary_key=True)
     item_id: Mapped[int] = mapped_column(ForeignKey("items.id"), primary_key=True)
@@ -114,6 +142,12 @@ class TripItem:
 @table_registry.mapped_as_dataclass
 class Packing:
     __tablename__ = "packings"
+    __table_args__ = (
+        Index("ix_packings_bag_id_trip_id", "bag_id", "trip_id"),
+        Index("ix_packings_item_id", "item_id"),
+        Index("ix_packings_updated_at", "updated_at"),
+    )
+
     trip_id: Mapped[int] = mapped_column(ForeignKey("trips.id"), primary_key=True)
     item_id: Mapped[int] = mapped_column(ForeignKey("items.id"), primary_key=True)
     bag_id: Mapped[int] = mapped_column(ForeignKey("bags.id"), primary_key=True)
@@ -126,3 +160,52 @@ class Packing:
     trip: Mapped["Trip"] = relationship(init=False, back_populates="packings")
     item: Mapped["Item"] = relationship(init=False, back_populates="packings")
     bag: Mapped["Bag"] = relationship(init=False, back_populates="packings")
+
+
+@table_registry.mapped_as_dataclass
+class Job:
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    kind: Mapped[str] = mapped_column(nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(default=JobStatus.PENDING)
+    result: Mapped[dict | None] = mapped_column(JSON, default=None)
+    error: Mapped[str | None] = mapped_column(default=None)
+    started_at: Mapped[datetime | None] = mapped_column(init=False, default=None)
+    finished_at: Mapped[datetime | None] = mapped_column(init=False, default=None)
+    created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now(), onupdate=func.now())
+
+
+@table_registry.mapped_as_dataclass
+class Tombstone:
+    """Primary key of a deleted row, kept so clients syncing changes can drop it too."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_deleted_at", "deleted_at"),)
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    table_name: Mapped[str] = mapped_column(nullable=False)
+    key: Mapped[dict] = mapped_column(JSON, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
+
+
+@table_registry.mapped_as_dataclass
+class IdempotencyKey:
+    """Response to a request sent with an Idempotency-Key header, replayed when the request is retried."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(primary_key=True)
+    request_hash: Mapped[str] = mapped_column(nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False)
+    # Until then the request holding the key is taken to be running; after that a retry may take the key over
+    lease_expires_at: Mapped[datetime] = mapped_column(nullable=False)
+    # Empty while the first request is still running
+    status_code: Mapped[int | None] = mapped_column(default=None)
+    # [name, value] pairs, since headers such as Set-Cookie repeat
+    headers: Mapped[list | None] = mapped_column(JSON, default=None)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, default=None)
+    created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
@@ -0,0 +1,130 @@
+import time
+from dataclasses import dataclass, field
+
+from trip_packer.models import LuggageType
+
+# (capacity in liters, max weight in kg) used when a bag leaves its limits empty
+DEFAULT_BAG_LIMITS = {
+    LuggageType.BACKPACK: (25.0, 10.0),
+    LuggageType.CARRY_ON: (40.0, 10.0),
+    LuggageType.CHECKED_MEDIUM: (70.0, 23.0),
+    LuggageType.CHECKED_LARGE: (100.0, 32.0),
+}
+
+
+@dataclass
+class PackableItem:
+    item_id: int
+    volume: float
+    weight: float
+
+
+@dataclass
+class BagSpace:
+    bag_id: int
+    capacity: float
+    max_weight: float
+    volume: float = 0.0
+    weight: float = 0.0
+    items: list[PackableItem] = field(default_factory=list)
+
+    def fits(self, item: PackableItem) -> bool:
+        return self.volume + item.volume <= self.capacity and self.weight + item.weight <= self.max_weight
+
+    def add(self, item: PackableItem):
+        self.items.append(item)
+        self.volume += item.volume
+        self.weight += item.weight
+
+    def remove(self, item: PackableItem):
+        self.items.remove(item)
+        self.volume -= item.volume
+        self.weight -= item.weight
+
+
+@dataclass
+class Assignment:
+    bags: list[BagSpace]
+    unassigned: list[PackableItem]
+    improved: int = 0
+
+
+def bag_space(bag_id: int, luggage_type: LuggageType, capacity: float | None, max_weight: float | None) -> BagSpace:
+    default_capacity, default_max_weight = DEFAULT_BAG_LIMITS[luggage_type]
+    return BagSpace(
+        bag_id=bag_id,
+        capacity=default_capacity if capacity is None else capacity,
+        max_weight=default_max_weight if max_weight is None else max_weight,
+    )
+
+
+def assign_bags(items: list[PackableItem], bags: list[BagSpace], time_budget: float = 0.2) -> Assignment:
+    """Spread items over bags with first-fit decreasing, then move items around to fit the leftovers.
+
+    The local improvement stops once the time budget, in seconds, runs out. Each item is weighed by the larger
+    of its volume and weight shares of the biggest bag, so the bulkiest or heaviest items are placed first while
+    the most room is left.
+    """
+    deadline = time.perf_counter() + time_budget
+    bags = sorted(bags, key=lambda bag: (bag.capacity, bag.max_weight), reverse=True)
+    if not bags:
+        return Assignment(bags=[], unassigned=list(items))
+
+    largest_capacity = max(bags[0].capacity, 1e-9)
+    largest_max_weight = max(*(bag.max_weight for bag in bags), 1e-9)
+
+    def size(item: PackableItem) -> float:
+        return max(item.volume / largest_capacity, item.weight / largest_max_weight)
+
+    unassigned = []
+    for item in sorted(items, key=size, reverse=True):
+        bag = next((bag for bag in bags if bag.fits(item)), None)
+        if bag is None:
+            unassigned.append(item)
+        else:
+            bag.add(item)
+
+    assignment = Assignment(bags=bags, unassigned=unassigned)
+    _relocate_for_leftovers(assignment, deadline)
+
+    return assignment
+
+
+def _relocate_for_leftovers(assignment: Assignment, deadline: float):
+    """Local improvement: make room for a leftover by moving one packed item to another bag."""
+    for leftover in list(assignment.unassigned):
+        if time.perf_counter() > deadline:
+            return
+
+        for target in assignment.bags:
+            moved = _make_room(assignment.bags, target, leftover, deadline)
+            if moved:
+                target.add(leftover)
+                assignment.unassigned.remove(leftover)
+                assignment.improved += 1
+                break
+
+
+def _make_room(bags: list[BagSpace], target: BagSpace, leftover: PackableItem, deadline: float) -> bool:
+    if target.fits(leftover):
+        return True
+
+    volume_needed = target.volume + leftover.volume - target.capacity
+    weight_needed = target.weight + leftover.weight - target.max_weight
+    if leftover.volume > target.capacity or leftover.weight > target.max_weight:
+        return False
+
+    # Prefer moving the smallest item that frees enough room
+    for item in sorted(target.items, key=lambda item: (item.volume, item.weight)):
+        if time.perf_counter() > deadline:
+            return False
+        if item.volume < volume_needed or item.weight < weight_needed:
+            continue
+
+        destination = next((bag for bag in bags if bag is not target and bag.fits(item)), None)
+        if destination is not None:
+            target.remove(item)
+            destination.add(item)
+            return True
+
+    return False
@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from enum import Enum
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CursorOrder(str, Enum):
+    ID = "id"
+    UPDATED_AT = "updated_at"
+
+
+def encode_cursor(order: CursorOrder, row) -> str:
+    """Build an opaque cursor pointing right after the given row."""
+    key = [row.id] if order is CursorOrder.ID else [row.updated_at.isoformat(), row.id]
+    payload = json.dumps({"order": order.value, "key": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(order: CursorOrder, cursor: str) -> tuple:
+    """Turn a cursor back into the sort key it was built from."""
+    invalid_cursor = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_order, key = payload["order"], payload["key"]
+    # base64 raises a bare ValueError for non-ASCII input; it also covers binascii.Error and JSONDecodeError
+    except (ValueError, KeyError, TypeError):
+        raise invalid_cursor
+
+    # A cursor is only valid for the ordering it was issued under
+    if cursor_order != order.value:
+        raise invalid_cursor
+
+    try:
+        if order is CursorOrder.ID:
+            (row_id,) = key
+            return (int(row_id),)
+        updated_at, row_id = key
+        return (datetime.fromisoformat(updated_at), int(row_id))
+    except (TypeError, ValueError):
+        raise invalid_cursor
+
+
+async def paginate(session: AsyncSession, model, order: CursorOrder, after: str | None, limit: int):
+    """Fetch one page of rows after the cursor, returning the rows and the cursor of the next page."""
+    columns = (model.id,) if order is CursorOrder.ID else (model.updated_at, model.id)
+    query = select(model).order_by(*columns).limit(limit + 1)
+
+    if after:
+        query = query.where(tuple_(*columns) > tuple_(*decode_cursor(order, after)))
+
+    rows = (await session.scalars(query)).all()
+    next_cursor = encode_cursor(order, rows[limit - 1]) if len(rows) > limit else None
+
+    return rows[:limit], next_cursor
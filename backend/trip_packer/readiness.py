@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from trip_packer.autocomplete import ItemPrefixIndex
+from trip_packer.cache import CatalogCache
+from trip_packer.database import ReplicaSet, engine, replica_engines, replicas, settings
+from trip_packer.models import Bag, Item
+from trip_packer.schemas import BagResponse, ItemResponse
+
+logger = logging.getLogger("uvicorn.error")
+
+# The page the list endpoints serve when called without arguments
+FIRST_PAGE = (0, 100)
+
+
+class Readiness:
+    """Whether this process has warmed up and should be sent traffic.
+
+    The process answers liveness checks as soon as it is listening; readiness waits until the primary pool is
+    filled and the in-process caches are loaded, so the first requests a new replica takes do not pay for either.
+    The pools of the read replicas, the rest of `engines`, are filled afterwards on a best-effort basis: reads fall
+    back to the primary, so an unreachable replica must not keep the process out of rotation.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        connections: int = 5,
+        retry_seconds: float = 1.0,
+        replicas: ReplicaSet | None = None,
+    ):
+        self.engines = engines
+        self.replicas = replicas
+        self.connections = connections
+        self.retry_seconds = retry_seconds
+        self.started_at = time.monotonic()
+        self.warm_up_seconds: float | None = None
+        self.last_error: Exception | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.warm_up_seconds is not None
+
+    async def warm_up(self, index: ItemPrefixIndex, cache: CatalogCache):
+        """Fill the pools and load the caches, retrying until the database is reachable."""
+        while True:
+            try:
+                await self._fill_pool(self.engines[0])
+                async with AsyncSession(self.engines[0], expire_on_commit=False) as session:
+                    await index.ensure_loaded(session)
+                    await cache.get_list(session, Item, ItemResponse, *FIRST_PAGE)
+                    await cache.get_list(session, Bag, BagResponse, *FIRST_PAGE)
+                break
+            except (OSError, SQLAlchemyError) as exc:
+                self.last_error = exc
+                logger.warning("Warm-up failed, retrying in %ss: %s", self.retry_seconds, exc)
+                await asyncio.sleep(self.retry_seconds)
+
+        self.warm_up_seconds = time.monotonic() - self.started_at
+        logger.info("Ready to serve %.2fs after start", self.warm_up_seconds)
+
+        for replica in self.engines[1:]:
+            try:
+                await self._fill_pool(replica)
+            except (OSError, SQLAlchemyError) as exc:
+                logger.warning("Warm-up of a read replica failed, reading from the primary: %s", exc)
+                if self.replicas is not None:
+                    self.replicas.mark_unhealthy(replica)
+
+    async def _fill_pool(self, pool_engine: AsyncEngine):
+        # Held open together, so the pool ends up with that many connections rather than reusing one
+        async with AsyncExitStack() as stack:
+            connections = await asyncio.gather(
+                *(stack.enter_async_context(pool_engine.connect()) for _ in range(self.connections))
+            )
+            for connection in connections:
+                await connection.execute(text("SELECT 1"))
+
+
+readiness = Readiness([engine, *replica_engines], connections=settings.DB_POOL_SIZE, replicas=replicas)
+
+
+def get_readiness():
+    return readiness
@@ -1,22 +1,27 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from trip_packer.database import get_session
+from trip_packer.cache import CatalogCache, get_catalog_cache
+from trip_packer.database import get_read_session, get_session
 from trip_packer.models import Bag
-from trip_packer.schemas import BagCreate, BagResponse, BagUpdate, Message
+from trip_packer.pagination import CursorOrder, paginate
+from trip_packer.schemas import BagCreate, BagResponse, BagUpdate, CursorPage, Message
+from trip_packer.serialization import serialized_json
 
 router = APIRouter(prefix="/bags", tags=["bags"])
 T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+# Routes filling the shared cache read from the primary; a lagging replica would put back rows a write just evicted
+T_Cache = Annotated[CatalogCache, Depends(get_catalog_cache)]
 
 
 @router.post("/", response_model=BagResponse, status_code=status.HTTP_201_CREATED)
-async def create_bag(bag: BagCreate, session: T_Session):
+async def create_bag(bag: BagCreate, session: T_Session, cache: T_Cache):
     """Create new bag."""
-    new_bag = Bag(name=bag.name, type=bag.type)
+    new_bag = Bag(name=bag.name, type=bag.type, capacity_liters=bag.capacity_liters, max_weight_kg=bag.max_weight_kg)
 
     session.add(new_bag)
     try:
@@ -29,22 +34,39 @@ async def create_bag(bag: BagCreate, session: T_Session):
         )
 
     await session.refresh(new_bag)
+    await cache.invalidate(Bag, new_bag.id)
 
     return new_bag
 
 
 @router.get("/", response_model=list[BagResponse])
-async def get_bags(session: T_Session, skip: int = 0, limit: int = 100):
-    """Get all bags with optional pagination."""
-    result = await session.execute(select(Bag).offset(skip).limit(limit))
-    bags = result.scalars().all()
+async def get_bags(session: T_Session, cache: T_Cache, skip: int = 0, limit: int = 100, fast: bool = False):
+    """Get all bags with optional pagination, skipping response validation when fast is set."""
+    bags = await cache.get_list(session, Bag, BagResponse, skip, limit)
+
+    # Cached pages are already JSON-ready
+    if fast:
+        return serialized_json(bags)
+
     return bags
 
 
+@router.get("/page", response_model=CursorPage[BagResponse])
+async def get_bags_page(
+    session: T_ReadSession,
+    after: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    order_by: CursorOrder = CursorOrder.ID,
+):
+    """Get bags with keyset pagination, following next_cursor to fetch the next page."""
+    bags, next_cursor = await paginate(session, Bag, order_by, after, limit)
+    return CursorPage[BagResponse](items=bags, next_cursor=next_cursor)
+
+
 @router.get("/{bag_id}", response_model=BagResponse)
-async def get_bag(bag_id: int, session: T_Session):
+async def get_bag(bag_id: int, session: T_Session, cache: T_Cache):
     """Get a specific bag by ID."""
-    bag = await session.get(Bag, bag_id)
+    bag = await cache.get(session, Bag, bag_id, BagResponse)
 
     if not bag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bag with id {bag_id} not found")
@@ -53,7 +75,7 @@ async def get_bag(bag_id: int, session: T_Session):
 
 
 @router.put("/{bag_id}", response_model=BagResponse)
-async def update_bag(bag_id: int, bag_update: BagUpdate, session: T_Session):
+async def update_bag(bag_id: int, bag_update: BagUpdate, session: T_Session, cache: T_Cache):
     """Update an existing bag."""
     # Get the existing bag
     bag = await session.get(Bag, bag_id)
@@ -69,12 +91,13 @@ async def update_bag(bag_id: int, bag_update: BagUpdate, session: T_Session):
 
     await session.commit()
     await session.refresh(bag)
+    await cache.invalidate(Bag, bag_id)
 
     return bag
 
 
 @router.delete("/{bag_id}", response_model=Message)
-async def delete_bag(bag_id: int, session: T_Session):
+async def delete_bag(bag_id: int, session: T_Session, cache: T_Cache):
     """Delete a bag."""
     bag = await session.get(Bag, bag_id)
 
@@ -83,5 +106,6 @@ async def delete_bag(bag_id: int, session: T_Session):
 
     await session.delete(bag)
     await session.commit()
+    await cache.invalidate(Bag, bag_id)
 
     return Message(message=f"Bag with id {bag_id} has been deleted successfully")
@@ -1,22 +1,30 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from trip_packer.database import get_session
-from trip_packer.models import Item
-from trip_packer.schemas import ItemCreate, ItemResponse, ItemUpdate, Message
+from trip_packer.autocomplete import ItemPrefixIndex, get_item_index
+from trip_packer.cache import CatalogCache, get_catalog_cache
+from trip_packer.database import get_read_session, get_session
+from trip_packer.models import Item, ItemCategory
+from trip_packer.pagination import CursorOrder, paginate
+from trip_packer.schemas import CursorPage, ItemCreate, ItemResponse, ItemSuggestion, ItemUpdate, Message
+from trip_packer.serialization import serialized_json
 
 router = APIRouter(prefix="/items", tags=["items"])
 T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+# Routes filling the shared cache read from the primary; a lagging replica would put back rows a write just evicted
+T_Cache = Annotated[CatalogCache, Depends(get_catalog_cache)]
+T_Index = Annotated[ItemPrefixIndex, Depends(get_item_index)]
 
 
 @router.post("/", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
-async def create_item(item: ItemCreate, session: T_Session):
+async def create_item(item: ItemCreate, session: T_Session, cache: T_Cache, index: T_Index):
     """Create a new item."""
-    new_item = Item(name=item.name, category=item.category)
+    new_item = Item(name=item.name, category=item.category, volume_liters=item.volume_liters, weight_kg=item.weight_kg)
 
     session.add(new_item)
     try:
@@ -29,22 +37,75 @@ async def create_item(item: ItemCreate, session: T_Session):
         )
 
     await session.refresh(new_item)
+    await cache.invalidate(Item, new_item.id)
+    index.add(new_item.id, new_item.name, new_item.category)
 
     return new_item
 
 
 @router.get("/", response_model=list[ItemResponse])
-async def get_items(session: T_Session, skip: int = 0, limit: int = 100):
-    """Get all items with optional pagination."""
-    result = await session.execute(select(Item).offset(skip).limit(limit))
-    items = result.scalars().all()
+async def get_items(session: T_Session, cache: T_Cache, skip: int = 0, limit: int = 100, fast: bool = False):
+    """Get all items with optional pagination, skipping response validation when fast is set."""
+    items = await cache.get_list(session, Item, ItemResponse, skip, limit)
+
+    # Cached pages are already JSON-ready
+    if fast:
+        return serialized_json(items)
+
     return items
 
 
+@router.get("/page", response_model=CursorPage[ItemResponse])
+async def get_items_page(
+    session: T_ReadSession,
+    after: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    order_by: CursorOrder = CursorOrder.ID,
+):
+    """Get items with keyset pagination, following next_cursor to fetch the next page."""
+    items, next_cursor = await paginate(session, Item, order_by, after, limit)
+    return CursorPage[ItemResponse](items=items, next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=list[ItemResponse])
+async def search_items(
+    session: T_ReadSession,
+    q: Annotated[str, Query(min_length=1)],
+    category: Optional[ItemCategory] = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    """Search items by name, ranking prefix matches first and then by trigram similarity to catch typos."""
+    prefix_match = Item.name.istartswith(q, autoescape=True)
+    query = (
+        select(Item)
+        # % is the pg_trgm similarity operator
+        .where(or_(Item.name.icontains(q, autoescape=True), Item.name.op("%")(q)))
+        .order_by(case((prefix_match, 0), else_=1), func.similarity(Item.name, q).desc(), Item.name)
+        .limit(limit)
+    )
+    if category is not None:
+        query = query.where(Item.category == category)
+
+    return (await session.scalars(query)).all()
+
+
+@router.get("/autocomplete", response_model=list[ItemSuggestion])
+async def autocomplete_items(
+    session: T_Session,
+    index: T_Index,
+    q: Annotated[str, Query(min_length=1)],
+    category: Optional[ItemCategory] = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    """Suggest items with a word starting with the typed text, answered from an in-process index."""
+    await index.ensure_loaded(session)
+    return index.search(q, category, limit)
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
-async def get_item(item_id: int, session: T_Session):
+async def get_item(item_id: int, session: T_Session, cache: T_Cache):
     """Get a specific item by ID."""
-    item = await session.get(Item, item_id)
+    item = await cache.get(session, Item, item_id, ItemResponse)
 
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Item with id {item_id} not found")
@@ -53,7 +114,7 @@ async def get_item(item_id: int, session: T_Session):
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
-async def update_item(item_id: int, item_update: ItemUpdate, session: T_Session):
+async def update_item(item_id: int, item_update: ItemUpdate, session: T_Session, cache: T_Cache, index: T_Index):
     """Update an existing item."""
     # Get the existing item
     item = await session.get(Item, item_id)
@@ -69,12 +130,14 @@ async def update_item(item_id: int, item_update: ItemUpdate, session: T_Session)
 
     await session.commit()
     await session.refresh(item)
+    await cache.invalidate(Item, item_id)
+    index.add(item.id, item.name, item.category)
 
     return item
 
 
 @router.delete("/{item_id}", response_model=Message)
-async def delete_item(item_id: int, session: T_Session):
+async def delete_item(item_id: int, session: T_Session, cache: T_Cache, index: T_Index):
     """Delete an item."""
     item = await session.get(Item, item_id)
 
@@ -83,5 +146,7 @@ async def delete_item(item_id: int, session: T_Session):
 
     await session.delete(item)
     await session.commit()
+    await cache.invalidate(Item, item_id)
+    index.remove(item_id)
 
     return Message(message=f"Item with id {item_id} has been deleted successfully")
@@ -0,0 +1,110 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trip_packer import services
+from trip_packer.database import get_session
+from trip_packer.events import EventBroker, get_event_broker
+from trip_packer.jobs import JobHandler, JobRunner, get_job_runner
+from trip_packer.models import Job, JobStatus
+from trip_packer.schemas import (
+    AssignPackingJob,
+    BulkPackingJob,
+    CloneTripJob,
+    JobCreate,
+    JobKind,
+    JobResponse,
+)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_Runner = Annotated[JobRunner, Depends(get_job_runner)]
+T_Events = Annotated[EventBroker, Depends(get_event_broker)]
+
+
+async def _clone_trip(session: AsyncSession, events: EventBroker, params: CloneTripJob):
+    return await services.clone_trip(session, params.trip_id, params)
+
+
+async def _assign_packing(session: AsyncSession, events: EventBroker, params: AssignPackingJob):
+    return await services.assign_packing(session, events, params.trip_id, params)
+
+
+async def _bulk_packing(session: AsyncSession, events: EventBroker, params: BulkPackingJob):
+    return await services.bulk_upsert_packing(session, events, params.trip_id, params.packings, upsert=params.upsert)
+
+
+# The params schema of each kind and the operation it runs, the same code the synchronous endpoints use
+JOB_HANDLERS = {
+    JobKind.CLONE_TRIP: (CloneTripJob, _clone_trip),
+    JobKind.ASSIGN_PACKING: (AssignPackingJob, _assign_packing),
+    JobKind.BULK_PACKING: (BulkPackingJob, _bulk_packing),
+}
+
+
+def job_handler(kind: JobKind, events: EventBroker) -> JobHandler:
+    """Handler running a job of this kind, publishing its changes to the given broker."""
+    params_schema, operation = JOB_HANDLERS[kind]
+
+    async def handler(session: AsyncSession, params: dict) -> dict:
+        response: BaseModel = await operation(session, events, params_schema.model_validate(params))
+        return response.model_dump(mode="json")
+
+    return handler
+
+
+async def _get_job(session: AsyncSession, job_id: int) -> Job:
+    job = await session.get(Job, job_id, populate_existing=True)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with id {job_id} not found")
+    return job
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(job: JobCreate, session: T_Session, runner: T_Runner, events: T_Events):
+    """Queue a long-running operation and return right away; poll the job for its status."""
+    params_schema, _ = JOB_HANDLERS[job.kind]
+
+    # Reject bad params now rather than failing the job later
+    try:
+        params = params_schema.model_validate(job.params).model_dump(mode="json")
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors(include_url=False)
+        ) from exc
+
+    return await runner.submit(session, job.kind, params, job_handler(job.kind, events))
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, session: T_Session):
+    return await _get_job(session, job_id)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: int, session: T_Session):
+    """Result of a job, the same body the synchronous endpoint returns."""
+    job = await _get_job(session, job_id)
+
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job with id {job_id} failed: {job.error}")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job with id {job_id} is {job.status.value.lower()}"
+        )
+
+    return job.result
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: int, session: T_Session, runner: T_Runner):
+    job = await _get_job(session, job_id)
+
+    if not await runner.cancel(session, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job with id {job_id} is {job.status.value.lower()}"
+        )
+
+    return await _get_job(session, job_id)
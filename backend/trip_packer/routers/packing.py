@@ -1,28 +1,92 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
 from http import HTTPStatus
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import selectinload
 
-from trip_packer.database import get_session
+from trip_packer import services
+from trip_packer.cache import CatalogCache, get_catalog_cache
+from trip_packer.coalescing import WriteCoalescer, get_write_coalescer
+from trip_packer.conditional import (
+    ResourceVersion,
+    is_not_modified,
+    not_modified,
+    resource_version,
+    set_version_headers,
+)
+from trip_packer.database import get_read_session, get_session
+from trip_packer.events import EventBroker, get_event_broker
 from trip_packer.models import Bag, Item, Packing, Trip
 from trip_packer.schemas import (
+    BagResponse,
+    ExportFormat,
+    ItemResponse,
     Message,
+    PackingAssign,
+    PackingAssignResponse,
+    PackingBulkResponse,
     PackingCreate,
     PackingDetailResponse,
     PackingResponse,
+    PackingStatusUpdate,
+    PackingStatusUpdateResponse,
+    PackingToggle,
+    PackingToggleResponse,
+    PackingToggleResult,
     PackingUpdate,
 )
+from trip_packer.serialization import nest_rows, schema_columns, serialized_rows
 
 router = APIRouter(prefix="/trips/{trip_id}/packing-list", tags=["packing"])
 T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_Cache = Annotated[CatalogCache, Depends(get_catalog_cache)]
+T_Events = Annotated[EventBroker, Depends(get_event_broker)]
+T_Coalescer = Annotated[WriteCoalescer, Depends(get_write_coalescer)]
+
+
+# Rows fetched per round trip from the server-side cursor of an export
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
+PACKING_TOGGLES = TypeAdapter(List[PackingToggle])
+
+# Hot queries, built once with their parameters bound at execution
+PACKING_ENTRY_QUERY = select(Packing).where(
+    Packing.trip_id == bindparam("trip_id"),
+    Packing.item_id == bindparam("item_id"),
+    Packing.bag_id == bindparam("bag_id"),
+)
+PACKING_LIST_QUERY = (
+    select(Packing)
+    .where(Packing.trip_id == bindparam("trip_id"))
+    .options(selectinload(Packing.item), selectinload(Packing.bag))
+)
+PACKING_LIST_ROWS_QUERY = (
+    select(
+        *schema_columns(PackingDetailResponse, Packing.__table__),
+        *schema_columns(ItemResponse, Item.__table__, prefix="item."),
+        *schema_columns(BagResponse, Bag.__table__, prefix="bag."),
+    )
+    .join(Item, Item.id == Packing.item_id)
+    .join(Bag, Bag.id == Packing.bag_id)
+    .where(Packing.trip_id == bindparam("trip_id"))
+)
 
 
 @router.post("/", response_model=PackingResponse, status_code=status.HTTP_201_CREATED)
-async def create_packing(trip_id: int, packing: PackingCreate, session: T_Session):
+async def create_packing(trip_id: int, packing: PackingCreate, session: T_Session, cache: T_Cache, events: T_Events):
     """Create a new packing entry."""
     # Check if trip exists
     trip = await session.get(Trip, trip_id)
@@ -30,12 +94,12 @@ async def create_packing(trip_id: int, packing: PackingCreate, session: T_Sessio
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
     # Check if item exists
-    item = await session.get(Item, packing.item_id)
+    item = await cache.get(session, Item, packing.item_id, ItemResponse)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Item with id {packing.item_id} not found")
 
     # Check if bag exists
-    bag = await session.get(Bag, packing.bag_id)
+    bag = await cache.get(session, Bag, packing.bag_id, BagResponse)
     if not bag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bag with id {packing.bag_id} not found")
 
@@ -59,34 +123,153 @@ async def create_packing(trip_id: int, packing: PackingCreate, session: T_Sessio
         )
 
     await session.refresh(new_packing)
+    await events.publish(trip_id, "packing.created", PackingResponse.model_validate(new_packing))
 
     return new_packing
 
 
+@router.post("/bulk", response_model=PackingBulkResponse)
+async def bulk_upsert_packing(
+    trip_id: int, packings: List[PackingCreate], session: T_Session, events: T_Events, upsert: bool = True
+):
+    """Create many packing entries at once, updating existing ones when upsert is enabled."""
+    return await services.bulk_upsert_packing(session, events, trip_id, packings, upsert=upsert)
+
+
+@router.post("/assign", response_model=PackingAssignResponse)
+async def assign_packing(trip_id: int, session: T_Session, events: T_Events, options: PackingAssign = PackingAssign()):
+    """Replace the packing list with a bag for every trip item, computed by a bin-packing heuristic."""
+    return await services.assign_packing(session, events, trip_id, options)
+
+
+def _packing_list_version_query():
+    trip_id = bindparam("trip_id")
+    packings = select(Packing.updated_at).where(Packing.trip_id == trip_id)
+    items = select(Item.updated_at).join(Packing, Packing.item_id == Item.id).where(Packing.trip_id == trip_id)
+    bags = select(Bag.updated_at).join(Packing, Packing.bag_id == Bag.id).where(Packing.trip_id == trip_id)
+
+    return select(
+        packings.with_only_columns(func.max(Packing.updated_at)).scalar_subquery(),
+        packings.with_only_columns(func.count()).scalar_subquery(),
+        items.with_only_columns(func.max(Item.updated_at)).scalar_subquery(),
+        bags.with_only_columns(func.max(Bag.updated_at)).scalar_subquery(),
+    ).where(Trip.id == trip_id)
+
+
+PACKING_LIST_VERSION_QUERY = _packing_list_version_query()
+
+
+async def _packing_list_version(session: AsyncSession, trip_id: int) -> ResourceVersion | None:
+    """Version of everything shown in the packing list, computed with a single aggregate query."""
+    result = await session.execute(PACKING_LIST_VERSION_QUERY, {"trip_id": trip_id})
+    row = result.one_or_none()
+
+    return resource_version(*row) if row else None
+
+
 @router.get("/", response_model=List[PackingDetailResponse])
-async def get_trip_packing(trip_id: int, session: T_Session):
+async def get_trip_packing(
+    trip_id: int, request: Request, response: Response, session: T_ReadSession, fast: bool = False
+):
     """Get all packing entries for a specific trip with detailed information."""
-    # First check if trip exists
-    trip = await session.get(Trip, trip_id)
-    if not trip:
+    # Checks the trip exists while versioning the list
+    version = await _packing_list_version(session, trip_id)
+    if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
+    if is_not_modified(request, version):
+        return not_modified(version)
+
+    # Plain rows encoded without validation
+    if fast:
+        result = await session.execute(PACKING_LIST_ROWS_QUERY, {"trip_id": trip_id})
+        fast_response = serialized_rows(PackingDetailResponse, nest_rows(result.mappings(), "item", "bag"))
+        set_version_headers(fast_response, version)
+        return fast_response
+
     # Get packing entries for this trip with related objects
-    result = await session.execute(
-        select(Packing).where(Packing.trip_id == trip_id).options(selectinload(Packing.item), selectinload(Packing.bag))
-    )
+    result = await session.execute(PACKING_LIST_QUERY, {"trip_id": trip_id})
     packings = result.scalars().all()
 
+    set_version_headers(response, version)
+
     return packings
 
 
+def _export_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _stream_packing_export(bind: AsyncEngine, trip_id: int, export_format: ExportFormat):
+    """Yield the packing list of a trip chunk by chunk, straight from a server-side cursor."""
+    query = (
+        select(
+            Packing.trip_id,
+            Packing.item_id,
+            Item.name.label("item_name"),
+            Item.category.label("item_category"),
+            Packing.bag_id,
+            Bag.name.label("bag_name"),
+            Bag.type.label("bag_type"),
+            Packing.quantity,
+            Packing.status,
+            Packing.created_at,
+            Packing.updated_at,
+        )
+        .join(Item, Item.id == Packing.item_id)
+        .join(Bag, Bag.id == Packing.bag_id)
+        .where(Packing.trip_id == trip_id)
+        .order_by(Packing.item_id, Packing.bag_id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    # The request session is closed once the response starts, so the export holds its own connection
+    async with bind.connect() as conn:
+        result = await conn.stream(query)
+        columns = list(result.keys())
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(columns)
+            yield buffer.getvalue()
+
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            if export_format == ExportFormat.CSV:
+                csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps({column: _export_value(value) for column, value in zip(columns, row)}))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_trip_packing(trip_id: int, session: T_ReadSession, format: ExportFormat = ExportFormat.NDJSON):
+    """Stream the packing list of a trip as NDJSON or CSV, keeping memory flat however large the trip is."""
+    trip = await session.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    return StreamingResponse(
+        _stream_packing_export(session.bind, trip_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trip-{trip_id}-packing-list.{format.value}"'},
+    )
+
+
 @router.put("/{item_id}/{bag_id}", response_model=PackingResponse)
-async def update_packing(trip_id: int, item_id: int, packing_update: PackingUpdate, session: T_Session, bag_id: int):
+async def update_packing(  # noqa: PLR0913, PLR0917
+    trip_id: int, item_id: int, packing_update: PackingUpdate, session: T_Session, events: T_Events, bag_id: int
+):
     """Update an existing packing entry."""
     # Get the existing packing entry
-    query = select(Packing).where(Packing.trip_id == trip_id, Packing.item_id == item_id, Packing.bag_id == bag_id)
-
-    result = await session.execute(query)
+    params = {"trip_id": trip_id, "item_id": item_id, "bag_id": bag_id}
+    result = await session.execute(PACKING_ENTRY_QUERY, params)
     packing = result.scalar_one_or_none()
 
     if not packing:
@@ -104,26 +287,123 @@ async def update_packing(trip_id: int, item_id: int, packing_update: PackingUpda
 
     await session.commit()
     await session.refresh(packing)
+    await events.publish(trip_id, "packing.updated", PackingResponse.model_validate(packing))
 
     return packing
 
 
+@router.patch("/status", response_model=PackingStatusUpdateResponse)
+async def update_packing_status(
+    trip_id: int, status_update: PackingStatusUpdate, session: T_Session, events: T_Events, include_rows: bool = True
+):
+    """Move every matching packing entry of a trip to a new status in a single statement."""
+    query = update(Packing).where(Packing.trip_id == trip_id).values(status=status_update.status)
+
+    if status_update.bag_id is not None:
+        query = query.where(Packing.bag_id == status_update.bag_id)
+    if status_update.category is not None:
+        query = query.where(Packing.item_id.in_(select(Item.id).where(Item.category == status_update.category)))
+    if status_update.current_status is not None:
+        query = query.where(Packing.status == status_update.current_status)
+
+    # "fetch" keeps already loaded objects in sync through RETURNING instead of a second query
+    execution_options = {"synchronize_session": "fetch"}
+    if include_rows:
+        result = await session.execute(query.returning(Packing), execution_options=execution_options)
+        packings = result.scalars().all()
+        updated = len(packings)
+    else:
+        result = await session.execute(query, execution_options=execution_options)
+        packings = []
+        updated = result.rowcount
+
+    await session.commit()
+
+    # Only pay for the existence check when nothing matched
+    if not updated and not await session.get(Trip, trip_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    # One event for the whole statement rather than one per row
+    if updated:
+        await events.publish(trip_id, "packing.reset")
+
+    return PackingStatusUpdateResponse(updated=updated, packings=packings)
+
+
+async def _apply_toggles(coalescer: WriteCoalescer, trip_id: int, toggles: List[PackingToggle]):
+    packings = await coalescer.submit(trip_id, [(toggle.item_id, toggle.bag_id, toggle.status) for toggle in toggles])
+
+    return PackingToggleResponse(
+        updated=len({(packing.item_id, packing.bag_id) for packing in packings if packing}),
+        results=[
+            PackingToggleResult(item_id=toggle.item_id, bag_id=toggle.bag_id, packing=packing)
+            for toggle, packing in zip(toggles, packings)
+        ],
+    )
+
+
+@router.patch("/toggles", response_model=PackingToggleResponse)
+async def toggle_packing(trip_id: int, toggles: List[PackingToggle], session: T_Session, coalescer: T_Coalescer):
+    """Set the status of packing entries, batched with the toggles of other requests into one write per window."""
+    response = await _apply_toggles(coalescer, trip_id, toggles)
+
+    # Only pay for the existence check when nothing matched
+    if not response.updated and not await session.get(Trip, trip_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    return response
+
+
+@router.websocket("/toggles/ws")
+async def toggle_packing_ws(websocket: WebSocket, trip_id: int, coalescer: T_Coalescer):
+    """Each message is a list of toggles, acknowledged with the final state of its entries once written."""
+    # Checked before the handshake completes, so a missing trip is refused instead of accepting toggles it drops
+    async with coalescer.engine.connect() as conn:
+        trip = await conn.scalar(select(Trip.id).where(Trip.id == trip_id))
+    if trip is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=f"Trip with id {trip_id} not found")
+        return
+
+    await websocket.accept()
+    pending = set()
+
+    async def acknowledge(toggles: List[PackingToggle]):
+        response = await _apply_toggles(coalescer, trip_id, toggles)
+        await websocket.send_text(response.model_dump_json())
+
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                toggles = PACKING_TOGGLES.validate_json(message)
+            except ValidationError as exc:
+                await websocket.send_json({"detail": exc.errors(include_url=False, include_context=False)})
+                continue
+
+            # Keep reading while earlier messages wait for their flush
+            task = asyncio.create_task(acknowledge(toggles))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except WebSocketDisconnect:
+        for task in pending:
+            task.cancel()
+
+
 @router.delete("/{item_id}/{bag_id}", response_model=Message)
-async def delete_packing(trip_id: int, item_id: int, session: T_Session, bag_id: int):
+async def delete_packing(trip_id: int, item_id: int, session: T_Session, events: T_Events, bag_id: int):
     """Delete one or more packing entries."""
     # Check if trip exists
     trip = await session.get(Trip, trip_id)
     if not trip:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
-    query = select(Packing).where(Packing.trip_id == trip_id, Packing.item_id == item_id, Packing.bag_id == bag_id)
-
     not_found_detail = f"Packing entry for item {item_id} in trip {trip_id} and bag {bag_id} not found"
     success_message = (
         f"Packing entry for item {item_id} in trip {trip_id} and bag {bag_id} has been deleted successfully"
     )
 
-    result = await session.execute(query)
+    params = {"trip_id": trip_id, "item_id": item_id, "bag_id": bag_id}
+    result = await session.execute(PACKING_ENTRY_QUERY, params)
     packings_to_delete = result.scalars().all()
 
     if not packings_to_delete:
@@ -135,5 +415,6 @@ async def delete_packing(trip_id: int, item_id: int, session: T_Session, bag_id:
         await session.delete(packing)
 
     await session.commit()
+    await events.publish(trip_id, "packing.deleted", {"item_id": item_id, "bag_id": bag_id})
 
     return Message(message=success_message)
@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import DateTime, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trip_packer.database import get_session, settings
+from trip_packer.models import Tombstone
+from trip_packer.schemas import SyncResponse
+from trip_packer.sync import SYNCED_MODELS
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+
+# Pages walk the deletions first and then each table in SYNCED_MODELS order, by primary key
+SECTIONS = (("deleted", Tombstone), *((model.__tablename__, model) for model in SYNCED_MODELS))
+
+
+def _encode_cursor(since: datetime | None, watermark: datetime, section: str, key: list | None) -> str:
+    payload = {
+        "since": since.isoformat() if since else None,
+        "watermark": watermark.isoformat(),
+        "section": section,
+        "key": key,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime | None, datetime, str, list | None]:
+    invalid_cursor = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync cursor")
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        since = datetime.fromisoformat(payload["since"]) if payload["since"] else None
+        watermark = datetime.fromisoformat(payload["watermark"])
+        section, key = payload["section"], payload["key"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise invalid_cursor
+
+    models = dict(SECTIONS)
+    if section not in models:
+        raise invalid_cursor
+    if key is not None and (
+        not isinstance(key, list)
+        or len(key) != len(models[section].__table__.primary_key.columns)
+        or not all(isinstance(value, int) for value in key)
+    ):
+        raise invalid_cursor
+    return since, watermark, section, key
+
+
+async def _new_watermark(session: AsyncSession, since: datetime | None) -> datetime:
+    """Watermark of a sync starting now, refusing clients behind the tombstone retention."""
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    # localtimestamp matches the timezone-less updated_at columns
+    watermark, expired = (
+        await session.execute(
+            select(func.localtimestamp(), literal(since, DateTime) < func.localtimestamp() - retention)
+        )
+    ).one()
+
+    # Tombstones older than the retention are purged, so a client that far behind has to start over
+    if expired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE, detail="Watermark is older than the tombstone retention, sync again"
+        )
+    return watermark
+
+
+def _section_query(model, cutoff: datetime | None, after: list | None, limit: int):
+    columns = tuple(model.__table__.primary_key.columns)
+    query = select(model).order_by(*columns).limit(limit)
+    if cutoff is not None:
+        changed_at = model.deleted_at if model is Tombstone else model.updated_at
+        query = query.where(changed_at >= cutoff)
+    if after:
+        query = query.where(tuple_(*columns) > tuple_(*after))
+    return query
+
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    session: T_Session,
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.SYNC_MAX_PAGE_SIZE)] = settings.SYNC_PAGE_SIZE,
+):
+    """One page of the rows changed and the keys of rows deleted since the watermark, or of everything without one.
+
+    Follow next_cursor until it is empty, then keep the watermark for the next sync; every page of a sync carries
+    the watermark of its first page.
+    """
+    if cursor:
+        since, watermark, section, after = _decode_cursor(cursor)
+    else:
+        watermark = await _new_watermark(session, since)
+        section, after = SECTIONS[0][0], None
+
+    # updated_at is the start time of the writing transaction, so rows committed by transactions still running at
+    # the last sync may be older than its watermark; looking back a little sends them instead of losing them
+    cutoff = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS) if since else None
+
+    page = {name: [] for name, _ in SECTIONS}
+    remaining = limit
+    next_cursor = None
+    start = [name for name, _ in SECTIONS].index(section)
+
+    for name, model in SECTIONS[start:]:
+        if model is Tombstone and cutoff is None:
+            continue
+        if remaining == 0:
+            next_cursor = _encode_cursor(since, watermark, name, None)
+            break
+
+        query = _section_query(model, cutoff, after if name == section else None, remaining + 1)
+        rows = (await session.scalars(query)).all()
+        if len(rows) > remaining:
+            page[name] = rows[:remaining]
+            last = rows[remaining - 1]
+            key = [getattr(last, column.key) for column in model.__table__.primary_key.columns]
+            next_cursor = _encode_cursor(since, watermark, name, key)
+            break
+
+        page[name] = rows
+        remaining -= len(rows)
+
+    return SyncResponse(watermark=watermark, next_cursor=next_cursor, **page)
@@ -2,27 +2,54 @@ from http import HTTPStatus
 from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from trip_packer.database import get_session
-from trip_packer.models import Item, Trip, TripItem
+from trip_packer.cache import CatalogCache, get_catalog_cache
+from trip_packer.database import get_read_session, get_session
+from trip_packer.events import EventBroker, get_event_broker
+from trip_packer.models import Item, Packing, Trip, TripItem
 from trip_packer.schemas import (
+    ItemResponse,
     Message,
     TripItemCreate,
     TripItemDetailResponse,
     TripItemResponse,
+    TripItemStatusUpdate,
+    TripItemStatusUpdateResponse,
     TripItemUpdate,
 )
+from trip_packer.serialization import nest_rows, schema_columns, serialized_rows
 
 router = APIRouter(prefix="/trips/{trip_id}/trip-items", tags=["trip-items"])
 T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_Cache = Annotated[CatalogCache, Depends(get_catalog_cache)]
+T_Events = Annotated[EventBroker, Depends(get_event_broker)]
+
+# Hot queries, built once with their parameters bound at execution
+TRIP_ITEM_ENTRY_QUERY = select(TripItem).where(
+    TripItem.trip_id == bindparam("trip_id"), TripItem.item_id == bindparam("item_id")
+)
+TRIP_ITEM_LIST_QUERY = (
+    select(TripItem).where(TripItem.trip_id == bindparam("trip_id")).options(selectinload(TripItem.item))
+)
+TRIP_ITEM_ROWS_QUERY = (
+    select(
+        *schema_columns(TripItemDetailResponse, TripItem.__table__),
+        *schema_columns(ItemResponse, Item.__table__, prefix="item."),
+    )
+    .join(Item, Item.id == TripItem.item_id)
+    .where(TripItem.trip_id == bindparam("trip_id"))
+)
 
 
 @router.post("/", response_model=TripItemResponse, status_code=status.HTTP_201_CREATED)
-async def create_trip_item(trip_id: int, trip_item: TripItemCreate, session: T_Session):
+async def create_trip_item(
+    trip_id: int, trip_item: TripItemCreate, session: T_Session, cache: T_Cache, events: T_Events
+):
     """Create a new trip item entry."""
     # Check if trip exists
     trip = await session.get(Trip, trip_id)
@@ -30,7 +57,7 @@ async def create_trip_item(trip_id: int, trip_item: TripItemCreate, session: T_S
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
     # Check if item exists
-    item = await session.get(Item, trip_item.item_id)
+    item = await cache.get(session, Item, trip_item.item_id, ItemResponse)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Item with id {trip_item.item_id} not found")
 
@@ -53,34 +80,38 @@ async def create_trip_item(trip_id: int, trip_item: TripItemCreate, session: T_S
         )
 
     await session.refresh(new_trip_item)
+    await events.publish(trip_id, "trip_item.created", TripItemResponse.model_validate(new_trip_item))
 
     return new_trip_item
 
 
 @router.get("/", response_model=List[TripItemDetailResponse])
-async def get_trip_items(trip_id: int, session: T_Session):
+async def get_trip_items(trip_id: int, session: T_ReadSession, fast: bool = False):
     """Get all trip item entries for a specific trip with detailed information."""
     # First check if trip exists
     trip = await session.get(Trip, trip_id)
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
+    # Plain rows encoded without validation
+    if fast:
+        result = await session.execute(TRIP_ITEM_ROWS_QUERY, {"trip_id": trip_id})
+        return serialized_rows(TripItemDetailResponse, nest_rows(result.mappings(), "item"))
+
     # Get trip item entries for this trip with related objects
-    result = await session.execute(
-        select(TripItem).where(TripItem.trip_id == trip_id).options(selectinload(TripItem.item))
-    )
+    result = await session.execute(TRIP_ITEM_LIST_QUERY, {"trip_id": trip_id})
     trip_items = result.scalars().all()
 
     return trip_items
 
 
 @router.put("/{item_id}", response_model=TripItemResponse)
-async def update_trip_item(trip_id: int, item_id: int, trip_item_update: TripItemUpdate, session: T_Session):
+async def update_trip_item(
+    trip_id: int, item_id: int, trip_item_update: TripItemUpdate, session: T_Session, events: T_Events
+):
     """Update an existing trip item entry."""
     # Get the existing trip item entry
-    query = select(TripItem).where(TripItem.trip_id == trip_id, TripItem.item_id == item_id)
-
-    result = await session.execute(query)
+    result = await session.execute(TRIP_ITEM_ENTRY_QUERY, {"trip_id": trip_id, "item_id": item_id})
     trip_item = result.scalar_one_or_none()
 
     if not trip_item:
@@ -98,24 +129,66 @@ async def update_trip_item(trip_id: int, item_id: int, trip_item_update: TripIte
 
     await session.commit()
     await session.refresh(trip_item)
+    await events.publish(trip_id, "trip_item.updated", TripItemResponse.model_validate(trip_item))
 
     return trip_item
 
 
+@router.patch("/status", response_model=TripItemStatusUpdateResponse)
+async def update_trip_item_status(
+    trip_id: int, status_update: TripItemStatusUpdate, session: T_Session, events: T_Events, include_rows: bool = True
+):
+    """Move every matching trip item entry of a trip to a new status in a single statement."""
+    query = update(TripItem).where(TripItem.trip_id == trip_id).values(status=status_update.status)
+
+    if status_update.bag_id is not None:
+        # Trip items have no bag of their own, so match the ones packed into the given bag
+        query = query.where(
+            TripItem.item_id.in_(
+                select(Packing.item_id).where(Packing.trip_id == trip_id, Packing.bag_id == status_update.bag_id)
+            )
+        )
+    if status_update.category is not None:
+        query = query.where(TripItem.item_id.in_(select(Item.id).where(Item.category == status_update.category)))
+    if status_update.current_status is not None:
+        query = query.where(TripItem.status == status_update.current_status)
+
+    # "fetch" keeps already loaded objects in sync through RETURNING instead of a second query
+    execution_options = {"synchronize_session": "fetch"}
+    if include_rows:
+        result = await session.execute(query.returning(TripItem), execution_options=execution_options)
+        trip_items = result.scalars().all()
+        updated = len(trip_items)
+    else:
+        result = await session.execute(query, execution_options=execution_options)
+        trip_items = []
+        updated = result.rowcount
+
+    await session.commit()
+
+    # Only pay for the existence check when nothing matched
+    if not updated and not await session.get(Trip, trip_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    # One event for the whole statement rather than one per row
+    if updated:
+        await events.publish(trip_id, "trip_item.reset")
+
+    return TripItemStatusUpdateResponse(updated=updated, trip_items=trip_items)
+
+
 @router.delete("/{item_id}", response_model=Message)
-async def delete_trip_item(trip_id: int, item_id: int, session: T_Session):
+async def delete_trip_item(trip_id: int, item_id: int, session: T_Session, events: T_Events):
     """Delete one or more trip item entries."""
     # Check if trip exists
     trip = await session.get(Trip, trip_id)
     if not trip:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
-    query = select(TripItem).where(TripItem.trip_id == trip_id, TripItem.item_id == item_id)
-
     not_found_detail = f"Trip item entry for item {item_id} in trip {trip_id} not found"
     success_message = f"Trip item entry for item {item_id} in trip {trip_id} has been deleted successfully"
 
-    result = await session.execute(query)
+    result = await session.execute(TRIP_ITEM_ENTRY_QUERY, {"trip_id": trip_id, "item_id": item_id})
     trip_items_to_delete = result.scalars().all()
 
     if not trip_items_to_delete:
@@ -127,5 +200,6 @@ async def delete_trip_item(trip_id: int, item_id: int, session: T_Session):
         await session.delete(trip_item)
 
     await session.commit()
+    await events.publish(trip_id, "trip_item.deleted", {"item_id": item_id})
 
     return Message(message=success_message)
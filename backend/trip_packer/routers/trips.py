@@ -1,24 +1,77 @@
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from itertools import chain
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    Integer,
+    String,
+    Text,
+    bindparam,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from trip_packer.database import get_session
-from trip_packer.models import Bag, Trip, TripBag, TripItem
+from trip_packer import services
+from trip_packer.conditional import (
+    ResourceVersion,
+    is_not_modified,
+    not_modified,
+    resource_version,
+    set_version_headers,
+)
+from trip_packer.database import get_read_session, get_session, settings
+from trip_packer.events import EventBroker, event_stream, get_event_broker
+from trip_packer.models import Bag, Item, Packing, Trip, TripBag, TripItem
+from trip_packer.pagination import CursorOrder, paginate
 from trip_packer.schemas import (
     BagResponse,
+    BagSummary,
+    CategorySummary,
+    CursorPage,
+    ItemResponse,
     Message,
+    PackingSummary,
+    StatusSummary,
+    SummaryTotals,
+    TripClone,
+    TripCloneResponse,
     TripCreate,
     TripDetailResponse,
+    TripItemDetailResponse,
+    TripItemSummary,
     TripResponse,
+    TripSummaryResponse,
     TripUpdate,
 )
+from trip_packer.serialization import schema_columns, serialized_rows
 
 router = APIRouter(prefix="/trips", tags=["trips"])
 T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_Events = Annotated[EventBroker, Depends(get_event_broker)]
+
+# Hot queries are built once with the trip id bound at execution: SQLAlchemy memoizes their cache key instead of
+# rebuilding and hashing them per request, and psycopg can prepare their SQL, which never changes, on the server
+TRIP_BAGS_QUERY = (
+    select(Trip).where(Trip.id == bindparam("trip_id")).options(selectinload(Trip.trip_bags).selectinload(TripBag.bag))
+)
+
+# GROUPING(status, bag_id, category) of each grouping set of the summary, a bit set for each column left out
+GROUPED_TOTAL = 0b111
+GROUPED_BY_STATUS = 0b011
+GROUPED_BY_BAG = 0b101
+GROUPED_BY_CATEGORY = 0b110
 
 
 @router.post("/", response_model=TripResponse, status_code=status.HTTP_201_CREATED)
@@ -42,30 +95,198 @@ async def create_trip(trip: TripCreate, session: T_Session):
 
 
 @router.get("/", response_model=list[TripResponse])
-async def get_trips(session: T_Session, skip: int = 0, limit: int = 100):
-    """Get all trips with optional pagination."""
-    result = await session.execute(select(Trip).offset(skip).limit(limit))
+async def get_trips(session: T_ReadSession, skip: int = 0, limit: int = 100, fast: bool = False):
+    """Get all trips with optional pagination, encoding plain rows without validation when fast is set."""
+    if fast:
+        query = select(*schema_columns(TripResponse, Trip.__table__)).order_by(Trip.id).offset(skip).limit(limit)
+        result = await session.execute(query)
+        return serialized_rows(TripResponse, result.mappings().all())
+
+    result = await session.execute(select(Trip).order_by(Trip.id).offset(skip).limit(limit))
     trips = result.scalars().all()
     return trips
 
 
+@router.get("/page", response_model=CursorPage[TripResponse])
+async def get_trips_page(
+    session: T_ReadSession,
+    after: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    order_by: CursorOrder = CursorOrder.ID,
+):
+    """Get trips with keyset pagination, following next_cursor to fetch the next page."""
+    trips, next_cursor = await paginate(session, Trip, order_by, after, limit)
+    return CursorPage[TripResponse](items=trips, next_cursor=next_cursor)
+
+
+def _trip_detail_version_query():
+    trip_id = bindparam("trip_id")
+    trip_bags = select(TripBag.updated_at).where(TripBag.trip_id == trip_id)
+    trip_items = select(TripItem.updated_at).where(TripItem.trip_id == trip_id)
+    bags = select(Bag.updated_at).join(TripBag, TripBag.bag_id == Bag.id).where(TripBag.trip_id == trip_id)
+    items = select(Item.updated_at).join(TripItem, TripItem.item_id == Item.id).where(TripItem.trip_id == trip_id)
+
+    return select(
+        Trip.updated_at,
+        trip_bags.with_only_columns(func.max(TripBag.updated_at)).scalar_subquery(),
+        trip_bags.with_only_columns(func.count()).scalar_subquery(),
+        trip_items.with_only_columns(func.max(TripItem.updated_at)).scalar_subquery(),
+        trip_items.with_only_columns(func.count()).scalar_subquery(),
+        bags.with_only_columns(func.max(Bag.updated_at)).scalar_subquery(),
+        items.with_only_columns(func.max(Item.updated_at)).scalar_subquery(),
+    ).where(Trip.id == trip_id)
+
+
+TRIP_DETAIL_VERSION_QUERY = _trip_detail_version_query()
+
+
+async def _trip_detail_version(session: AsyncSession, trip_id: int) -> ResourceVersion | None:
+    """Version of everything shown in the trip detail, computed with a single aggregate query."""
+    result = await session.execute(TRIP_DETAIL_VERSION_QUERY, {"trip_id": trip_id})
+    row = result.one_or_none()
+
+    return resource_version(*row) if row else None
+
+
+def _json_fields(schema, table, **nested):
+    """json_build_object() with the fields of a response schema, taken from the columns of the same name."""
+    fields = {column.name: column for column in schema_columns(schema, table)} | nested
+    arguments = chain.from_iterable((literal_column(f"'{name}'"), value) for name, value in fields.items())
+    return func.json_build_object(*arguments)
+
+
+def _json_list(element, order_by, query):
+    """JSON array aggregating one element per row of the query, empty rather than null when there are none."""
+    aggregated = func.coalesce(func.json_agg(aggregate_order_by(element, order_by)), literal_column("'[]'::json"))
+    return query.with_only_columns(aggregated).scalar_subquery()
+
+
+def _trip_detail_json_query():
+    bags = _json_list(
+        _json_fields(BagResponse, Bag.__table__),
+        Bag.id,
+        select(Bag.id).join(TripBag, TripBag.bag_id == Bag.id).where(TripBag.trip_id == Trip.id),
+    )
+    trip_items = _json_list(
+        _json_fields(TripItemDetailResponse, TripItem.__table__, item=_json_fields(ItemResponse, Item.__table__)),
+        TripItem.item_id,
+        select(TripItem.item_id).join(Item, Item.id == TripItem.item_id).where(TripItem.trip_id == Trip.id),
+    )
+    trip = _json_fields(TripDetailResponse, Trip.__table__, bags=bags, trip_items=trip_items)
+
+    return select(cast(trip, Text)).where(Trip.id == bindparam("trip_id"))
+
+
+TRIP_DETAIL_JSON_QUERY = _trip_detail_json_query()
+
+
+async def trip_detail_json(session: AsyncSession, trip_id: int) -> str | None:
+    """Trip detail rendered as JSON by Postgres in a single statement, shaped like TripDetailResponse."""
+    return await session.scalar(TRIP_DETAIL_JSON_QUERY, {"trip_id": trip_id})
+
+
 @router.get("/{trip_id}", response_model=TripDetailResponse)
-async def get_trip(trip_id: int, session: T_Session):
+async def get_trip(trip_id: int, request: Request, session: T_ReadSession):
     """Get a specific trip by ID with detailed information."""
+    version = await _trip_detail_version(session, trip_id)
+
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    if is_not_modified(request, version):
+        return not_modified(version)
+
+    # Most-hit endpoint: the database builds the JSON, skipping the eager loads and Pydantic validation
+    content = await trip_detail_json(session, trip_id)
+
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    response = Response(content=content, media_type="application/json")
+    set_version_headers(response, version)
+
+    return response
+
+
+@router.get("/{trip_id}/summary", response_model=TripSummaryResponse)
+async def get_trip_summary(trip_id: int, session: T_ReadSession):
+    """Get packing progress of a trip, counted by status, bag and category in a single grouped query."""
+    entries = union_all(
+        select(
+            literal("packings", String).label("source"),
+            Packing.status,
+            Packing.bag_id,
+            Item.category,
+            Packing.quantity,
+        )
+        .join(Item, Item.id == Packing.item_id)
+        .where(Packing.trip_id == trip_id),
+        select(
+            literal("trip_items", String),
+            TripItem.status,
+            cast(null(), Integer),
+            Item.category,
+            TripItem.quantity,
+        )
+        .join(Item, Item.id == TripItem.item_id)
+        .where(TripItem.trip_id == trip_id),
+    ).subquery()
+
+    # GROUPING() flags the columns left out of each grouping set, telling the groups apart
+    grouped = func.grouping(entries.c.status, entries.c.bag_id, entries.c.category)
     result = await session.execute(
-        select(Trip)
-        .where(Trip.id == trip_id)
-        .options(
-            selectinload(Trip.trip_bags).selectinload(TripBag.bag),
-            selectinload(Trip.trip_items).selectinload(TripItem.item),
+        select(
+            entries.c.source,
+            entries.c.status,
+            entries.c.bag_id,
+            entries.c.category,
+            grouped.label("grouped"),
+            func.count().label("entry_count"),
+            func.sum(entries.c.quantity).label("quantity"),
+        ).group_by(
+            func.grouping_sets(
+                tuple_(entries.c.source),
+                tuple_(entries.c.source, entries.c.status),
+                tuple_(entries.c.source, entries.c.bag_id),
+                tuple_(entries.c.source, entries.c.category),
+            )
         )
     )
-    trip = result.scalar_one_or_none()
+    rows = result.all()
 
+    # Only pay for the existence check when nothing matched
+    if not rows and not await session.get(Trip, trip_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    summaries = {"packings": PackingSummary(), "trip_items": TripItemSummary()}
+    for row in rows:
+        summary = summaries[row.source]
+        totals = {"count": row.entry_count, "quantity": row.quantity}
+        if row.grouped == GROUPED_TOTAL:
+            summary.total = SummaryTotals(**totals)
+        elif row.grouped == GROUPED_BY_STATUS:
+            summary.by_status.append(StatusSummary(status=row.status, **totals))
+        elif row.grouped == GROUPED_BY_CATEGORY:
+            summary.by_category.append(CategorySummary(category=row.category, **totals))
+        elif row.grouped == GROUPED_BY_BAG and row.source == "packings":
+            summary.by_bag.append(BagSummary(bag_id=row.bag_id, **totals))
+
+    return TripSummaryResponse(trip_id=trip_id, **summaries)
+
+
+@router.get("/{trip_id}/events")
+async def get_trip_events(trip_id: int, session: T_ReadSession, events: T_Events):
+    """Stream changes to the packing list and trip items of a trip as server-sent events."""
+    trip = await session.get(Trip, trip_id)
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
 
-    return trip
+    return StreamingResponse(
+        event_stream(events, trip_id, settings.EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        # Proxies such as nginx would otherwise hold events back in their buffers
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/{trip_id}", response_model=TripResponse)
@@ -103,12 +324,16 @@ async def delete_trip(trip_id: int, session: T_Session):
     return Message(message=f"Trip with id {trip_id} has been deleted successfully")
 
 
+@router.post("/{trip_id}/clone", response_model=TripCloneResponse, status_code=status.HTTP_201_CREATED)
+async def clone_trip(trip_id: int, clone: TripClone, session: T_Session):
+    """Copy a trip with its bags, items and packing list, using one INSERT ... SELECT per table."""
+    return await services.clone_trip(session, trip_id, clone)
+
+
 @router.get("/{trip_id}/bags", response_model=list[BagResponse])
-async def get_trip_bags(trip_id: int, session: T_Session):
+async def get_trip_bags(trip_id: int, session: T_ReadSession):
     """Get all bags associated with a specific trip."""
-    result = await session.execute(
-        select(Trip).where(Trip.id == trip_id).options(selectinload(Trip.trip_bags).selectinload(TripBag.bag))
-    )
+    result = await session.execute(TRIP_BAGS_QUERY, {"trip_id": trip_id})
     trip = result.scalar_one_or_none()
 
     if not trip:
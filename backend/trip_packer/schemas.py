@@ -1,15 +1,44 @@
 from datetime import date, datetime
-from typing import Optional
+from enum import Enum
+from typing import Generic, Optional, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
-from trip_packer.models import ItemCategory, ItemStatus, LuggageType
+from trip_packer.models import ItemCategory, ItemStatus, JobStatus, LuggageType
+
+T = TypeVar("T")
 
 
 class Message(BaseModel):
     message: str
 
 
+class PoolStatus(BaseModel):
+    """Schema for database connection pool usage"""
+
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class ReadinessStatus(BaseModel):
+    """Schema for the readiness check of a starting process"""
+
+    status: str
+    warm_up_seconds: Optional[float] = None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Schema for a page of results fetched with keyset pagination"""
+
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
 # Trip schemas for CRUD operations
 class TripCreate(BaseModel):
     """Schema for creating new trips"""
@@ -40,12 +69,31 @@ class TripResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TripClone(BaseModel):
+    """Schema for copying a trip, with its bags, items and packing list, into a new trip"""
+
+    name: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    reset_status: bool = False
+
+
+class TripCloneResponse(TripResponse):
+    """Schema for cloned trip responses, with the number of rows copied"""
+
+    copied_bags: int
+    copied_trip_items: int
+    copied_packings: int
+
+
 # Bag schemas for CRUD operations
 class BagCreate(BaseModel):
     """Schema for creating new bag"""
 
     name: str
     type: LuggageType
+    capacity_liters: Optional[float] = Field(None, ge=0)
+    max_weight_kg: Optional[float] = Field(None, ge=0)
 
 
 class BagUpdate(BaseModel):
@@ -53,6 +101,8 @@ class BagUpdate(BaseModel):
 
     name: Optional[str] = None
     type: Optional[LuggageType] = None
+    capacity_liters: Optional[float] = Field(None, ge=0)
+    max_weight_kg: Optional[float] = Field(None, ge=0)
 
 
 class BagResponse(BaseModel):
@@ -61,6 +111,8 @@ class BagResponse(BaseModel):
     id: int
     name: str
     type: LuggageType
+    capacity_liters: Optional[float]
+    max_weight_kg: Optional[float]
     created_at: datetime
     updated_at: datetime
 
@@ -73,6 +125,8 @@ class ItemCreate(BaseModel):
 
     name: str
     category: ItemCategory
+    volume_liters: float = Field(0.0, ge=0)
+    weight_kg: float = Field(0.0, ge=0)
 
 
 class ItemUpdate(BaseModel):
@@ -80,6 +134,8 @@ class ItemUpdate(BaseModel):
 
     name: Optional[str] = None
     category: Optional[ItemCategory] = None
+    volume_liters: Optional[float] = Field(None, ge=0)
+    weight_kg: Optional[float] = Field(None, ge=0)
 
 
 class ItemResponse(BaseModel):
@@ -88,12 +144,22 @@ class ItemResponse(BaseModel):
     id: int
     name: str
     category: ItemCategory
+    volume_liters: float
+    weight_kg: float
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class ItemSuggestion(BaseModel):
+    """Schema for item autocomplete suggestions"""
+
+    id: int
+    name: str
+    category: ItemCategory
+
+
 # TripBag schemas
 class TripBagCreate(BaseModel):
     """Schema for associating a bag with a trip"""
@@ -130,6 +196,15 @@ class PackingUpdate(BaseModel):
     status: Optional[ItemStatus] = None
 
 
+class PackingStatusUpdate(BaseModel):
+    """Schema for moving many packing entries of a trip to a new status"""
+
+    status: ItemStatus
+    bag_id: Optional[int] = None
+    category: Optional[ItemCategory] = None
+    current_status: Optional[ItemStatus] = None
+
+
 class PackingResponse(BaseModel):
     """Schema for packing responses"""
 
@@ -144,6 +219,95 @@ class PackingResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PackingToggle(BaseModel):
+    """Schema for a status toggle of a single packing entry"""
+
+    item_id: int
+    bag_id: int
+    status: ItemStatus
+
+
+class PackingToggleResult(BaseModel):
+    """Schema for the state of a toggled packing entry once written, empty when the entry doesn't exist"""
+
+    item_id: int
+    bag_id: int
+    packing: Optional[PackingResponse] = None
+
+
+class PackingToggleResponse(BaseModel):
+    """Schema for acknowledged packing status toggles"""
+
+    updated: int
+    results: list[PackingToggleResult]
+
+
+class PackingStatusUpdateResponse(BaseModel):
+    """Schema for bulk packing status transition responses"""
+
+    updated: int
+    packings: list[PackingResponse]
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class PackingBulkOutcome(str, Enum):
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    CONFLICT = "CONFLICT"
+    DUPLICATE = "DUPLICATE"
+    NOT_FOUND = "NOT_FOUND"
+
+
+class PackingBulkResult(BaseModel):
+    """Schema for the outcome of a single row in a bulk packing request"""
+
+    index: int
+    item_id: int
+    bag_id: int
+    outcome: PackingBulkOutcome
+    detail: Optional[str] = None
+    packing: Optional[PackingResponse] = None
+
+
+class PackingBulkResponse(BaseModel):
+    """Schema for bulk packing responses"""
+
+    created: int
+    updated: int
+    failed: int
+    results: list[PackingBulkResult]
+
+
+class PackingAssign(BaseModel):
+    """Schema for computing the bag of every trip item automatically"""
+
+    # The search runs on a worker thread of the request, so it is capped
+    time_budget_ms: int = Field(200, ge=0, le=5000)
+
+
+class BagLoad(BaseModel):
+    """Schema for the load of a bag after automatic assignment"""
+
+    bag_id: int
+    capacity_liters: float
+    max_weight_kg: float
+    volume_liters: float
+    weight_kg: float
+    item_ids: list[int]
+
+
+class PackingAssignResponse(BaseModel):
+    """Schema for automatic bag assignment responses"""
+
+    assigned: int
+    unassigned_item_ids: list[int]
+    bags: list[BagLoad]
+
+
 # TripItem schemas
 class TripItemCreate(BaseModel):
     """Schema for creating a trip item entry"""
@@ -160,6 +324,15 @@ class TripItemUpdate(BaseModel):
     status: Optional[ItemStatus] = None
 
 
+class TripItemStatusUpdate(BaseModel):
+    """Schema for moving many trip item entries of a trip to a new status"""
+
+    status: ItemStatus
+    bag_id: Optional[int] = None
+    category: Optional[ItemCategory] = None
+    current_status: Optional[ItemStatus] = None
+
+
 class TripItemResponse(BaseModel):
     """Schema for trip item responses"""
 
@@ -173,6 +346,13 @@ class TripItemResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TripItemStatusUpdateResponse(BaseModel):
+    """Schema for bulk trip item status transition responses"""
+
+    updated: int
+    trip_items: list[TripItemResponse]
+
+
 # Detailed response schemas for frontend
 class PackingDetailResponse(BaseModel):
     """Schema for detailed packing responses including related objects"""
@@ -215,3 +395,117 @@ class TripDetailResponse(TripResponse):
     trip_items: list[TripItemDetailResponse]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Summary schemas
+class SummaryTotals(BaseModel):
+    """Schema for the number of entries and the summed quantity of a group"""
+
+    count: int = 0
+    quantity: int = 0
+
+
+class StatusSummary(SummaryTotals):
+    status: ItemStatus
+
+
+class CategorySummary(SummaryTotals):
+    category: ItemCategory
+
+
+class BagSummary(SummaryTotals):
+    bag_id: int
+
+
+class TripItemSummary(BaseModel):
+    """Schema for trip item progress grouped by status and category"""
+
+    total: SummaryTotals = SummaryTotals()
+    by_status: list[StatusSummary] = []
+    by_category: list[CategorySummary] = []
+
+
+class PackingSummary(TripItemSummary):
+    """Schema for packing progress grouped by status, category and bag"""
+
+    by_bag: list[BagSummary] = []
+
+
+class TripSummaryResponse(BaseModel):
+    """Schema for the packing progress summary of a trip"""
+
+    trip_id: int
+    packings: PackingSummary
+    trip_items: TripItemSummary
+
+
+# Job schemas
+class JobKind(str, Enum):
+    CLONE_TRIP = "CLONE_TRIP"
+    ASSIGN_PACKING = "ASSIGN_PACKING"
+    BULK_PACKING = "BULK_PACKING"
+
+
+class JobCreate(BaseModel):
+    """Schema for submitting a background job"""
+
+    kind: JobKind
+    params: dict = {}
+
+
+class JobResponse(BaseModel):
+    """Schema for the status of a background job"""
+
+    id: int
+    kind: JobKind
+    status: JobStatus
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CloneTripJob(TripClone):
+    """Schema for the params of a trip clone job"""
+
+    trip_id: int
+
+
+class AssignPackingJob(PackingAssign):
+    """Schema for the params of an automatic bag assignment job"""
+
+    trip_id: int
+
+
+class BulkPackingJob(BaseModel):
+    """Schema for the params of a bulk packing job"""
+
+    trip_id: int
+    packings: list[PackingCreate]
+    upsert: bool = True
+
+
+# Sync schemas
+class TombstoneResponse(BaseModel):
+    """Schema for the key of a row deleted since a sync watermark"""
+
+    table_name: str
+    key: dict
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SyncResponse(BaseModel):
+    """Schema for a page of the changes since a sync watermark; apply the deletions first, then the rows"""
+
+    watermark: datetime
+    next_cursor: Optional[str] = None
+    trips: list[TripResponse]
+    items: list[ItemResponse]
+    bags: list[BagResponse]
+    trip_items: list[TripItemResponse]
+    packings: list[PackingResponse]
+    deleted: list[TombstoneResponse]
@@ -0,0 +1,61 @@
+from datetime import date
+from functools import cache
+from typing import Iterable, TypedDict
+
+import pydantic_core
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Date, Table, cast
+
+
+def _row_type(schema: type[BaseModel]) -> type:
+    """TypedDict with the fields of a response schema, nested schemas included."""
+    fields = {}
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            annotation = _row_type(annotation)
+        fields[name] = annotation
+    return TypedDict(f"{schema.__name__}Row", fields)
+
+
+@cache
+def row_serializer(schema: type[BaseModel]) -> TypeAdapter:
+    """Serializer for lists of plain dict rows shaped like the schema, built once per schema."""
+    return TypeAdapter(list[_row_type(schema)])
+
+
+def schema_columns(schema: type[BaseModel], table: Table, prefix: str = "") -> list:
+    """Columns of the table backing the fields of the schema, labelled with the field names."""
+    columns = []
+    for name, field in schema.model_fields.items():
+        if name not in table.c:
+            continue
+        column = table.c[name]
+        # Trip dates are stored as timestamps but rendered as plain dates
+        if field.annotation is date:
+            column = cast(column, Date)
+        columns.append(column.label(f"{prefix}{name}"))
+    return columns
+
+
+def nest_rows(rows: Iterable, *relations: str) -> list[dict]:
+    """Turn flat rows with columns labelled "relation.field" into dicts holding one dict per relation."""
+    nested = []
+    for row in rows:
+        data = dict(row)
+        for relation in relations:
+            prefix = f"{relation}."
+            data[relation] = {key.removeprefix(prefix): data.pop(key) for key in list(data) if key.startswith(prefix)}
+        nested.append(data)
+    return nested
+
+
+def serialized_rows(schema: type[BaseModel], rows: list[dict]) -> Response:
+    """JSON response encoded straight from row dicts, skipping the per-object validation of response_model."""
+    return Response(content=row_serializer(schema).dump_json(rows), media_type="application/json")
+
+
+def serialized_json(value) -> Response:
+    """JSON response for values that are already JSON-ready, such as cached catalog pages."""
+    return Response(content=pydantic_core.to_json(value), media_type="application/json")
@@ -0,0 +1,277 @@
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trip_packer.events import EventBroker
+from trip_packer.models import Bag, Item, ItemStatus, Packing, Trip, TripBag, TripItem
+from trip_packer.optimizer import PackableItem, assign_bags, bag_space
+from trip_packer.schemas import (
+    BagLoad,
+    PackingAssign,
+    PackingAssignResponse,
+    PackingBulkOutcome,
+    PackingBulkResponse,
+    PackingBulkResult,
+    PackingCreate,
+    PackingResponse,
+    TripClone,
+    TripCloneResponse,
+    TripResponse,
+)
+from trip_packer.sync import tombstones_for
+
+# Operations shared by the endpoints and the background jobs, which pass in what they depend on rather than
+# resolving FastAPI dependencies
+
+# Postgres caps a statement at 65535 bind parameters, so large batches are split
+BULK_CHUNK_SIZE = 1000
+
+
+async def clone_trip(session: AsyncSession, trip_id: int, clone: TripClone) -> TripCloneResponse:
+    """Copy a trip with its bags, items and packing list, using one INSERT ... SELECT per table."""
+    source = await session.get(Trip, trip_id)
+    if not source:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    new_trip = Trip(
+        name=clone.name,
+        start_date=clone.start_date or source.start_date,
+        end_date=clone.end_date or source.end_date,
+    )
+    session.add(new_trip)
+    try:
+        await session.flush()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A trip with this name already exists",
+        )
+
+    new_trip_id = literal(new_trip.id)
+
+    def copied_status(model):
+        return literal(ItemStatus.UNPACKED, model.status.type) if clone.reset_status else model.status
+
+    copied_bags = await session.execute(
+        insert(TripBag).from_select(
+            ["trip_id", "bag_id"],
+            select(new_trip_id, TripBag.bag_id).where(TripBag.trip_id == trip_id),
+        )
+    )
+    copied_trip_items = await session.execute(
+        insert(TripItem).from_select(
+            ["trip_id", "item_id", "quantity", "status"],
+            select(new_trip_id, TripItem.item_id, TripItem.quantity, copied_status(TripItem)).where(
+                TripItem.trip_id == trip_id
+            ),
+        )
+    )
+    copied_packings = await session.execute(
+        insert(Packing).from_select(
+            ["trip_id", "item_id", "bag_id", "quantity", "status"],
+            select(new_trip_id, Packing.item_id, Packing.bag_id, Packing.quantity, copied_status(Packing)).where(
+                Packing.trip_id == trip_id
+            ),
+        )
+    )
+
+    await session.commit()
+    await session.refresh(new_trip)
+
+    return TripCloneResponse(
+        **TripResponse.model_validate(new_trip).model_dump(),
+        copied_bags=copied_bags.rowcount,
+        copied_trip_items=copied_trip_items.rowcount,
+        copied_packings=copied_packings.rowcount,
+    )
+
+
+def _check_bulk_rows(
+    packings: list[PackingCreate], found_items: set[int], found_bags: set[int]
+) -> tuple[list[PackingBulkResult | None], dict[tuple[int, int], int]]:
+    """Results of the rows that won't be written, and the index of the row to write for each item and bag."""
+    results: list[PackingBulkResult | None] = [None] * len(packings)
+    pending: dict[tuple[int, int], int] = {}
+
+    for index, packing in enumerate(packings):
+        key = (packing.item_id, packing.bag_id)
+        if packing.item_id not in found_items:
+            detail = f"Item with id {packing.item_id} not found"
+        elif packing.bag_id not in found_bags:
+            detail = f"Bag with id {packing.bag_id} not found"
+        else:
+            # A later row for the same item and bag wins over an earlier one
+            if key in pending:
+                results[pending[key]] = PackingBulkResult(
+                    index=pending[key],
+                    item_id=packing.item_id,
+                    bag_id=packing.bag_id,
+                    outcome=PackingBulkOutcome.DUPLICATE,
+                    detail=f"Superseded by entry {index}",
+                )
+            pending[key] = index
+            continue
+
+        results[index] = PackingBulkResult(
+            index=index,
+            item_id=packing.item_id,
+            bag_id=packing.bag_id,
+            outcome=PackingBulkOutcome.NOT_FOUND,
+            detail=detail,
+        )
+
+    return results, pending
+
+
+async def bulk_upsert_packing(
+    session: AsyncSession, events: EventBroker, trip_id: int, packings: list[PackingCreate], upsert: bool = True
+) -> PackingBulkResponse:
+    """Create many packing entries at once, updating existing ones when upsert is enabled."""
+    # Check if trip exists
+    trip = await session.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    if not packings:
+        return PackingBulkResponse(created=0, updated=0, failed=0, results=[])
+
+    # Check all referenced items and bags with one query each
+    item_ids = {packing.item_id for packing in packings}
+    bag_ids = {packing.bag_id for packing in packings}
+    found_items = set(await session.scalars(select(Item.id).where(Item.id.in_(item_ids))))
+    found_bags = set(await session.scalars(select(Bag.id).where(Bag.id.in_(bag_ids))))
+
+    results, pending = _check_bulk_rows(packings, found_items, found_bags)
+
+    rows = [
+        {
+            "trip_id": trip_id,
+            "item_id": packings[index].item_id,
+            "bag_id": packings[index].bag_id,
+            "quantity": packings[index].quantity,
+            "status": packings[index].status,
+        }
+        for index in pending.values()
+    ]
+
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        stmt = insert(Packing).values(rows[start : start + BULK_CHUNK_SIZE])
+        conflict_target = [Packing.trip_id, Packing.item_id, Packing.bag_id]
+        if upsert:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_target,
+                set_={"quantity": stmt.excluded.quantity, "status": stmt.excluded.status, "updated_at": func.now()},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+
+        # xmax is only zero for freshly inserted tuples, which tells inserts apart from updates
+        stmt = stmt.returning(*Packing.__table__.c, literal_column("xmax = 0").label("inserted"))
+
+        for row in await session.execute(stmt):
+            index = pending.pop((row.item_id, row.bag_id))
+            results[index] = PackingBulkResult(
+                index=index,
+                item_id=row.item_id,
+                bag_id=row.bag_id,
+                outcome=PackingBulkOutcome.CREATED if row.inserted else PackingBulkOutcome.UPDATED,
+                packing=PackingResponse.model_validate(row._mapping),
+            )
+
+    await session.commit()
+    # One event for the whole batch rather than one per row
+    if rows:
+        await events.publish(trip_id, "packing.reset")
+
+    # Rows skipped by ON CONFLICT DO NOTHING are not returned
+    for (item_id, bag_id), index in pending.items():
+        results[index] = PackingBulkResult(
+            index=index,
+            item_id=item_id,
+            bag_id=bag_id,
+            outcome=PackingBulkOutcome.CONFLICT,
+            detail="This packing entry already exists",
+        )
+
+    created = sum(result.outcome == PackingBulkOutcome.CREATED for result in results)
+    updated = sum(result.outcome == PackingBulkOutcome.UPDATED for result in results)
+
+    return PackingBulkResponse(
+        created=created,
+        updated=updated,
+        failed=len(results) - created - updated,
+        results=results,
+    )
+
+
+async def assign_packing(
+    session: AsyncSession, events: EventBroker, trip_id: int, options: PackingAssign
+) -> PackingAssignResponse:
+    """Replace the packing list with a bag for every trip item, computed by a bin-packing heuristic."""
+    trip = await session.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trip with id {trip_id} not found")
+
+    bag_rows = await session.execute(
+        select(Bag.id, Bag.type, Bag.capacity_liters, Bag.max_weight_kg)
+        .join(TripBag, TripBag.bag_id == Bag.id)
+        .where(TripBag.trip_id == trip_id)
+    )
+    bags = [bag_space(*row) for row in bag_rows]
+    if not bags:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Trip with id {trip_id} has no bags")
+
+    item_rows = (
+        await session.execute(
+            select(TripItem.item_id, TripItem.quantity, TripItem.status, Item.volume_liters, Item.weight_kg)
+            .join(Item, Item.id == TripItem.item_id)
+            .where(TripItem.trip_id == trip_id)
+        )
+    ).all()
+    items = [
+        PackableItem(row.item_id, volume=row.volume_liters * row.quantity, weight=row.weight_kg * row.quantity)
+        for row in item_rows
+    ]
+
+    # CPU-bound, so it runs off the event loop
+    assignment = await run_in_threadpool(assign_bags, items, bags, options.time_budget_ms / 1000)
+
+    trip_items = {row.item_id: row for row in item_rows}
+    rows = [
+        {
+            "trip_id": trip_id,
+            "item_id": item.item_id,
+            "bag_id": bag.bag_id,
+            "quantity": trip_items[item.item_id].quantity,
+            "status": trip_items[item.item_id].status,
+        }
+        for bag in assignment.bags
+        for item in bag.items
+    ]
+
+    await session.execute(tombstones_for(Packing, Packing.trip_id == trip_id))
+    await session.execute(delete(Packing).where(Packing.trip_id == trip_id))
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        await session.execute(insert(Packing).values(rows[start : start + BULK_CHUNK_SIZE]))
+    await session.commit()
+    await events.publish(trip_id, "packing.reset")
+
+    return PackingAssignResponse(
+        assigned=len(rows),
+        unassigned_item_ids=[item.item_id for item in assignment.unassigned],
+        bags=[
+            BagLoad(
+                bag_id=bag.bag_id,
+                capacity_liters=bag.capacity,
+                max_weight_kg=bag.max_weight,
+                volume_liters=bag.volume,
+                weight_kg=bag.weight,
+                item_ids=[item.item_id for item in bag.items],
+            )
+            for bag in assignment.bags
+        ],
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,3 +7,69 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     DATABASE_URL: str
+
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # psycopg prepares a statement on the server once it has run this many times on a connection; 0 turns that off,
+    # as a transaction-mode pgbouncer cannot keep prepared statements
+    DB_PREPARE_THRESHOLD: int = 1
+    DB_QUERY_CACHE_SIZE: int = 500
+
+    # Read replicas serving GET routes; a replica failing to connect is skipped for DB_REPLICA_RETRY_SECONDS
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    # Reads go to the primary for this long after a client's own write, so replica lag never hides it; 0 disables
+    DB_READ_YOUR_WRITES_SECONDS: float = 0.0
+
+    # Catalog cache
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: float = 60.0
+    CACHE_MAX_ENTRIES: int = 10_000
+
+    # Item autocomplete index, reloaded to pick up writes made by other processes
+    AUTOCOMPLETE_REFRESH_SECONDS: float = 300.0
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Server preference when the client weighs several encodings equally; br and zstd need the compression extra
+    COMPRESSION_ENCODINGS: list[Literal["zstd", "br", "gzip"]] = ["zstd", "br", "gzip"]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Background jobs
+    JOB_CONCURRENCY: int = 4
+    # Live jobs are touched this often; unfinished jobs untouched for three periods are requeued at startup
+    JOB_HEARTBEAT_SECONDS: float = 30.0
+
+    # Trip change events; "postgres" relays them through LISTEN/NOTIFY to every replica
+    EVENTS_BACKEND: Literal["memory", "postgres"] = "memory"
+    EVENTS_MAX_QUEUED: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Delta sync looks back this far before the client watermark to catch rows of slow transactions
+    SYNC_OVERLAP_SECONDS: float = 5.0
+    # Rows and tombstones per sync page
+    SYNC_PAGE_SIZE: int = 1000
+    SYNC_MAX_PAGE_SIZE: int = 5000
+    # Tombstones are purged after this long; clients syncing from an older watermark have to start over
+    SYNC_TOMBSTONE_RETENTION_DAYS: float = 30.0
+    SYNC_TOMBSTONE_PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    # Packing status toggles arriving within this window are written together
+    PACKING_TOGGLE_WINDOW_MS: int = 50
+
+    # Responses to POST and PUT requests carrying an Idempotency-Key are replayed to retries for this long
+    IDEMPOTENCY_TTL_SECONDS: float = 86_400.0
+    # A retry arriving while the first request still runs waits this long for its response before getting a 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    # A key whose request has not finished after this long is taken to belong to a dead process, and a retry runs the
+    # request again; keep it above the longest request plus IDEMPOTENCY_WAIT_SECONDS
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0
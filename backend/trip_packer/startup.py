@@ -0,0 +1,90 @@
+"""Start the API: upgrade the database only when it is behind, import the app and serve it, timing each step.
+
+python -m trip_packer.startup --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import logging
+import logging.config
+import time
+from pathlib import Path
+
+import uvicorn
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from uvicorn.config import LOGGING_CONFIG
+
+from trip_packer.settings import Settings
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Replicas starting together take turns, so only the first one runs the upgrade
+MIGRATION_LOCK_ID = 7_310_521
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _report(step: str, start: float):
+    logger.info("Startup: %s in %.3fs", step, time.perf_counter() - start)
+
+
+def pending_migrations(connection, script: ScriptDirectory) -> bool:
+    """Whether the database revision differs from the migration heads, read from alembic_version."""
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    return current != set(script.get_heads())
+
+
+def migrate(database_url: str, config: Config) -> bool:
+    """Upgrade to head, skipping alembic's environment entirely when the database is already there."""
+    script = ScriptDirectory.from_config(config)
+    engine = create_engine(database_url, poolclass=NullPool)
+
+    try:
+        with engine.connect() as connection:
+            if not pending_migrations(connection, script):
+                return False
+
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            try:
+                # Another replica may have upgraded while this one waited for the lock
+                connection.rollback()
+                if pending_migrations(connection, script):
+                    command.upgrade(config, "head")
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+    finally:
+        engine.dispose()
+
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--skip-migrations", action="store_true", help="Serve without checking the database revision")
+    args = parser.parse_args(argv)
+    # uvicorn only sets up its loggers once it runs, after the steps timed here
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+    if not args.skip_migrations:
+        start = time.perf_counter()
+        upgraded = migrate(Settings().DATABASE_URL, Config(str(ALEMBIC_INI)))
+        _report("migrations upgraded" if upgraded else "database already at head", start)
+
+    start = time.perf_counter()
+    from trip_packer.app import app  # noqa: PLC0415
+
+    _report("app imported", start)
+
+    # Readiness is reported separately, once /health/ready turns 200 after the warm-up
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from datetime import timedelta
+from itertools import chain
+
+from sqlalchemy import delete, event, func, insert, inspect, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from trip_packer.models import Bag, Item, Packing, Tombstone, Trip, TripItem
+
+logger = logging.getLogger("uvicorn.error")
+
+# Tables offline clients keep a copy of, in the order their rows are applied
+SYNCED_MODELS = (Trip, Item, Bag, TripItem, Packing)
+
+
+def _primary_key(instance) -> dict:
+    return {column.key: getattr(instance, column.key) for column in inspect(instance).mapper.primary_key}
+
+
+@event.listens_for(Session, "before_flush")
+def record_deletions(session: Session, flush_context, instances):
+    """Leave a tombstone behind for every synced row deleted through the session."""
+    for instance in session.deleted:
+        if isinstance(instance, SYNCED_MODELS):
+            session.add(Tombstone(table_name=instance.__tablename__, key=_primary_key(instance)))
+
+
+def tombstones_for(model, *criteria):
+    """INSERT ... SELECT recording tombstones for the rows a bulk delete with the same criteria removes.
+
+    Bulk deletes skip the session, so they have to run this first.
+    """
+    columns = model.__table__.primary_key
+    key = func.json_build_object(*chain.from_iterable((literal(column.key), column) for column in columns))
+    deleted = select(literal(model.__tablename__), key).where(*criteria)
+    return insert(Tombstone).from_select(["table_name", "key"], deleted)
+
+
+async def purge_tombstones(engine: AsyncEngine, retention: timedelta) -> int:
+    """Delete the tombstones older than the retention, returning how many went."""
+    async with engine.begin() as conn:
+        result = await conn.execute(delete(Tombstone).where(Tombstone.deleted_at < func.localtimestamp() - retention))
+    return result.rowcount
+
+
+async def purge_tombstones_periodically(engine: AsyncEngine, retention: timedelta, interval_seconds: float):
+    """Purge expired tombstones every interval, for as long as the app runs."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            purged = await purge_tombstones(engine, retention)
+        except (OSError, SQLAlchemyError) as exc:
+            logger.warning("Tombstone purge failed: %s", exc)
+        else:
+            logger.info("Purged %s tombstones", purged)